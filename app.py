@@ -5,22 +5,215 @@ cd to the `examples/snippets/clients` directory and run:
     uv run server fastmcp_quickstart stdio
 """
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+import argparse
 import asyncio
-import re
-from typing import Dict, Any
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
 
-# 导入各提取函数
-from browser import extract_html_css
-from browser_React import extract_react_code
-from browser_Vue import extract_vue_code
-from browser_Svelte import extract_svelte_code
-from browser_Lit import extract_lit_code
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 
-mcp = FastMCP("UiverseExtractor")
+from asset_cache import get_asset_cache
+from batch import BATCH_CONCURRENCY, run_batch
+from browser_pool import PREWARM, get_browser_manager
+from component_index import SEARCH_LIMIT, get_component_index
+from deadline import Deadline, DeadlineExceeded, ProgressListener, get_step_latencies
+from direct_fetch import close_client, fetch_component_source
+from failure_guard import (
+    CircuitOpenError,
+    ComponentNotFoundError,
+    ComponentUnavailableError,
+    ExtractionFailed,
+    get_breaker,
+    get_negative_cache,
+)
+from framework_profiles import PROFILES, get_profile
+from metrics import EXTRACT_SECONDS, EXTRACTIONS, get_registry
+from postprocess import check_steps, postprocess_results
+from result_cache import cache_key, get_result_cache
+from result_format import CHUNK_BYTES, check_output, read_chunk, structured
+from scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    QUEUE_TIMEOUT_S,
+    ServerBusyError,
+    get_scheduler,
+)
+from singleflight import SingleFlight
+from worker_pool import WORKERS, WorkerCrashedError, WorkerJobError, get_worker_pool
+import failure_guard
+import request_filter
+
+logger = logging.getLogger(__name__)
+
+
+async def _prewarm() -> None:
+    try:
+        # 提取引擎与 Playwright 在这里（或首次提取时）才被导入；放到线程中，避免阻塞握手
+        await asyncio.to_thread(importlib.import_module, "extractor_engine")
+        await get_browser_manager().start()
+    except Exception:
+        # 预热失败不影响服务，首次提取时会再次尝试启动
+        logger.exception("Chromium 预热失败")
+
+
+# sse / streamable-http 下每个客户端连接都会进入一次 lifespan；共享资源按会话计数，最后一个会话退出时才关闭
+_sessions = 0
+_sessions_lock = asyncio.Lock()
+_prewarm_task: Optional[asyncio.Task] = None
+
+
+async def _start_shared() -> None:
+    global _prewarm_task
+    if WORKERS > 0:
+        get_worker_pool().start()
+    elif PREWARM:
+        _prewarm_task = asyncio.create_task(_prewarm())
+
+
+async def _close_shared() -> None:
+    global _prewarm_task
+    if _prewarm_task is not None:
+        _prewarm_task.cancel()
+        await asyncio.gather(_prewarm_task, return_exceptions=True)
+        _prewarm_task = None
+    await close_client()
+    await get_browser_manager().close()
+    if WORKERS > 0:
+        await get_worker_pool().close()
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """
+    服务器持有进程级浏览器管理器：按 UIVERSE_PREWARM 在后台预热 Chromium，退出时统一关闭。
+    工作进程模式下改为启动工作进程池，由各工作进程自行预热。
+    第一个会话进入时启动，最后一个会话退出时关闭，单个客户端断开不影响其他会话进行中的提取。
+    """
+    global _sessions
+    async with _sessions_lock:
+        _sessions += 1
+        if _sessions == 1:
+            await _start_shared()
+    try:
+        yield
+    finally:
+        async with _sessions_lock:
+            _sessions -= 1
+            if _sessions == 0:
+                await _close_shared()
+
+
+mcp = FastMCP("UiverseExtractor", lifespan=_lifespan)
 
 UIVERSE_PREFIX = "https://uiverse.io/"
-SUPPORTED_FRAMEWORKS = ["HTML", "React", "Vue", "Svelte", "Lit"]
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+SUPPORTED_FRAMEWORKS = list(PROFILES)
+
+# 合并并发的相同 (框架, 链接) 提取请求；_flight_deadlines 在共享任务存续期间记录其共享 Deadline，等待者订阅其进度
+_inflight = SingleFlight()
+_flight_deadlines: Dict[str, Deadline] = {}
+
+# 长时间没有新阶段事件时重发进度的间隔，避免客户端因无响应而超时重试
+PROGRESS_HEARTBEAT_S = 5.0
+PROGRESS_FLUSH_TIMEOUT_S = 2.0
+
+NO_CODE_MESSAGE = "页面中没有读取到代码"
+
+
+def _progress_message(stage: str, detail: Dict[str, Any]) -> str:
+    if stage == "cache":
+        return f"{detail['framework']} 命中结果缓存"
+    if stage == "queued":
+        return "排队等待浏览器名额"
+    if stage == "admitted":
+        return "已取得浏览器名额"
+    if stage == "navigated":
+        return "已打开组件页面"
+    if stage == "framework_selected":
+        return f"已选中框架 {detail['framework']}"
+    if stage == "field":
+        return f"已取得 {detail['framework']} {detail['field']}（{detail['bytes']} 字节）"
+    if stage == "fallback":
+        return f"{detail['field']} 改用回退读取（{detail['via']}）"
+    return stage
+
+
+class _ProgressRelay:
+    """
+    把 Deadline 的阶段事件转发为 MCP 进度通知；"field" 事件另以日志消息（JSON）推送部分结果。
+    只有客户端在请求中带了 progressToken 时才启用；发送在后台任务中按顺序进行，不阻塞提取。
+    """
+
+    def __init__(self, ctx: Optional[Context], label: str):
+        meta = ctx.request_context.meta if ctx is not None else None
+        self.enabled = meta is not None and meta.progressToken is not None
+        self._ctx = ctx
+        self._label = label
+        self._queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+        self._count = 0
+        self._last = "开始"
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def listener(self) -> Optional[ProgressListener]:
+        return self if self.enabled else None
+
+    def __call__(self, stage: str, detail: Dict[str, Any]) -> None:
+        self._queue.put_nowait((stage, detail))
+
+    async def __aenter__(self) -> "_ProgressRelay":
+        if self.enabled:
+            self._task = asyncio.create_task(self._pump())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._task is None:
+            return
+        if exc_type is None:
+            self._queue.put_nowait(None)
+            try:
+                await asyncio.wait_for(self._task, PROGRESS_FLUSH_TIMEOUT_S)
+                return
+            except asyncio.TimeoutError:
+                pass
+        self._task.cancel()
+
+    async def _pump(self) -> None:
+        while True:
+            try:
+                event = await asyncio.wait_for(self._queue.get(), PROGRESS_HEARTBEAT_S)
+            except asyncio.TimeoutError:
+                await self._send(f"{self._last}，进行中")
+                continue
+            if event is None:
+                return
+            stage, detail = event
+            self._last = _progress_message(stage, detail)
+            await self._send(self._last)
+            if stage == "field":
+                await self._send_partial(detail)
+
+    async def _send(self, message: str) -> None:
+        self._count += 1
+        try:
+            await self._ctx.report_progress(self._count, None, f"{self._label}: {message}")
+        except Exception:
+            logger.debug("发送进度通知失败", exc_info=True)
+
+    async def _send_partial(self, detail: Dict[str, Any]) -> None:
+        partial = {"query": self._label, "partial": True, **detail}
+        try:
+            await self._ctx.info(json.dumps(partial, ensure_ascii=False))
+        except Exception:
+            logger.debug("推送部分结果失败", exc_info=True)
 
 
 def _is_valid_uiverse_link(url: str) -> bool:
@@ -31,32 +224,264 @@ def _has_path_after_prefix(url: str) -> bool:
     return _is_valid_uiverse_link(url) and len(url) > len(UIVERSE_PREFIX)
 
 
-async def _dispatch_extract(framework: str, url: str) -> str:
-    fw = framework.strip().lower()
-    if fw == "html":
-        return await extract_html_css(url)
-    if fw == "react":
-        return await extract_react_code(url)
-    if fw == "vue":
-        return await extract_vue_code(url)
-    if fw == "svelte":
-        return await extract_svelte_code(url)
-    if fw == "lit":
-        return await extract_lit_code(url)
-    raise ValueError(f"不支持的框架: {framework}")
+def _canonical_framework(name: str) -> str:
+    return get_profile(name).name
 
 
-@mcp.tool()
-async def parse_and_extract(query: str) -> str:
+async def _dispatch_extract(
+    framework: str,
+    url: str,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, str]:
+    profile = get_profile(framework)
+    deadline = deadline or Deadline()
+    source, outcome = "direct", "error"
+    # probe 为 None 表示未经过熔断器；finished 为 False 表示被取消，结果不计入熔断器与负缓存
+    probe: Optional[bool] = None
+    admitted = finished = False
+    failure: Optional[BaseException] = None
+    try:
+        fields = None
+        if profile.name == "HTML":
+            # 先走不启动浏览器的直连快速路径，取不到再回退到 Playwright
+            with deadline.step("direct_fetch"):
+                fields = await fetch_component_source(url, deadline)
+        if not fields:
+            source = "browser"
+            # 熔断时不再排队，立即失败
+            probe = get_breaker(profile.name).admit()
+            # 浏览器提取需要先取得准入名额；排队时间同样计入请求时限
+            deadline.check("queue")
+            deadline.report("queued")
+            start = time.monotonic()
+            queue_timeout_s = min(QUEUE_TIMEOUT_S, deadline.remaining_s)
+            try:
+                async with get_scheduler().slot(priority, queue_timeout_s, owner=deadline):
+                    deadline.observe("queue", start)
+                    deadline.report("admitted")
+                    admitted = True
+                    fields = await _browser_extract(url, profile.name, deadline)
+            except ServerBusyError:
+                # 排队时间被请求时限截短时，排队超时实际上是时限用尽
+                if not admitted and queue_timeout_s < QUEUE_TIMEOUT_S:
+                    deadline.check("queue")
+                raise
+        outcome = "ok" if _has_code(fields) else "empty"
+        if outcome == "empty":
+            failure = LookupError(NO_CODE_MESSAGE)
+        finished = True
+        return fields
+    except Exception as exc:
+        failure, finished = exc, True
+        raise
+    finally:
+        _record_extraction(profile.name, url, source, outcome, deadline)
+        if finished:
+            _settle_guards(profile.name, url, probe, admitted, failure)
+        elif probe is not None:
+            get_breaker(profile.name).record(None, probe)
+
+
+# 排队失败、熔断与超过时限（调用方可以传很小的 deadline_s）取决于请求本身，工作进程崩溃与无法还原类型的
+# 工作进程异常说明不了框架的状况；这些既不算框架故障也不计入负缓存
+_TRANSIENT_ERRORS = (
+    ServerBusyError,
+    CircuitOpenError,
+    DeadlineExceeded,
+    WorkerCrashedError,
+    WorkerJobError,
+)
+# extract_many 的单个框架错误按类型名还原，以便与 _dispatch_extract 路径同样处理
+_RESTORED_ERRORS = {cls.__name__: cls for cls in (DeadlineExceeded, ComponentNotFoundError)}
+
+
+def _restore_error(type_name: Optional[str], message: str) -> BaseException:
+    cls = _RESTORED_ERRORS.get(type_name or "")
+    if cls is None:
+        return ExtractionFailed(message)
+    return cls(message.split(": ", 1)[-1])
+
+
+def _settle_guards(
+    framework: str, url: str, probe: Optional[bool], admitted: bool, failure: Optional[BaseException]
+) -> None:
     """
-    规则：输入格式为 “框架+空格+链接”，例如：
-    HTML https://uiverse.io/Na3ar-17/evil-dragon-24
+    把一次提取的结果记入熔断器与负缓存。
+    熔断器只统计取得准入名额之后的浏览器提取，组件不存在（404）不算框架故障；
+    _TRANSIENT_ERRORS 既不计入熔断器（只释放探测名额）也不计入负缓存。
+    """
+    transient = isinstance(failure, _TRANSIENT_ERRORS)
+    if probe is not None:
+        conclusive = (
+            admitted and not transient and not isinstance(failure, ComponentNotFoundError)
+        )
+        ok = failure is None if conclusive else None
+        get_breaker(framework).record(ok, probe, failure)
+    key = cache_key(framework, url)
+    if failure is None:
+        get_negative_cache().record_success(key)
+    elif not transient:
+        get_negative_cache().record_failure(key, failure)
 
-    AI 调用信息：
-    如果用户输入的链接的开头是 “https://uiverse.io/”，那么先识别该前缀后面是否有内容：
-    - 没有内容：不使用 MCP（此处返回说明）
-    - 有内容：根据‘框架’选择对应的 MCP 实现提取代码
+
+async def _browser_extract(url: str, framework: str, deadline: Deadline) -> Dict[str, str]:
+    """在工作进程（UIVERSE_WORKERS > 0）或本进程中执行浏览器提取。"""
+    if WORKERS > 0:
+        return await get_worker_pool().extract(url, framework, deadline)
+    from extractor_engine import extract
+
+    return await extract(url, framework, deadline)
+
+
+async def _browser_extract_many(
+    url: str, frameworks: List[str], deadline: Deadline
+) -> Dict[str, Dict[str, Any]]:
+    if WORKERS > 0:
+        return await get_worker_pool().extract_many(url, frameworks, deadline)
+    from extractor_engine import extract_many
+
+    return await extract_many(url, frameworks, deadline)
+
+
+def _record_extraction(
+    framework: str, url: str, source: str, outcome: str, deadline: Deadline
+) -> None:
+    """记录一次提取的计数、耗时直方图，以及带步骤明细的最近追踪。"""
+    EXTRACTIONS.inc(framework=framework, source=source, outcome=outcome)
+    EXTRACT_SECONDS.observe(deadline.elapsed_s, framework=framework, source=source)
+    if deadline.spans:
+        get_registry().add_trace(
+            {
+                "framework": framework,
+                "url": url,
+                "source": source,
+                "outcome": outcome,
+                "elapsed_s": round(deadline.elapsed_s, 3),
+                "spans": deadline.spans,
+            }
+        )
+
+
+def _has_code(fields: Dict[str, str]) -> bool:
+    """至少有一个代码字段非空时才认为提取成功（失败结果不写入缓存）。"""
+    return any((value or "").strip() for name, value in fields.items() if name != "notes")
+
+
+def _render(
+    framework: str,
+    url: str,
+    fields: Dict[str, str],
+    output: str,
+    postprocessed: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """postprocessed 为后处理报告（见 postprocess.report），仅 output="json" 时附在结果中。"""
+    if output == "json":
+        result = structured(framework, url, fields)
+        if postprocessed is not None:
+            result["postprocess"] = postprocessed
+        return result
+    return get_profile(framework).render(fields)
+
+
+def _render_all(
+    url: str, found: Dict[str, Dict[str, str]], output: str, steps: Tuple[str, ...]
+) -> Dict[str, Any]:
+    """渲染 {框架: 字段}；选了后处理步骤时先处理（结果缓存中保留原始代码）。"""
+    reports: Dict[str, Dict[str, Any]] = {}
+    if steps:
+        found, reports = postprocess_results(found, steps)
+    return {
+        name: _render(name, url, fields, output, reports.get(name))
+        for name, fields in found.items()
+    }
+
+
+async def _store_result(framework: str, url: str, fields: Dict[str, str]) -> None:
+    """写入结果缓存并增量更新组件索引；索引失败不影响提取结果。"""
+    await get_result_cache().set(framework, url, fields)
+    try:
+        await get_component_index().add(framework, url, fields)
+    except Exception:
+        logger.exception("更新组件索引失败: %s %s", framework, url)
+
+
+def _forget_flight(key: str, deadline: Deadline) -> None:
+    if _flight_deadlines.get(key) is deadline:
+        del _flight_deadlines[key]
+
+
+async def _cached_extract(
+    framework: str,
+    url: str,
+    force_refresh: bool = False,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: Optional[Deadline] = None,
+    progress: Optional[ProgressListener] = None,
+) -> Dict[str, str]:
+    """
+    在 _dispatch_extract 之前查询结果缓存；force_refresh 时跳过缓存并覆盖旧结果。
+    未命中时，同一 (框架, 链接) 的并发请求共用一次浏览器提取：共享任务使用自己的 Deadline，
+    到期时间取等待者中最晚的一个、优先级取最高的一个，晚到的等待者加入时随之延长与提升；
+    每个等待者只按自己的时限等待。
+    progress 订阅本请求的阶段事件，以及共享任务的事件（晚到时含已发生的部分结果）。
     """
+    deadline = deadline or Deadline()
+    if progress is not None:
+        deadline.subscribe(progress)
+    try:
+        cache = get_result_cache()
+        if not force_refresh:
+            cached = await cache.get(framework, url)
+            if cached is not None:
+                deadline.report("cache", framework=get_profile(framework).name)
+                _record_extraction(get_profile(framework).name, url, "cache", "ok", deadline)
+                return cached
+            # 最近反复失败的组件直接拒绝，不再走一遍超时与回退
+            get_negative_cache().check(cache_key(framework, url))
+
+        async def extract_and_store(flight: Deadline) -> Dict[str, str]:
+            fields = await _dispatch_extract(framework, url, priority, flight)
+            if _has_code(fields):
+                await _store_result(framework, url, fields)
+            return fields
+
+        key = cache_key(framework, url)
+        flight = _flight_deadlines.get(key) or Deadline.shared(deadline)
+        task, started = _inflight.start(key, lambda: extract_and_store(flight))
+        if started:
+            # 记录随共享任务结束而清除，发起者先取消或超时也不影响后来者订阅与共用时限
+            _flight_deadlines[key] = flight
+            task.add_done_callback(lambda _: _forget_flight(key, flight))
+        else:
+            flight.extend(deadline)
+            get_scheduler().promote(flight, priority)
+        if progress is not None:
+            flight.subscribe(progress)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining_s)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"请求超过时限 {deadline.budget_s:g} 秒") from None
+        finally:
+            if progress is not None:
+                flight.unsubscribe(progress)
+    finally:
+        if progress is not None:
+            deadline.unsubscribe(progress)
+
+
+async def _is_cached_query(query: str) -> bool:
+    """该查询是否命中结果缓存；批量提取据此让缓存命中项跳过域名限速。"""
+    try:
+        framework, url = _parse_query(query)
+        framework = _canonical_framework(framework)
+    except Exception:
+        return False
+    return await get_result_cache().get(framework, url) is not None
+
+
+def _parse_query(query: str) -> Tuple[str, str]:
+    """把 “框架+空格+链接” 拆分为 (框架, 链接)，并校验链接前缀。"""
     if not query or not isinstance(query, str):
         raise ValueError("输入不能为空，格式应为：<框架> <链接>")
 
@@ -68,15 +493,341 @@ async def parse_and_extract(query: str) -> str:
 
     if not _is_valid_uiverse_link(url):
         raise ValueError("链接必须以 https://uiverse.io/ 开头")
+    return framework, url
+
+
+async def _extract_query(
+    query: str,
+    force_refresh: bool = False,
+    priority: int = PRIORITY_INTERACTIVE,
+    output: str = "markdown",
+    deadline_s: Optional[float] = None,
+    progress: Optional[ProgressListener] = None,
+    postprocess: Optional[List[str]] = None,
+) -> Any:
+    """
+    解析 “框架+空格+链接” 并提取，返回单行 Markdown（output="json" 时返回结构化结果）。
+    deadline_s 为整个请求的时限（秒），默认取 UIVERSE_DEADLINE_S；progress 见 _cached_extract；
+    postprocess 为后处理步骤（见 postprocess.py）。
+    """
+    deadline = Deadline(deadline_s)
+    output = check_output(output)
+    steps = check_steps(postprocess)
+    framework, url = _parse_query(query)
 
     if not _has_path_after_prefix(url):
         # 不使用 MCP 的分支：直接返回说明
         return "> 链接没有指定组件路径，不执行提取。"
 
+    framework = _canonical_framework(framework)
     # 调度到具体实现（直接 await，避免在已运行的事件循环中再次调用 asyncio.run）
-    md = await _dispatch_extract(framework, url)
-    # 再次兜底清洗，移除输出中的 \r 与 \n
-    return md.replace("\r", " ").replace("\n", " ")
+    fields = await _cached_extract(framework, url, force_refresh, priority, deadline, progress)
+    return _render_all(url, {framework: fields}, output, steps)[framework]
+
+
+@mcp.tool()
+async def parse_and_extract(
+    query: str,
+    force_refresh: bool = False,
+    output: str = "markdown",
+    deadline_s: Optional[float] = None,
+    postprocess: Optional[List[str]] = None,
+    ctx: Context = None,
+) -> Any:
+    """
+    规则：输入格式为 “框架+空格+链接”，例如：
+    HTML https://uiverse.io/Na3ar-17/evil-dragon-24
+
+    AI 调用信息：
+    如果用户输入的链接的开头是 “https://uiverse.io/”，那么先识别该前缀后面是否有内容：
+    - 没有内容：不使用 MCP（此处返回说明）
+    - 有内容：根据‘框架’选择对应的 MCP 实现提取代码
+
+    结果会被缓存；force_refresh=True 时忽略缓存重新提取。
+
+    output="json" 时返回结构化结果：{"fields": {"html", "css", "tsx", "vue", "notes", ...}}
+    保留原始换行，并附带各字段的字节数与 sha256 哈希；过大的字段为 null 并列在 "chunked" 中，
+    用 get_result_chunk 分块读取。
+
+    deadline_s 为整个请求（排队、导航、点击、复制）的时限（秒），默认 UIVERSE_DEADLINE_S。
+
+    请求带 progressToken 时，每个阶段（排队、打开页面、选中框架、取得某个字段、改用回退读取）
+    发送一次进度通知，长时间无新阶段时定期重发；每取得一个字段即以日志消息推送该字段
+    （{"query", "partial": true, "framework", "field", "bytes", "code"}），无需等待其余字段。
+
+    postprocess 为可选的后处理步骤，减少返回代码的体积：
+    "strip_comments"（去注释）、"minify"（压缩 CSS 空白）、"dedupe_prefixes"（去掉已有标准写法的
+    -webkit- 等前缀声明与重复声明），或 ["all"]。只处理 CSS 与标记中的 <style> 块，tsx / ts 保持原样；
+    output="json" 时附带 "postprocess": {"steps", "bytes_before", "bytes_after", "saved_pct", "fields"}。
+    默认不处理，返回与页面完全一致的代码。
+    """
+    async with _ProgressRelay(ctx, query) as relay:
+        return await _extract_query(
+            query,
+            force_refresh,
+            output=output,
+            deadline_s=deadline_s,
+            progress=relay.listener,
+            postprocess=postprocess,
+        )
+
+
+@mcp.tool()
+async def get_result_chunk(
+    query: str,
+    field: str,
+    offset: int = 0,
+    max_bytes: int = CHUNK_BYTES,
+    postprocess: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    分块读取结构化结果中的一个字段，query 格式与 parse_and_extract 相同，例如：
+    query="HTML https://uiverse.io/Na3ar-17/evil-dragon-24", field="css", offset=0
+
+    按 UTF-8 字节偏移读取，返回 {"field", "offset", "next_offset", "total_bytes", "hash", "data"}；
+    next_offset 为 null 表示已读完。优先读取结果缓存，未缓存时先提取一次。
+    postprocess 须与取得该结果时所用的相同，偏移与哈希才能对应。
+    """
+    steps = check_steps(postprocess)
+    framework, url = _parse_query(query)
+    if not _has_path_after_prefix(url):
+        raise ValueError("链接没有指定组件路径，不执行提取。")
+    framework = _canonical_framework(framework)
+    fields = await _cached_extract(framework, url)
+    if steps:
+        fields = postprocess_results({framework: fields}, steps)[0][framework]
+    return read_chunk(fields, field, offset, max_bytes)
+
+
+@mcp.tool()
+async def batch_extract(
+    queries: List[str],
+    concurrency: int = BATCH_CONCURRENCY,
+    force_refresh: bool = False,
+    output: str = "markdown",
+    deadline_s: Optional[float] = None,
+    postprocess: Optional[List[str]] = None,
+    ctx: Context = None,
+) -> Dict[str, Any]:
+    """
+    批量提取，每一项格式与 parse_and_extract 相同，例如：
+    ["HTML https://uiverse.io/Na3ar-17/evil-dragon-24", "Vue https://uiverse.io/a/b"]
+
+    共用浏览器，最多 concurrency 项并发，并按域名限速。
+    每完成一项即通过进度通知与日志推送该项结果（含错误），最终按输入顺序返回全部结果。
+    output、postprocess 与 parse_and_extract 相同；deadline_s 为每一项的时限。
+    """
+    output = check_output(output)
+    check_steps(postprocess)
+    items: List[Dict[str, Any]] = []
+
+    async def extract(query: str) -> Any:
+        return await _extract_query(
+            query, force_refresh, PRIORITY_BATCH, output, deadline_s, postprocess=postprocess
+        )
+
+    is_cached = None if force_refresh else _is_cached_query
+    async for item in run_batch(queries, extract, concurrency=concurrency, is_cached=is_cached):
+        items.append(item)
+        if ctx is not None:
+            await ctx.report_progress(len(items), len(queries), item["query"])
+            await ctx.info(json.dumps(item, ensure_ascii=False))
+
+    items.sort(key=lambda item: item["index"])
+    succeeded = sum(1 for item in items if item["ok"])
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "items": items,
+    }
+
+
+@mcp.tool()
+async def extract_all_frameworks(
+    url: str,
+    frameworks: Optional[List[str]] = None,
+    force_refresh: bool = False,
+    output: str = "markdown",
+    deadline_s: Optional[float] = None,
+    postprocess: Optional[List[str]] = None,
+    ctx: Context = None,
+) -> Dict[str, Any]:
+    """
+    一次页面加载提取多个框架的代码，例如：
+    url="https://uiverse.io/Na3ar-17/evil-dragon-24", frameworks=["HTML", "React", "Vue"]
+
+    frameworks 为空时提取全部支持的框架。已缓存的框架直接返回，其余框架共用一次页面加载。
+    返回 {"url", "results": {框架: 单行 Markdown}, "errors": {框架: 错误信息}}；
+    output="json" 时 results 中每项为与 parse_and_extract 相同的结构化结果。
+    deadline_s 为整次调用的时限（秒），所有框架共用。
+    进度通知与部分结果与 parse_and_extract 相同，每个框架的各字段取得后即推送。
+    postprocess 与 parse_and_extract 相同，另可选 "dedupe_shared"：其他框架代码的 <style> 中
+    与 HTML 的 CSS 相同的内容替换为 /* = HTML css */（需同时提取 HTML）。
+    """
+    async with _ProgressRelay(ctx, url) as relay:
+        return await _extract_all_frameworks(
+            url,
+            frameworks,
+            force_refresh,
+            output,
+            Deadline(deadline_s),
+            relay.listener,
+            check_steps(postprocess),
+        )
+
+
+async def _extract_all_frameworks(
+    url: str,
+    frameworks: Optional[List[str]],
+    force_refresh: bool,
+    output: str,
+    deadline: Deadline,
+    progress: Optional[ProgressListener],
+    steps: Tuple[str, ...] = (),
+) -> Dict[str, Any]:
+    if progress is not None:
+        deadline.subscribe(progress)
+    output = check_output(output)
+    if not _is_valid_uiverse_link(url):
+        raise ValueError("链接必须以 https://uiverse.io/ 开头")
+    if not _has_path_after_prefix(url):
+        raise ValueError("链接没有指定组件路径，不执行提取。")
+
+    requested = frameworks or SUPPORTED_FRAMEWORKS
+    names = list(dict.fromkeys(_canonical_framework(name) for name in requested))
+    cache = get_result_cache()
+    found: Dict[str, Dict[str, str]] = {}
+    if not force_refresh:
+        for name in names:
+            cached = await cache.get(name, url)
+            if cached is not None:
+                found[name] = cached
+                deadline.report("cache", framework=name)
+
+    if "HTML" in names and "HTML" not in found:
+        with deadline.step("direct_fetch"):
+            fields = await fetch_component_source(url, deadline)
+        if fields:
+            found["HTML"] = fields
+            await _store_result("HTML", url, fields)
+
+    errors: Dict[str, str] = {}
+    # 负缓存命中或已熔断的框架直接记为错误，其余框架共用一次页面加载
+    probes: Dict[str, bool] = {}
+    for name in names:
+        if name in found:
+            continue
+        try:
+            if not force_refresh:
+                get_negative_cache().check(cache_key(name, url))
+            probes[name] = get_breaker(name).admit()
+        except (ComponentUnavailableError, CircuitOpenError) as exc:
+            errors[name] = f"{type(exc).__name__}: {exc}"
+    if probes:
+        admitted = False
+        try:
+            deadline.check("queue")
+            deadline.report("queued")
+            async with get_scheduler().slot(
+                PRIORITY_INTERACTIVE, min(QUEUE_TIMEOUT_S, deadline.remaining_s)
+            ):
+                deadline.report("admitted")
+                admitted = True
+                extracted = await _browser_extract_many(url, list(probes), deadline)
+        except Exception as exc:
+            for name, probe in probes.items():
+                _settle_guards(name, url, probe, admitted, exc)
+            raise
+        except BaseException:
+            # 被取消：只释放探测名额
+            for name, probe in probes.items():
+                get_breaker(name).record(None, probe)
+            raise
+        failures: Dict[str, Optional[BaseException]] = {}
+        errors.update(extracted["errors"])
+        error_types = extracted.get("error_types", {})
+        for name, message in extracted["errors"].items():
+            failures[name] = _restore_error(error_types.get(name), message)
+            _record_extraction(name, url, "browser", "error", deadline)
+        for name, fields in extracted["results"].items():
+            found[name] = fields
+            _record_extraction(
+                name, url, "browser", "ok" if _has_code(fields) else "empty", deadline
+            )
+            failures[name] = None if _has_code(fields) else LookupError(NO_CODE_MESSAGE)
+            if _has_code(fields):
+                await _store_result(name, url, fields)
+        for name, probe in probes.items():
+            if name in failures:
+                _settle_guards(name, url, probe, admitted, failures[name])
+            else:
+                get_breaker(name).record(None, probe)
+
+    results = _render_all(url, {name: found[name] for name in names if name in found}, output, steps)
+    return {"url": url, "results": results, "errors": errors}
+
+
+@mcp.tool()
+async def search_components(
+    query: str, framework: Optional[str] = None, limit: int = SEARCH_LIMIT
+) -> Dict[str, Any]:
+    """
+    在本地已提取的组件中全文检索，不访问 uiverse.io，例如：query="a glowing toggle switch in Vue"
+
+    检索范围包括组件名、作者、框架、由代码推断的标签（toggle、glow、gradient、animation ...）、
+    class 名、CSS 属性与代码本身；查询中出现的框架名会作为过滤条件，framework 参数优先。
+    返回 {"query", "framework", "indexed"（已索引条数）, "results": [{"url", "author", "name",
+    "framework", "tags", "bytes", "hash", "snippet", "score"}], "elapsed_ms"}。
+    命中的 url 可直接交给 parse_and_extract（通常命中结果缓存）。
+    """
+    if framework:
+        framework = _canonical_framework(framework)
+    return await get_component_index().search(query, framework, limit)
+
+
+@mcp.tool()
+def get_queue_stats() -> Dict[str, Any]:
+    """
+    返回准入队列状态：进行中的浏览器提取数与上限、排队深度与上限、
+    累计准入/拒绝/超时次数以及排队等待时间（平均、p95、最大），用于评估主机容量。
+    工作进程模式下另含 workers：进程数、存活数、进行中任务数与累计任务数。
+    guards 为负缓存条目数与各框架熔断器的状态（closed / open / half_open）、最近失败率与错误。
+    """
+    stats = get_scheduler().stats()
+    stats["guards"] = failure_guard.stats()
+    if WORKERS > 0:
+        stats["workers"] = get_worker_pool().stats()
+    return stats
+
+
+@mcp.tool()
+def get_stats() -> Dict[str, Any]:
+    """
+    返回内置指标，供 stdio 部署使用（SSE / HTTP 部署另有 /metrics 端点）：
+    - metrics：按框架与来源（cache/direct/browser）的提取次数与耗时直方图、各步骤耗时、
+      代码读取途径、Copy 重试、缓存命中层级、浏览器启动次数与耗时
+    - collected：准入队列、请求过滤、各步骤当前超时
+    - step_latencies：各步骤最近成功耗时的 p50/p95 与自适应超时
+    - recent_traces：最近的浏览器/直连提取的步骤明细
+    """
+    stats = get_registry().snapshot()
+    stats["step_latencies"] = get_step_latencies().stats()
+    return stats
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus 文本格式的指标（仅 SSE / streamable-http 传输下可用）。"""
+    return PlainTextResponse(
+        get_registry().render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@mcp.tool()
+def get_request_filter_stats() -> Dict[str, Any]:
+    """返回请求过滤统计：放行/拦截的请求数、按原因分类的拦截数、估算节省的字节数，以及资源缓存的命中情况。"""
+    return {**request_filter.totals(), "asset_cache": get_asset_cache().stats()}
 
 
 @mcp.tool()
@@ -87,4 +838,13 @@ def list_supported_frameworks() -> str:
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    # 打包后的可执行文件以 spawn 方式启动工作进程时需要
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Uiverse 组件代码提取 MCP 服务")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=os.environ.get("UIVERSE_TRANSPORT", "stdio"),
+        help="传输方式；sse / streamable-http 下同时提供 /metrics",
+    )
+    mcp.run(transport=parser.parse_args().transport)
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""
+静态资源缓存：在请求拦截中复用 Uiverse 应用外壳的 JS / CSS，避免每次提取都重新下载。
+
+- 内容寻址存储：正文按 sha256 保存为文件，多个 URL 指向同一内容时只存一份；
+  URL 索引（状态码、响应头、ETag / Last-Modified）保存在 SQLite 中
+- 文件名带内容哈希的构建产物（如 /build/_shared/chunk-4FGHJ7KL.js）或响应声明
+  Cache-Control: immutable 的资源视为不可变，命中时直接 route.fulfill，不发网络请求
+- 其余脚本 / 样式表带 If-None-Match / If-Modified-Since 向服务器校验，304 时用本地正文应答
+- 组件页面本身与 XHR / fetch 数据请求不缓存，始终走网络
+- 正文总大小超过 ASSET_CACHE_MAX_BYTES 时按最近访问时间淘汰
+
+UIVERSE_ASSET_CACHE 取值：
+- on（默认）：如上
+- off：不缓存
+- record：额外录制所有放行的 GET 响应（含页面与数据请求），录制条目不参与淘汰
+- replay：完全离线，只用已录制的响应应答，未录制的请求与非 GET 请求直接中止；直连快速路径也只读录制内容
+
+多个工作进程共用同一个 SQLite 文件，读取时遇到 “database is locked” 等错误按未缓存处理，
+请求交还浏览器走网络（replay 模式下中止），不会使提取失败。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import get_registry
+from result_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+MODE_ON = "on"
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+ASSET_CACHE_MODE = os.environ.get("UIVERSE_ASSET_CACHE", MODE_ON).strip().lower()
+ASSET_CACHE_DIR = os.environ.get("UIVERSE_ASSET_CACHE_DIR", os.path.join(CACHE_DIR, "assets"))
+ASSET_CACHE_MAX_BYTES = int(float(os.environ.get("UIVERSE_ASSET_CACHE_MB", "256")) * 1024 * 1024)
+
+CACHEABLE_TYPES = frozenset({"script", "stylesheet"})
+# 构建工具生成的文件名哈希：至少 8 位且含数字，例如 root-4FGHJ7KL.css、main.3f9a1c2be.js
+_HASHED_ASSET_RE = re.compile(r"[-.](?=[A-Za-z0-9_]*\d)[A-Za-z0-9_]{8,}\.(?:m?js|css)$")
+# 回放 / 命中时随正文返回的响应头
+_KEPT_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "content-language")
+
+_ASSET_REQUESTS = get_registry().counter(
+    "uiverse_asset_cache_requests_total", "Asset cache lookups by result"
+)
+_ASSET_BYTES_SERVED = get_registry().counter(
+    "uiverse_asset_cache_bytes_served_total", "Response bytes served from the asset cache"
+)
+
+
+def is_immutable(url: str, headers: Optional[Dict[str, str]] = None) -> bool:
+    """文件名带内容哈希，或响应声明 immutable 的资源在缓存期内不会变化。"""
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    if _HASHED_ASSET_RE.search(path):
+        return True
+    cache_control = (headers or {}).get("cache-control", "").lower()
+    return "immutable" in cache_control
+
+
+def _kept_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    return {k: v for k, v in ((k.lower(), v) for k, v in headers.items()) if k in _KEPT_HEADERS}
+
+
+class AssetCache:
+    def __init__(self, root: str = ASSET_CACHE_DIR, mode: str = ASSET_CACHE_MODE,
+                 max_bytes: int = ASSET_CACHE_MAX_BYTES):
+        if mode not in (MODE_ON, MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            logger.warning("未知的 UIVERSE_ASSET_CACHE=%r，按 on 处理", mode)
+            mode = MODE_ON
+        self.mode = mode
+        self._root = root
+        self._max_bytes = max(0, max_bytes)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stored = 0
+        self.bytes_served = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    # ---- 存储 ----
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self._root, exist_ok=True)
+            db = sqlite3.connect(os.path.join(self._root, "assets.sqlite3"), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                " url TEXT PRIMARY KEY,"
+                " digest TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " immutable INTEGER NOT NULL,"
+                " pinned INTEGER NOT NULL DEFAULT 0,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS assets_accessed ON assets(accessed_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS assets_digest ON assets(digest)")
+            self._db = db
+        return self._db
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._root, "blobs", digest[:2], digest)
+
+    def _lookup(self, url: str) -> Optional[Tuple[int, Dict[str, str], bool, bytes]]:
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT digest, status, headers, immutable FROM assets WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._blob_path(row[0]), "rb") as fp:
+                    body = fp.read()
+            except OSError:
+                db.execute("DELETE FROM assets WHERE url = ?", (url,))
+                db.commit()
+                return None
+            db.execute("UPDATE assets SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+            return row[1], json.loads(row[2]), bool(row[3]), body
+
+    def _store(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+               immutable: bool, pinned: bool) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fp:
+                fp.write(body)
+            os.replace(tmp, path)
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO assets"
+                " (url, digest, size, status, headers, immutable, pinned, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(body), status, json.dumps(headers), int(immutable),
+                 int(pinned), now, now),
+            )
+            db.commit()
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """正文总大小（按不同内容计）超过上限时，淘汰最久未访问的未录制条目。"""
+        total = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM assets)"
+        ).fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        rows = db.execute(
+            "SELECT url, digest, size FROM assets WHERE pinned = 0 ORDER BY accessed_at"
+        ).fetchall()
+        for url, digest, size in rows:
+            if total <= self._max_bytes:
+                break
+            db.execute("DELETE FROM assets WHERE url = ?", (url,))
+            if db.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                continue
+            total -= size
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+        db.commit()
+
+    async def lookup(self, url: str) -> Optional[Tuple[int, Dict[str, str], bool, bytes]]:
+        """返回 (状态码, 响应头, 是否不可变, 正文)；未缓存时返回 None。"""
+        return await asyncio.to_thread(self._lookup, url)
+
+    async def store(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+                    immutable: bool = False, pinned: bool = False) -> None:
+        try:
+            await asyncio.to_thread(
+                self._store, url, status, _kept_headers(headers), body, immutable, pinned
+            )
+            self.stored += 1
+        except (OSError, sqlite3.Error):
+            logger.exception("写入资源缓存失败: %s", url)
+
+    def _served(self, result: str, size: int) -> None:
+        _ASSET_REQUESTS.inc(result=result)
+        _ASSET_BYTES_SERVED.inc(size)
+        self.bytes_served += size
+
+    # ---- 请求拦截 ----
+
+    def handles(self, request) -> bool:
+        if not self.enabled or request.method != "GET":
+            return False
+        return self.mode != MODE_ON or request.resource_type in CACHEABLE_TYPES
+
+    async def handle(self, route, request) -> None:
+        """由 RequestFilter 对放行的请求调用：命中则本地应答，否则取回并写入缓存。"""
+        url = request.url
+        if not self.handles(request):
+            if self.mode == MODE_REPLAY:
+                # 离线回放：非 GET 请求同样不能访问网络
+                _ASSET_REQUESTS.inc(result="replay-miss")
+                await route.abort("internetdisconnected")
+            else:
+                await route.continue_()
+            return
+        try:
+            cached = await self.lookup(url)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("读取资源缓存失败（%s），交还浏览器处理: %s", exc, url)
+            _ASSET_REQUESTS.inc(result="error")
+            if self.mode == MODE_REPLAY:
+                await route.abort("internetdisconnected")
+            else:
+                await route.continue_()
+            return
+        if self.mode == MODE_REPLAY:
+            if cached is None:
+                self.misses += 1
+                _ASSET_REQUESTS.inc(result="replay-miss")
+                await route.abort("internetdisconnected")
+                return
+            status, headers, _, body = cached
+            self.hits += 1
+            self._served("replay", len(body))
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        if cached is not None and cached[2]:
+            status, headers, _, body = cached
+            self.hits += 1
+            self._served("hit", len(body))
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        fetch_headers = None
+        if cached is not None:
+            validators = {}
+            if "etag" in cached[1]:
+                validators["if-none-match"] = cached[1]["etag"]
+            if "last-modified" in cached[1]:
+                validators["if-modified-since"] = cached[1]["last-modified"]
+            if validators:
+                fetch_headers = {**request.headers, **validators}
+        try:
+            response = await route.fetch(headers=fetch_headers)
+        except Exception:
+            # 页面已关闭或网络错误：交还给浏览器自行处理
+            await route.continue_()
+            return
+        if response.status == 304 and cached is not None:
+            status, headers, _, body = cached
+            self.revalidated += 1
+            self._served("revalidated", len(body))
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        self.misses += 1
+        _ASSET_REQUESTS.inc(result="miss")
+        body = await response.body()
+        if response.status == 200:
+            headers = response.headers
+            await self.store(
+                url, response.status, headers, body,
+                immutable=is_immutable(url, headers),
+                pinned=self.mode == MODE_RECORD,
+            )
+        await route.fulfill(response=response, body=body)
+
+    def merge_stats(self, delta: Dict[str, Any]) -> None:
+        """并入工作进程回传的计数增量（见 metrics.diff_numbers）。"""
+        for name in ("hits", "revalidated", "misses", "stored", "bytes_served"):
+            setattr(self, name, getattr(self, name) + delta.get(name, 0))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stored": self.stored,
+            "bytes_served": self.bytes_served,
+        }
+
+
+_cache: Optional[AssetCache] = None
+
+
+def get_asset_cache() -> AssetCache:
+    global _cache
+    if _cache is None:
+        _cache = AssetCache()
+    return _cache
@@ -0,0 +1,133 @@
+"""
+批量提取：并发受限、按域名限速，结果按完成顺序流式产出。
+
+命令行用法（每行一个 “框架 链接”，结果以 JSON Lines 逐条输出）：
+    uv run batch.py queries.txt --concurrency 4
+    cat queries.txt | uv run batch.py -
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+BATCH_CONCURRENCY = int(os.environ.get("UIVERSE_BATCH_CONCURRENCY", "4"))
+HOST_MIN_INTERVAL_S = float(os.environ.get("UIVERSE_HOST_MIN_INTERVAL_S", "0.5"))
+
+
+class HostRateLimiter:
+    """同一域名相邻两次请求之间至少间隔 min_interval_s 秒。"""
+
+    def __init__(self, min_interval_s: float = HOST_MIN_INTERVAL_S):
+        self._min_interval_s = max(0.0, min_interval_s)
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, url: str) -> None:
+        if self._min_interval_s == 0:
+            return
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        # 先预约时间片再睡眠，并发调用者依次排开，无需加锁
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + self._min_interval_s
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def run_batch(
+    queries: List[str],
+    extract: Callable[[str], Awaitable[Any]],
+    concurrency: int = BATCH_CONCURRENCY,
+    min_interval_s: float = HOST_MIN_INTERVAL_S,
+    is_cached: Optional[Callable[[str], Awaitable[bool]]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    对每个 “框架 链接” 调用 extract，按完成顺序产出：
+    {"index", "query", "ok", "result" 或 "error", "elapsed_s"}。单项失败不会中断整批。
+    is_cached 判断某项是否命中结果缓存；命中的项不访问网络，不参与域名限速。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = HostRateLimiter(min_interval_s)
+
+    async def run_one(index: int, query: str) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"index": index, "query": query}
+        start = time.perf_counter()
+        try:
+            async with semaphore:
+                if is_cached is None or not await is_cached(query):
+                    await limiter.wait(query.strip().split()[-1] if query.strip() else "")
+                item["result"] = await extract(query)
+            item["ok"] = True
+        except Exception as exc:
+            item["ok"] = False
+            item["error"] = f"{type(exc).__name__}: {exc}"
+        item["elapsed_s"] = round(time.perf_counter() - start, 3)
+        return item
+
+    tasks = [asyncio.ensure_future(run_one(i, q)) for i, q in enumerate(queries)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _read_queries(source: str) -> List[str]:
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    with stream:
+        return [line.strip() for line in stream if line.strip() and not line.startswith("#")]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    # 延迟导入，避免与 app 循环引用
+    from app import _extract_query, _is_cached_query
+    from browser_pool import get_browser_manager
+    from direct_fetch import close_client
+    from scheduler import PRIORITY_BATCH
+    from worker_pool import WORKERS, get_worker_pool
+
+    queries = _read_queries(args.input)
+
+    async def extract(query: str) -> Any:
+        return await _extract_query(
+            query, args.force_refresh, PRIORITY_BATCH, args.output, args.deadline
+        )
+
+    failed = 0
+    try:
+        is_cached = None if args.force_refresh else _is_cached_query
+        async for item in run_batch(
+            queries, extract, args.concurrency, args.interval, is_cached
+        ):
+            failed += not item["ok"]
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+    finally:
+        await get_browser_manager().close()
+        await close_client()
+        if WORKERS > 0:
+            await get_worker_pool().close()
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="批量提取 Uiverse 组件代码")
+    parser.add_argument("input", help="查询文件，每行 “框架 链接”；- 表示标准输入")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument(
+        "--interval", type=float, default=HOST_MIN_INTERVAL_S, help="同一域名的最小请求间隔（秒）"
+    )
+    parser.add_argument("--force-refresh", action="store_true", help="忽略结果缓存")
+    parser.add_argument("--deadline", type=float, default=None, help="每一项的时限（秒）")
+    parser.add_argument(
+        "--output", choices=("markdown", "json"), default="markdown", help="结果格式（json 保留换行）"
+    )
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+离线基准测试：在本地替身站点（standin_site.py）上测量各框架提取器，不访问 uiverse.io。
+
+每个框架依次测量：
+- 冷启动：关闭浏览器管理器后的第一次提取（含 Playwright / Chromium 启动）
+- 热态：浏览器与页面池就绪后的顺序提取，给出 p50 / p95
+- 吞吐：对每个并发度 N 同时发起 --requests 次提取，给出总耗时、每秒请求数与延迟分位
+- 资源：测量期间本进程及其子进程的峰值 RSS 与 Chromium 进程数（读取 /proc，仅 Linux）
+
+另外测量服务启动（--startup-runs 次取 p50）：解释器启动、import app、以 stdio 启动 app.py
+到完成 MCP 握手，以及握手后首次调用 list_supported_frameworks 的耗时。
+
+提取结果与站点上的源代码逐字段比对，不一致计为 incorrect。报告为 JSON，
+--compare 可与另一份报告对比 p50 / p95 / 吞吐的变化。
+
+命令行用法：
+    uv run benchmark.py --frameworks HTML React --concurrency 1 4 8 -o report.json
+    uv run benchmark.py --embed-state --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from typing import Any, Dict, List, Optional, Tuple
+
+from standin_site import FRAMEWORK_LANGUAGES, StandinSite, load_components
+
+SAMPLE_INTERVAL_S = 0.1
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_CHROMIUM_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def _proc_table() -> Dict[int, Tuple[int, str, int]]:
+    """{pid: (ppid, 进程名, RSS 字节)}；非 Linux 返回空表。"""
+    table = {}
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else ():
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as fp:
+                stat = fp.read()
+            with open(f"/proc/{entry}/statm", encoding="utf-8") as fp:
+                rss_pages = int(fp.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        # 进程名可能含空格，以最后一个 ")" 为界
+        name = stat[stat.index("(") + 1 : stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2 :].split()[1])
+        table[int(entry)] = (ppid, name, rss_pages * page_size)
+    return table
+
+
+def sample_resources() -> Optional[Dict[str, int]]:
+    """本进程及全部子孙进程的 RSS 总和与其中 Chromium 进程数；无法读取时返回 None。"""
+    table = _proc_table()
+    root = os.getpid()
+    if root not in table:
+        return None
+    children: Dict[int, List[int]] = {}
+    for pid, (ppid, _, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    rss, chromium, stack = 0, 0, [root]
+    while stack:
+        pid = stack.pop()
+        _, name, pid_rss = table[pid]
+        rss += pid_rss
+        chromium += pid != root and any(n in name.lower() for n in _CHROMIUM_NAMES)
+        stack.extend(children.get(pid, ()))
+    return {"rss_bytes": rss, "chromium_processes": chromium}
+
+
+class ResourceSampler:
+    """后台定时采样，记录峰值 RSS 与峰值 Chromium 进程数。"""
+
+    def __init__(self, interval_s: float = SAMPLE_INTERVAL_S):
+        self._interval_s = interval_s
+        self._task: Optional[asyncio.Task] = None
+        self.peak_rss_bytes: Optional[int] = None
+        self.peak_chromium_processes: Optional[int] = None
+
+    def _sample(self) -> None:
+        sample = sample_resources()
+        if sample is None:
+            return
+        self.peak_rss_bytes = max(self.peak_rss_bytes or 0, sample["rss_bytes"])
+        self.peak_chromium_processes = max(
+            self.peak_chromium_processes or 0, sample["chromium_processes"]
+        )
+
+    async def _loop(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self._interval_s)
+
+    async def __aenter__(self) -> "ResourceSampler":
+        self._task = asyncio.create_task(self._loop())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._sample()
+
+    def report(self) -> Dict[str, Optional[float]]:
+        return {
+            "peak_rss_mb": None
+            if self.peak_rss_bytes is None
+            else round(self.peak_rss_bytes / 1024 / 1024, 1),
+            "peak_chromium_processes": self.peak_chromium_processes,
+        }
+
+
+def expected_fields(component: Dict[str, Any], framework: str) -> Dict[str, str]:
+    if framework == "HTML":
+        return {"html": component["html"], "css": component["css"]}
+    return {FRAMEWORK_LANGUAGES[framework]: component["frameworks"].get(framework, "")}
+
+
+def is_correct(fields: Dict[str, str], expected: Dict[str, str]) -> bool:
+    return all((fields.get(name) or "").strip() == code.strip() for name, code in expected.items())
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    from metrics import percentile
+
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+    }
+
+
+class Runner:
+    """对替身站点发起提取并核对结果；走调度器与快速路径，但不经过结果缓存。"""
+
+    def __init__(self, site: StandinSite, framework: str, deadline_s: Optional[float]):
+        self.site = site
+        self.framework = framework
+        self.deadline_s = deadline_s
+
+    async def run_one(self, url: str) -> Tuple[float, Optional[bool], Optional[str]]:
+        """返回 (耗时秒, 结果是否正确, 错误)；出错时正确性为 None。"""
+        from app import _dispatch_extract
+        from deadline import Deadline
+        from scheduler import PRIORITY_BATCH
+
+        start = time.perf_counter()
+        try:
+            fields = await _dispatch_extract(
+                self.framework, url, PRIORITY_BATCH, Deadline(self.deadline_s)
+            )
+        except Exception as exc:
+            return time.perf_counter() - start, None, f"{type(exc).__name__}: {exc}"
+        expected = expected_fields(self.site.component_for(url), self.framework)
+        return time.perf_counter() - start, is_correct(fields, expected), None
+
+    async def run_many(self, urls: List[str], concurrency: int) -> Dict[str, Any]:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def bounded(url: str):
+            async with semaphore:
+                return await self.run_one(url)
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(bounded(url) for url in urls))
+        wall_s = time.perf_counter() - start
+        errors = [error for _, _, error in outcomes if error]
+        result = {
+            "requests": len(urls),
+            "wall_s": round(wall_s, 3),
+            "requests_per_s": round(len(urls) / wall_s, 2) if wall_s else 0.0,
+            **_latency_summary([elapsed for elapsed, _, _ in outcomes]),
+            "errors": len(errors),
+            "incorrect": sum(1 for _, correct, _ in outcomes if correct is False),
+        }
+        if errors:
+            result["first_error"] = errors[0]
+        return result
+
+
+async def bench_framework(
+    site: StandinSite, framework: str, args: argparse.Namespace
+) -> Dict[str, Any]:
+    from browser_pool import get_browser_manager
+
+    runner = Runner(site, framework, args.deadline)
+    urls = site.urls()
+    result: Dict[str, Any] = {}
+    async with ResourceSampler() as sampler:
+        # 冷启动：先关闭常驻浏览器，第一次提取需要重新启动 Playwright 与 Chromium
+        await get_browser_manager().close()
+        elapsed, correct, error = await runner.run_one(urls[0])
+        result["cold"] = {"ms": round(elapsed * 1000, 1), "correct": correct, "error": error}
+
+        result["warm"] = await runner.run_many(
+            [urls[i % len(urls)] for i in range(args.warm)], concurrency=1
+        )
+        result["throughput"] = []
+        for concurrency in args.concurrency:
+            requests = [urls[i % len(urls)] for i in range(args.requests)]
+            stats = await runner.run_many(requests, concurrency)
+            result["throughput"].append({"concurrency": concurrency, **stats})
+    result["resources"] = sampler.report()
+    return result
+
+
+def _run_python(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=_APP_DIR, capture_output=True)
+    return time.perf_counter() - start
+
+
+async def _stdio_handshake() -> Tuple[float, float]:
+    """以 stdio 启动 app.py：返回 (到完成握手的秒数, 握手后首次调用轻量工具的秒数)。"""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(
+        command=sys.executable, args=[os.path.join(_APP_DIR, "app.py")], env=dict(os.environ)
+    )
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            handshake_s = time.perf_counter() - start
+            start = time.perf_counter()
+            await session.call_tool("list_supported_frameworks", {})
+            return handshake_s, time.perf_counter() - start
+
+
+async def measure_startup(runs: int) -> Dict[str, Any]:
+    """各阶段多次测量的 p50（毫秒）；import app 后确认没有加载 Playwright。"""
+    samples: Dict[str, List[float]] = {
+        "interpreter_ms": [], "import_app_ms": [], "handshake_ms": [], "first_tool_ms": []
+    }
+    for _ in range(runs):
+        samples["interpreter_ms"].append(await asyncio.to_thread(_run_python, "pass"))
+        samples["import_app_ms"].append(await asyncio.to_thread(_run_python, "import app"))
+        handshake_s, first_tool_s = await _stdio_handshake()
+        samples["handshake_ms"].append(handshake_s)
+        samples["first_tool_ms"].append(first_tool_s)
+    result: Dict[str, Any] = {"runs": runs}
+    for name, values in samples.items():
+        result[name] = _latency_summary(values)["p50_ms"]
+    check = "import sys, app; sys.exit('playwright' in sys.modules)"
+    result["playwright_loaded_at_import"] = (
+        subprocess.run([sys.executable, "-c", check], cwd=_APP_DIR, capture_output=True).returncode
+        != 0
+    )
+    return result
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """逐框架对比热态 p50 / p95 与各并发度的吞吐，返回可读的差异行。"""
+
+    def delta(new: float, old: float) -> str:
+        if not old:
+            return f"{new}"
+        return f"{old} -> {new} ({(new - old) / old * 100:+.1f}%)"
+
+    lines = []
+    if current.get("startup") and baseline.get("startup"):
+        lines.append("startup:")
+        for key in ("import_app_ms", "handshake_ms", "first_tool_ms"):
+            lines.append(f"  {key:<14} {delta(current['startup'][key], baseline['startup'][key])}")
+    for framework, result in current["frameworks"].items():
+        base = baseline.get("frameworks", {}).get(framework)
+        if not base:
+            continue
+        lines.append(f"{framework}:")
+        lines.append(f"  cold ms        {delta(result['cold']['ms'], base['cold']['ms'])}")
+        for key in ("p50_ms", "p95_ms"):
+            lines.append(f"  warm {key:<9} {delta(result['warm'][key], base['warm'][key])}")
+        base_runs = {run["concurrency"]: run for run in base.get("throughput", [])}
+        for run in result["throughput"]:
+            old = base_runs.get(run["concurrency"])
+            if old:
+                lines.append(
+                    f"  c={run['concurrency']:<3} req/s   "
+                    f"{delta(run['requests_per_s'], old['requests_per_s'])}"
+                )
+    return lines
+
+
+def _isolate_state() -> str:
+    """让本次测量使用临时缓存目录并关闭负缓存与熔断器，返回临时目录。
+
+    必须在导入 app 及其依赖模块之前调用：这些设置在模块导入时读取。
+    这样测量既不会写入用户的缓存，也不会因前一次失败被短路而失真。
+    """
+    cache_dir = tempfile.mkdtemp(prefix="uiverse-bench-")
+    os.environ["UIVERSE_CACHE_DIR"] = cache_dir
+    os.environ["UIVERSE_NEGATIVE_TTL_S"] = "0"
+    os.environ["UIVERSE_BREAKER_FAILURE_RATE"] = "0"
+    return cache_dir
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from browser_pool import get_browser_manager
+    from deadline import get_step_latencies
+    from direct_fetch import close_client
+
+    # 每次直连请求都会打一条 httpx 日志，淹没进度输出
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    components = load_components(args.records, args.components, args.size)
+    report: Dict[str, Any] = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "playwright": _package_version("playwright"),
+        "config": {
+            "frameworks": args.frameworks,
+            "components": len(components),
+            "warm": args.warm,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "embed_state": args.embed_state,
+            "convert_delay_ms": args.convert_delay_ms,
+            "response_delay_ms": args.response_delay_ms,
+            "startup_runs": args.startup_runs,
+        },
+        "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith("UIVERSE_")},
+        "frameworks": {},
+    }
+    if args.startup_runs > 0:
+        print("[benchmark] startup ...", file=sys.stderr, flush=True)
+        report["startup"] = await measure_startup(args.startup_runs)
+    failed = 0
+    with StandinSite(
+        components,
+        convert_delay_ms=args.convert_delay_ms,
+        response_delay_ms=args.response_delay_ms,
+        embed_state=args.embed_state,
+    ) as site:
+        try:
+            for framework in args.frameworks:
+                print(f"[benchmark] {framework} ...", file=sys.stderr, flush=True)
+                result = await bench_framework(site, framework, args)
+                report["frameworks"][framework] = result
+                runs = [result["warm"], *result["throughput"]]
+                failed += bool(result["cold"]["error"]) or any(
+                    run["errors"] or run["incorrect"] for run in runs
+                )
+        finally:
+            await get_browser_manager().close()
+            await close_client()
+        report["site_requests"] = site.requests
+    report["step_latencies"] = get_step_latencies().stats()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        print("\n".join(compare_reports(report, baseline)), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="在本地替身站点上对提取器做基准测试")
+    parser.add_argument(
+        "--frameworks",
+        nargs="+",
+        default=["HTML", *FRAMEWORK_LANGUAGES],
+        choices=["HTML", *FRAMEWORK_LANGUAGES],
+    )
+    parser.add_argument("--components", type=int, default=20, help="合成组件数量")
+    parser.add_argument("--size", type=int, default=1, help="合成组件代码体积倍数")
+    parser.add_argument("--records", default=None, help="录制组件 JSON 所在目录（优先于合成组件）")
+    parser.add_argument("--warm", type=int, default=10, help="热态顺序提取次数")
+    parser.add_argument("--requests", type=int, default=20, help="每个并发度的请求数")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="并发度列表")
+    parser.add_argument("--embed-state", action="store_true", help="页面内嵌 __remixContext 状态")
+    parser.add_argument("--convert-delay-ms", type=int, default=150, help="弹窗代码出现前的延迟")
+    parser.add_argument("--response-delay-ms", type=int, default=0, help="站点响应延迟")
+    parser.add_argument("--deadline", type=float, default=None, help="每次提取的时限（秒）")
+    parser.add_argument(
+        "--startup-runs", type=int, default=3, help="服务启动测量次数（0 表示跳过）"
+    )
+    parser.add_argument("-o", "--output", default=None, help="报告路径（默认输出到标准输出）")
+    parser.add_argument("--compare", default=None, help="对比的基线报告")
+    args = parser.parse_args()
+    cache_dir = _isolate_state()
+    try:
+        code = asyncio.run(_main(args))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
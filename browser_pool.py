@@ -0,0 +1,298 @@
+"""
+进程级浏览器管理器。
+
+Playwright 只启动一次，常驻若干个 Chromium 实例，按轮询方式为页面创建相互隔离的
+BrowserContext。后台定时做健康检查，浏览器崩溃或断开时自动重启。
+
+在此之上维护一个预热好的页面池：每个页面所在的 context 已授予剪贴板权限、
+设置好 UA/视口并安装了请求拦截，请求拿到页面后只需 page.goto。
+页面归还时会被重置（清空存储与 cookie、关闭对话框），超过使用次数或空闲过久则回收。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+
+import request_filter
+from metrics import BROWSER_LAUNCH_SECONDS, BROWSER_LAUNCHES
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+logger = logging.getLogger(__name__)
+
+BROWSER_COUNT = int(os.environ.get("UIVERSE_BROWSER_COUNT", "1"))
+# 1（默认）：服务启动后在后台预热 Chromium；0：首次提取时才启动浏览器
+PREWARM = os.environ.get("UIVERSE_PREWARM", "1") != "0"
+HEALTH_CHECK_INTERVAL_S = 30
+
+# 页面池参数均可通过环境变量覆盖
+POOL_SIZE = int(os.environ.get("UIVERSE_POOL_SIZE", "2"))
+PAGE_MAX_USES = int(os.environ.get("UIVERSE_PAGE_MAX_USES", "20"))
+PAGE_IDLE_TTL_S = float(os.environ.get("UIVERSE_PAGE_IDLE_TTL_S", "300"))
+PAGE_DEFAULT_TIMEOUT_MS = 20000
+
+CONTEXT_OPTIONS = {
+    "permissions": ["clipboard-read", "clipboard-write"],
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "viewport": {"width": 1280, "height": 900},
+}
+
+_RESET_PAGE_JS = """
+async () => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+def _dismiss_dialog(dialog) -> None:
+    asyncio.ensure_future(dialog.dismiss())
+
+
+class BrowserManager:
+    """持有 Playwright 与常驻 Chromium 实例，按轮询方式分发 BrowserContext。"""
+
+    def __init__(self, browser_count: int = BROWSER_COUNT, headless: bool = True):
+        self._browser_count = max(1, browser_count)
+        self._headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Optional[Browser]] = []
+        self._clipboard_locks: Dict[int, asyncio.Lock] = {}
+        self._lock = asyncio.Lock()
+        self._round_robin = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+        self.pages = PagePool(self)
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            # 首次启动时才导入 Playwright，不使用浏览器的进程（如 stdio 握手、缓存命中）无需为其付出导入开销
+            from playwright.async_api import async_playwright
+
+            start = time.monotonic()
+            playwright = await async_playwright().start()
+            try:
+                browsers = [
+                    await playwright.chromium.launch(headless=self._headless)
+                    for _ in range(self._browser_count)
+                ]
+            except Exception:
+                await playwright.stop()
+                raise
+            BROWSER_LAUNCHES.inc(self._browser_count, reason="start")
+            BROWSER_LAUNCH_SECONDS.observe(time.monotonic() - start, reason="start")
+            self._playwright = playwright
+            self._browsers = list(browsers)
+            self._health_task = asyncio.create_task(self._health_loop())
+        await self.pages.start()
+
+    async def close(self) -> None:
+        await self.pages.close()
+        async with self._lock:
+            if self._health_task is not None:
+                self._health_task.cancel()
+                self._health_task = None
+            for browser in self._browsers:
+                if browser is not None:
+                    try:
+                        await browser.close()
+                    except Exception:
+                        pass
+            self._browsers = []
+            self._clipboard_locks.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _relaunch(self, index: int) -> Browser:
+        """在锁内重启第 index 个浏览器（若其他协程已重启则直接复用）。"""
+        async with self._lock:
+            browser = self._browsers[index]
+            if browser is not None and browser.is_connected():
+                return browser
+            if browser is not None:
+                self._clipboard_locks.pop(id(browser), None)
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            logger.warning("Chromium #%d 已断开，正在重启", index)
+            start = time.monotonic()
+            browser = await self._playwright.chromium.launch(headless=self._headless)
+            BROWSER_LAUNCHES.inc(reason="relaunch")
+            BROWSER_LAUNCH_SECONDS.observe(time.monotonic() - start, reason="relaunch")
+            self._browsers[index] = browser
+            return browser
+
+    async def _pick_browser(self) -> Tuple[int, Browser]:
+        if not self.started:
+            await self.start()
+        index = next(self._round_robin) % len(self._browsers)
+        browser = self._browsers[index]
+        if browser is None or not browser.is_connected():
+            browser = await self._relaunch(index)
+        return index, browser
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL_S)
+            for index, browser in enumerate(list(self._browsers)):
+                if browser is None or not browser.is_connected():
+                    try:
+                        await self._relaunch(index)
+                    except Exception:
+                        logger.exception("Chromium #%d 重启失败", index)
+            await self.pages.evict_idle()
+
+    def lease_page(self):
+        """从页面池借出一个已就绪的页面，见 PagePool.lease。"""
+        return self.pages.lease()
+
+    def clipboard_lock(self, page: Page) -> asyncio.Lock:
+        """同一浏览器进程内的剪贴板是共享的，点击 Copy 到读取剪贴板之间需要互斥。"""
+        browser = page.context.browser
+        return self._clipboard_locks.setdefault(id(browser), asyncio.Lock())
+
+
+class _PooledPage:
+    __slots__ = ("context", "page", "uses", "last_used")
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        browser = self.context.browser
+        return not self.page.is_closed() and (browser is None or browser.is_connected())
+
+    async def close(self) -> None:
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+
+
+class PagePool:
+    """预热页面池。size 为常驻的空闲页面数，并发超过 size 时临时创建页面，用完即关闭。"""
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        size: int = POOL_SIZE,
+        max_uses: int = PAGE_MAX_USES,
+        idle_ttl_s: float = PAGE_IDLE_TTL_S,
+    ):
+        self._manager = manager
+        self._size = max(0, size)
+        self._max_uses = max(1, max_uses)
+        self._idle_ttl_s = idle_ttl_s
+        self._idle: List[_PooledPage] = []
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def _create(self) -> _PooledPage:
+        index, browser = await self._manager._pick_browser()
+        try:
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+        except Exception:
+            browser = await self._manager._relaunch(index)
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+        try:
+            await request_filter.install(context)
+            page = await context.new_page()
+            page.set_default_timeout(PAGE_DEFAULT_TIMEOUT_MS)
+            page.on("dialog", _dismiss_dialog)
+        except Exception:
+            await context.close()
+            raise
+        return _PooledPage(context, page)
+
+    async def start(self) -> None:
+        """预热到 size 个空闲页面。"""
+        while len(self._idle) < self._size:
+            self._idle.append(await self._create())
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for slot in idle:
+            await slot.close()
+
+    def _take_idle(self) -> Optional[_PooledPage]:
+        while self._idle:
+            slot = self._idle.pop()
+            if slot.is_alive():
+                return slot
+            asyncio.ensure_future(slot.close())
+        return None
+
+    async def _reset(self, slot: _PooledPage) -> None:
+        """
+        清空本地存储、删除 cookie，并回到空白页以关闭残留的弹窗。
+        剪贴板由同一浏览器的页面共用，这里不清空：提取在 clipboard_lock 内点击 Copy 前自行清空。
+        """
+        await slot.page.evaluate(_RESET_PAGE_JS)
+        await slot.context.clear_cookies()
+        await slot.page.goto("about:blank")
+
+    async def _release(self, slot: _PooledPage, reusable: bool) -> None:
+        if reusable and slot.uses < self._max_uses and len(self._idle) < self._size:
+            try:
+                await self._reset(slot)
+            except Exception:
+                pass
+            else:
+                slot.last_used = time.monotonic()
+                self._idle.append(slot)
+                return
+        await slot.close()
+
+    async def evict_idle(self) -> None:
+        """关闭空闲超过 idle_ttl_s 的页面。"""
+        now = time.monotonic()
+        expired = [slot for slot in self._idle if now - slot.last_used > self._idle_ttl_s]
+        self._idle = [slot for slot in self._idle if slot not in expired]
+        for slot in expired:
+            await slot.close()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """借出一个页面；请求出错时该页面不再复用。"""
+        slot = self._take_idle() or await self._create()
+        slot.uses += 1
+        reusable = False
+        try:
+            yield slot.page
+            reusable = True
+        finally:
+            await self._release(slot, reusable)
+
+
+_manager: Optional[BrowserManager] = None
+
+
+def get_browser_manager() -> BrowserManager:
+    """返回进程级单例；首次使用时才真正启动 Playwright。"""
+    global _manager
+    if _manager is None:
+        _manager = BrowserManager()
+    return _manager
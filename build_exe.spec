@@ -10,11 +10,25 @@ a = Analysis(
     hiddenimports=[
         'playwright.sync_api',
         'playwright.async_api',
-        'browser',
-        'browser_React',
-        'browser_Vue',
-        'browser_Svelte',
-        'browser_Lit',
+        'browser_pool',
+        'result_cache',
+        'singleflight',
+        'framework_profiles',
+        'extractor_engine',
+        'batch',
+        'direct_fetch',
+        'component_data',
+        'page_capture',
+        'request_filter',
+        'asset_cache',
+        'scheduler',
+        'failure_guard',
+        'result_format',
+        'postprocess',
+        'deadline',
+        'metrics',
+        'component_index',
+        'worker_pool',
     ],
     hookspath=[],
     hooksconfig={},
@@ -28,20 +42,17 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# onedir 构建：不再每次启动都把单文件解压到临时目录；同时关闭 UPX，省去启动时的解压开销
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='UiverseExtractor',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -51,3 +62,13 @@ exe = EXE(
     icon=None,
 )
 
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='UiverseExtractor',
+)
@@ -0,0 +1,210 @@
+"""
+组件数据解析：从页面内嵌的水合数据或接口返回的 JSON 中找出组件源码，
+并记录曾经返回过源码的数据接口，供直连快速路径与浏览器路径共用。
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from result_cache import CACHE_DIR
+
+ENDPOINTS_FILE = os.path.join(CACHE_DIR, "endpoints.json")
+
+_NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+_REMIX_CONTEXT_RE = re.compile(r"window\.__remixContext\s*=\s*(\{.*?\});?\s*</script>", re.S)
+_STREAM_ENQUEUE_RE = re.compile(r"streamController\.enqueue\((\".*?\")\);", re.S)
+_JSON_SCRIPT_RE = re.compile(r'<script[^>]*type="application/json"[^>]*>(.*?)</script>', re.S)
+
+# 候选对象（或其外层对象）中标识组件与作者的字段
+_ID_KEYS = frozenset({"slug", "friendlyId", "friendly_id", "postId", "post_id", "id"})
+_AUTHOR_KEYS = frozenset({"username", "author", "authorName", "login", "handle"})
+# 比较标识时忽略过长的字符串（代码、描述等）
+_IDENTITY_MAX_CHARS = 200
+
+_endpoints: Optional[Set[str]] = None
+
+
+def _decode_turbo_stream(values: List[Any]) -> Any:
+    """
+    还原 React Router 的 turbo-stream 扁平数组：对象形如 {"_<键下标>": <值下标>}。
+    带类型标记的特殊值（日期、Promise 等）不含源码，直接忽略。
+    """
+    resolved: Dict[int, Any] = {}
+
+    def resolve(index: Any) -> Any:
+        if not isinstance(index, int) or not 0 <= index < len(values):
+            return None
+        if index in resolved:
+            return resolved[index]
+        value = values[index]
+        if isinstance(value, dict):
+            obj: Dict[str, Any] = {}
+            resolved[index] = obj
+            for key, value_index in value.items():
+                if key.startswith("_") and key[1:].isdigit():
+                    name = values[int(key[1:])] if int(key[1:]) < len(values) else key
+                    obj[name if isinstance(name, str) else key] = resolve(value_index)
+            return obj
+        if isinstance(value, list):
+            items: List[Any] = []
+            resolved[index] = items
+            if not (value and isinstance(value[0], str) and len(value[0]) == 1):
+                items.extend(resolve(item) for item in value)
+            return items
+        resolved[index] = value
+        return value
+
+    return resolve(0)
+
+
+def embedded_states(html: str) -> Iterator[Any]:
+    """依次产出页面中可能承载组件数据的 JSON。"""
+    for regex in (_NEXT_DATA_RE, _REMIX_CONTEXT_RE, _JSON_SCRIPT_RE):
+        for match in regex.finditer(html):
+            try:
+                yield json.loads(match.group(1))
+            except ValueError:
+                continue
+    for match in _STREAM_ENQUEUE_RE.finditer(html):
+        try:
+            payload = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for line in payload.splitlines():
+            try:
+                chunk = json.loads(line)
+            except ValueError:
+                continue
+            yield _decode_turbo_stream(chunk) if isinstance(chunk, list) else chunk
+
+
+def _identity(nodes: List[Dict[str, Any]]) -> Tuple[Set[str], Set[str], Set[str]]:
+    """
+    返回 (全部短字符串值, 标识字段的值, 作者字段的值)，均为小写；
+    只看 nodes 本身及其直接嵌套的对象（如 {"user": {"username": ...}}）。
+    """
+    values: Set[str] = set()
+    ids: Set[str] = set()
+    authors: Set[str] = set()
+    for node in nodes:
+        pairs = list(node.items())
+        pairs += [(k, v) for child in node.values() if isinstance(child, dict) for k, v in child.items()]
+        for key, value in pairs:
+            if not isinstance(value, (str, int)) or isinstance(value, bool):
+                continue
+            text = str(value).strip().lower()
+            if not text or len(text) > _IDENTITY_MAX_CHARS:
+                continue
+            values.add(text)
+            if key in _ID_KEYS:
+                ids.add(text)
+            if key in _AUTHOR_KEYS:
+                authors.add(text)
+    return values, ids, authors
+
+
+def _distinct(candidates: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    unique: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for fields in candidates:
+        unique.setdefault((fields["html"], fields["css"]), fields)
+    return list(unique.values())
+
+
+def find_code_fields(data: Any, url: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """
+    在任意嵌套的 JSON 中查找同时带有 html 与 css 字符串字段的对象。
+    组件页面的数据中往往还有相关组件、同作者的其他组件，因此给出 url 时按其作者与组件名挑选：
+    - 候选对象（或其外层对象）的字段中出现组件名（且带作者字段时作者一致）即为匹配
+    - 没有匹配时，只有当全部候选内容相同且都不带任何标识字段时才采用（页面只内嵌了当前组件）
+    - 匹配到多份不同的代码，或无法确定时返回 None，交给其他途径读取
+    """
+    candidates: List[Tuple[Dict[str, str], List[Dict[str, Any]]]] = []
+    stack: List[Tuple[Any, Optional[Dict[str, Any]]]] = [(data, None)]
+    seen: Set[int] = set()
+    while stack:
+        node, parent = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, dict):
+            html, css = node.get("html"), node.get("css")
+            if isinstance(html, str) and isinstance(css, str) and html.strip():
+                owners = [node] if parent is None else [node, parent]
+                candidates.append(({"html": html, "css": css}, owners))
+                continue
+            stack.extend((child, node) for child in node.values())
+        elif isinstance(node, list):
+            # 列表元素的外层对象取列表所在的对象，列表中其他元素的标识不会混入
+            stack.extend((child, None) for child in node)
+    if not candidates:
+        return None
+
+    parts = component_parts(url) if url else None
+    if parts is None:
+        unique = _distinct([fields for fields, _ in candidates])
+        return unique[0] if len(unique) == 1 else None
+    author, slug = (unquote(part).strip().lower() for part in parts)
+    matched, anonymous = [], True
+    for fields, owners in candidates:
+        values, ids, authors = _identity(owners)
+        if ids or authors:
+            anonymous = False
+        if slug in values and (not authors or author in authors):
+            matched.append(fields)
+    if matched:
+        unique = _distinct(matched)
+    elif anonymous:
+        unique = _distinct([fields for fields, _ in candidates])
+    else:
+        return None
+    return unique[0] if len(unique) == 1 else None
+
+
+def component_parts(url: str) -> Optional[Tuple[str, str]]:
+    parts = urlsplit(url).path.strip("/").split("/")
+    if len(parts) != 2 or not all(parts):
+        return None
+    return parts[0], parts[1]
+
+
+def learned_endpoints() -> Set[str]:
+    global _endpoints
+    if _endpoints is None:
+        try:
+            with open(ENDPOINTS_FILE, encoding="utf-8") as f:
+                _endpoints = set(json.load(f))
+        except (OSError, ValueError):
+            _endpoints = set()
+    return _endpoints
+
+
+def remember_endpoint(endpoint_url: str, component_url: str) -> None:
+    """
+    记录一个返回了组件源码的数据接口（由浏览器路径捕获），把作者与组件名替换为占位符，
+    之后同类组件即可由快速路径直接请求该接口。
+    """
+    parts = component_parts(component_url)
+    if parts is None:
+        return
+    author, slug = parts
+    template = endpoint_url
+    for name, value in (("{author}", author), ("{slug}", slug)):
+        if value in template:
+            template = template.replace(value, name)
+        elif quote(value, safe="") in template:
+            template = template.replace(quote(value, safe=""), name)
+        else:
+            return
+    endpoints = learned_endpoints()
+    if template in endpoints:
+        return
+    endpoints.add(template)
+    try:
+        os.makedirs(os.path.dirname(ENDPOINTS_FILE), exist_ok=True)
+        with open(ENDPOINTS_FILE, "w", encoding="utf-8") as f:
+            json.dump(sorted(endpoints), f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
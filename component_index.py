@@ -0,0 +1,330 @@
+"""
+本地组件索引：对提取结果建立 SQLite FTS5 全文索引，供 search_components 工具检索。
+
+每个 (框架, 组件链接) 一行，索引列包括：组件名（链接中的 slug）、作者（UIVERSE_PREFIX 之后的第一段路径）、
+框架、由代码推断的标签（toggle、glow、gradient、animation ...）、HTML 中的 class 名、
+CSS 属性以及代码本身。每次有新的提取结果写入缓存时增量更新；查询按 bm25 排序，毫秒级返回。
+
+已有结果缓存可一次性导入：
+    uv run component_index.py --rebuild
+    uv run component_index.py "glowing toggle switch vue"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from component_data import component_parts
+from result_cache import CACHE_DIR
+
+SEARCH_INDEX = os.environ.get("UIVERSE_SEARCH_INDEX", "1") != "0"
+SEARCH_LIMIT = 10
+SEARCH_MAX_LIMIT = 100
+
+# bm25 权重，顺序与 components_fts 的列一致
+_COLUMN_WEIGHTS = (5.0, 3.0, 2.0, 4.0, 3.0, 1.0, 0.5)
+_STOPWORDS = {"a", "an", "and", "the", "in", "with", "for", "of", "on", "to", "using", "component"}
+
+_CLASS_RE = re.compile(r'class(?:Name)?\s*=\s*["\']([^"\']+)["\']')
+_CSS_PROPERTY_RE = re.compile(r"(?<![\w-])(-{0,2}[a-z][a-z0-9-]*)\s*:\s*[^;{}]+;")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# (标签, 命中任意一个即打上该标签的正则)
+_TAG_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("button", (r"<button\b", r"role=[\"']button")),
+    ("toggle switch", (r"type=[\"']checkbox", r"\btoggle\b", r"\bswitch\b")),
+    ("checkbox", (r"type=[\"']checkbox",)),
+    ("radio", (r"type=[\"']radio",)),
+    ("input form", (r"<input\b(?![^>]*type=[\"'](?:checkbox|radio))", r"<form\b", r"<textarea\b")),
+    ("card", (r"\bcard\b",)),
+    ("loader spinner", (r"\bloader\b", r"\bspinner\b", r"\bloading\b")),
+    ("icon svg", (r"<svg\b",)),
+    (
+        "glow",
+        (
+            # 某一层阴影以两个偏移（可为无单位的 0）开头，后跟非零模糊半径，如 box-shadow: 0 0 10px
+            r"(?:box|text)-shadow\s*:(?:[^;]*,)?\s*(?:inset\s+)?(?:-?[\d.]+px|0)\s+(?:-?[\d.]+px|0)\s+"
+            r"(?:[1-9][\d.]*|0?\.\d*[1-9]\d*)px",
+            r"drop-shadow\(",
+            r"\bglow",
+        ),
+    ),
+    ("gradient", (r"gradient\(",)),
+    ("animation animated", (r"@keyframes\b", r"\banimation\s*:")),
+    ("hover", (r":hover\b",)),
+    ("transition", (r"\btransition\s*:",)),
+    ("3d", (r"\bperspective\s*:", r"rotate[XY]\(", r"translate3d\(", r"preserve-3d")),
+    ("blur glass", (r"backdrop-filter\s*:", r"\bblur\(")),
+)
+_COMPILED_TAG_RULES = tuple(
+    (tag, tuple(re.compile(pattern, re.I) for pattern in patterns)) for tag, patterns in _TAG_RULES
+)
+
+
+def _load_tags(stored: str) -> List[str]:
+    """标签以 JSON 数组保存（标签本身可含空格，如 “toggle switch”）；兼容旧版以空格连接的记录。"""
+    try:
+        tags = json.loads(stored)
+    except ValueError:
+        return stored.split()
+    return tags if isinstance(tags, list) else stored.split()
+
+
+def _name_from_slug(slug: str) -> str:
+    return " ".join(part for part in re.split(r"[-_]+", slug) if part)
+
+
+def derive_tags(code: str) -> List[str]:
+    """根据代码推断标签（元素类型与视觉效果）。"""
+    tags = []
+    for tag, patterns in _COMPILED_TAG_RULES:
+        if any(pattern.search(code) for pattern in patterns):
+            tags.append(tag)
+    return tags
+
+
+def document_for(framework: str, url: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    """由一条提取结果生成索引文档（各列文本与元数据）。"""
+    author, slug = component_parts(url) or ("", "")
+    code_fields = {name: value or "" for name, value in fields.items() if name != "notes"}
+    code = "\n".join(code_fields.values())
+    classes = sorted({name for match in _CLASS_RE.findall(code) for name in match.split()})
+    properties = sorted(set(_CSS_PROPERTY_RE.findall(code)))
+    tags = derive_tags(code)
+    if "combined" in code_fields:
+        tags.append("tailwind")
+    data = code.encode("utf-8")
+    return {
+        "url": url.strip().rstrip("/"),
+        "author": author,
+        "slug": slug,
+        "framework": framework,
+        "name": _name_from_slug(slug),
+        "tags": sorted(set(tags)),
+        "classes": classes,
+        "properties": properties,
+        "code": code + ("\n" + fields["notes"] if fields.get("notes") else ""),
+        "bytes": len(data),
+        "hash": "sha256:" + hashlib.sha256(data).hexdigest(),
+    }
+
+
+def _match_expression(tokens: Iterable[str]) -> str:
+    # 每个词都加引号，避免 FTS5 把 “-”、“:” 等字符当作查询语法；多个词之间取 OR，由 bm25 排序
+    return " OR ".join('"{}"'.format(token.replace('"', '""')) for token in tokens)
+
+
+class ComponentIndex:
+    def __init__(self, path: str):
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            db = sqlite3.connect(self._path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS components ("
+                " id INTEGER PRIMARY KEY,"
+                " key TEXT UNIQUE NOT NULL,"
+                " url TEXT NOT NULL,"
+                " author TEXT NOT NULL,"
+                " slug TEXT NOT NULL,"
+                " framework TEXT NOT NULL,"
+                " tags TEXT NOT NULL,"
+                " bytes INTEGER NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS components_fts USING fts5("
+                " name, author, framework, tags, classes, properties, code,"
+                " tokenize = 'porter unicode61')"
+            )
+            self._db = db
+        return self._db
+
+    def _upsert(self, key: str, doc: Dict[str, Any]) -> bool:
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute("SELECT id, hash FROM components WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] == doc["hash"]:
+                return False
+            tags = " ".join(doc["tags"])
+            values = (
+                doc["url"], doc["author"], doc["slug"], doc["framework"],
+                json.dumps(doc["tags"], ensure_ascii=False),
+                doc["bytes"], doc["hash"], time.time(),
+            )
+            if row is None:
+                rowid = db.execute(
+                    "INSERT INTO components"
+                    " (key, url, author, slug, framework, tags, bytes, hash, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, *values),
+                ).lastrowid
+            else:
+                rowid = row[0]
+                db.execute(
+                    "UPDATE components SET url = ?, author = ?, slug = ?, framework = ?, tags = ?,"
+                    " bytes = ?, hash = ?, updated_at = ? WHERE id = ?",
+                    (*values, rowid),
+                )
+                db.execute("DELETE FROM components_fts WHERE rowid = ?", (rowid,))
+            db.execute(
+                "INSERT INTO components_fts"
+                " (rowid, name, author, framework, tags, classes, properties, code)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    rowid, doc["name"], doc["author"], doc["framework"], tags,
+                    " ".join(doc["classes"]), " ".join(doc["properties"]), doc["code"],
+                ),
+            )
+            db.commit()
+            return True
+
+    async def add(self, framework: str, url: str, fields: Dict[str, str]) -> bool:
+        """写入或更新一条提取结果；代码未变化时不改动索引。返回是否有更新。"""
+        if not SEARCH_INDEX:
+            return False
+        doc = document_for(framework, url, fields)
+        key = f"{framework.strip().lower()} {doc['url']}"
+        return await asyncio.to_thread(self._upsert, key, doc)
+
+    def _search(self, query: str, framework: Optional[str], limit: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self._db_lock:
+            db = self._connect()
+            frameworks = {
+                row[0].lower(): row[0]
+                for row in db.execute("SELECT DISTINCT framework FROM components")
+            }
+            tokens = []
+            for token in _TOKEN_RE.findall(query.lower()):
+                # 查询中出现的框架名作为过滤条件，而不是检索词
+                if framework is None and token in frameworks:
+                    framework = frameworks[token]
+                elif token not in _STOPWORDS:
+                    tokens.append(token)
+            columns = "c.url, c.author, c.slug, c.framework, c.tags, c.bytes, c.hash"
+            params: List[Any] = []
+            conditions = []
+            if tokens:
+                # snippet / bm25 只能用于 MATCH 查询
+                weights = ", ".join(str(w) for w in _COLUMN_WEIGHTS)
+                sql = (
+                    f"SELECT {columns}, snippet(components_fts, -1, '[', ']', '…', 12),"
+                    f" bm25(components_fts, {weights}) AS rank"
+                    " FROM components_fts JOIN components c ON c.id = components_fts.rowid"
+                )
+                conditions.append("components_fts MATCH ?")
+                params.append(_match_expression(tokens))
+                order = "rank, c.updated_at DESC"
+            else:
+                sql = f"SELECT {columns}, '', 0 AS rank FROM components c"
+                order = "c.updated_at DESC"
+            if framework:
+                conditions.append("c.framework = ? COLLATE NOCASE")
+                params.append(framework)
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += f" ORDER BY {order} LIMIT ?"
+            params.append(limit)
+            rows = db.execute(sql, params).fetchall()
+            indexed = db.execute("SELECT COUNT(*) FROM components").fetchone()[0]
+        results = [
+            {
+                "url": url,
+                "author": author,
+                "name": slug,
+                "framework": fw,
+                "tags": _load_tags(tags),
+                "bytes": size,
+                "hash": content_hash,
+                "snippet": snippet,
+                "score": round(-rank, 3),
+            }
+            for url, author, slug, fw, tags, size, content_hash, snippet, rank in rows
+        ]
+        return {
+            "query": query,
+            "framework": framework,
+            "indexed": indexed,
+            "results": results,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    async def search(
+        self, query: str, framework: Optional[str] = None, limit: int = SEARCH_LIMIT
+    ) -> Dict[str, Any]:
+        """
+        按自然语言查询检索：{"query", "framework", "indexed", "results": [...], "elapsed_ms"}。
+        查询中出现的框架名（如 “vue”）用作过滤；framework 参数优先。
+        """
+        limit = max(1, min(int(limit), SEARCH_MAX_LIMIT))
+        return await asyncio.to_thread(self._search, query or "", framework or None, limit)
+
+    def rebuild_from_cache(self, cache_path: str) -> int:
+        """把结果缓存（results.sqlite3）中的全部条目导入索引，返回导入条数。"""
+        from framework_profiles import get_profile
+
+        if not os.path.exists(cache_path):
+            return 0
+        source = sqlite3.connect(cache_path)
+        count = 0
+        try:
+            for key, value in source.execute("SELECT key, value FROM results"):
+                framework, _, url = key.partition(" ")
+                try:
+                    fields = json.loads(value)
+                    framework = get_profile(framework).name
+                except ValueError:
+                    continue
+                if not isinstance(fields, dict):
+                    continue
+                doc = document_for(framework, url, fields)
+                self._upsert(f"{framework.lower()} {doc['url']}", doc)
+                count += 1
+        finally:
+            source.close()
+        return count
+
+
+_index: Optional[ComponentIndex] = None
+
+
+def get_component_index() -> ComponentIndex:
+    global _index
+    if _index is None:
+        _index = ComponentIndex(os.path.join(CACHE_DIR, "index.sqlite3"))
+    return _index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地组件索引的导入与检索")
+    parser.add_argument("query", nargs="?", help="检索词，例如 “glowing toggle switch vue”")
+    parser.add_argument("--framework", default=None, help="只检索该框架")
+    parser.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    parser.add_argument("--rebuild", action="store_true", help="从结果缓存导入全部已提取的组件")
+    args = parser.parse_args()
+    index = get_component_index()
+    if args.rebuild:
+        count = index.rebuild_from_cache(os.path.join(CACHE_DIR, "results.sqlite3"))
+        print(f"已导入 {count} 条结果", file=sys.stderr)
+    if args.query is not None:
+        result = asyncio.run(index.search(args.query, args.framework, args.limit))
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
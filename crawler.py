@@ -0,0 +1,356 @@
+"""
+目录爬取：从 Uiverse 列表页（分类、标签、作者主页）发现组件链接，并发受限地交给提取引擎。
+
+- 进度按组件写入检查点文件；中断后再次运行会继续上一轮，已完成的组件不再处理
+- 上一轮完成后再次运行时，先用 ETag / Last-Modified 条件请求与页面内组件源码的哈希判断是否变化，
+  只重新提取有变化（或上次失败）的组件
+- 列表页由客户端渲染时可加 --render，用浏览器加载并滚动后再收集链接
+
+命令行用法（每个组件输出一行 JSON，最后在标准错误输出汇总）：
+    uv run crawler.py https://uiverse.io/buttons --frameworks HTML React --max-pages 10
+    uv run crawler.py https://uiverse.io/profile/Na3ar-17 --state na3ar.json --concurrency 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import httpx
+
+from batch import BATCH_CONCURRENCY, HOST_MIN_INTERVAL_S, HostRateLimiter
+from component_data import component_parts, embedded_states, find_code_fields
+
+CRAWL_MAX_PAGES = int(os.environ.get("UIVERSE_CRAWL_MAX_PAGES", "50"))
+RENDER_SCROLLS = 20
+
+# 两段路径但不是 “作者/组件” 的站点页面
+RESERVED_SEGMENTS = {
+    "profile", "tags", "tag", "search", "challenges", "challenge", "posts", "post", "blog",
+    "settings", "create", "login", "signup", "logout", "favorites", "spotlight", "legal",
+    "about", "api", "assets", "build", "static", "_next", "cdn-cgi", "dashboard", "theme",
+    "elements", "resources", "discord", "sponsor", "terms", "privacy", "contact",
+}
+_HREF_RE = re.compile(r"""href\s*=\s*["']([^"'#]+)["']""", re.I)
+_PATH_RE = re.compile(r"^/[\w.~-]+/[\w.~-]+/?$")
+_SCRIPT_RE = re.compile(r"<script\b.*?</script>", re.S | re.I)
+
+
+def is_component_url(url: str, host: str) -> bool:
+    parts = urlsplit(url)
+    if parts.netloc != host:
+        return False
+    segments = component_parts(url)
+    return segments is not None and segments[0].lower() not in RESERVED_SEGMENTS
+
+
+def _canonical(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), "", ""))
+
+
+def _state_paths(node: Any) -> Iterable[str]:
+    """页面状态中所有形如 “/作者/组件” 的字符串。"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, str) and _PATH_RE.match(node):
+            yield node
+
+
+def discover_links(html: str, base_url: str) -> List[str]:
+    """从列表页的链接与内嵌状态中找出组件链接（保持页面中的顺序，去重）。"""
+    host = urlsplit(base_url).netloc
+    candidates = [urljoin(base_url, href) for href in _HREF_RE.findall(html)]
+    for state in embedded_states(html):
+        candidates.extend(urljoin(base_url, path) for path in _state_paths(state))
+    links = (_canonical(url) for url in candidates if is_component_url(url, host))
+    return list(dict.fromkeys(link for link in links if link != _canonical(base_url)))
+
+
+def page_url(listing_url: str, page: int) -> str:
+    """列表的第 page 页（第 1 页即原链接）。"""
+    if page <= 1:
+        return listing_url
+    parts = urlsplit(listing_url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "page"] + [("page", str(page))]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def page_source(html: str, url: str) -> Optional[Dict[str, str]]:
+    """页面内嵌的组件源码 {"html", "css"}；没有时返回 None。"""
+    for state in embedded_states(html):
+        fields = find_code_fields(state, url)
+        if fields:
+            return fields
+    return None
+
+
+def content_signature(html: str, url: str, fields: Optional[Dict[str, str]] = None) -> str:
+    """
+    组件内容的哈希：优先取页面内嵌的源码（fields 为已取出的源码），
+    否则取去掉脚本后的页面文本（脚本中常有随机值）。
+    """
+    if fields is None:
+        fields = page_source(html, url)
+    if fields:
+        data = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+        return "source:" + hashlib.sha256(data.encode("utf-8")).hexdigest()
+    body = _SCRIPT_RE.sub("", html)
+    return "page:" + hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class CrawlState:
+    """
+    检查点文件：{"listing", "run": {"id", "started_at", "finished"}, "items": {链接: 条目}}。
+    条目：{"etag", "last_modified", "signature", "done": [框架], "errors": {框架: 错误}, "run"}。
+    每处理完一个组件即原子写入。
+    """
+
+    def __init__(self, path: str, listing: str):
+        self.path = path
+        self.data: Dict[str, Any] = {"listing": listing, "run": None, "items": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fp:
+                self.data = json.load(fp)
+        self.resumed = bool(self.data.get("run") and not self.data["run"].get("finished"))
+        if not self.resumed:
+            previous = (self.data.get("run") or {}).get("id", 0)
+            self.data["run"] = {"id": previous + 1, "started_at": time.time(), "finished": False}
+
+    @property
+    def run_id(self) -> int:
+        return self.data["run"]["id"]
+
+    def item(self, url: str) -> Dict[str, Any]:
+        return self.data["items"].setdefault(url, {"done": [], "errors": {}})
+
+    def finished_this_run(self, url: str, frameworks: List[str]) -> bool:
+        entry = self.data["items"].get(url)
+        return bool(
+            entry
+            and entry.get("run") == self.run_id
+            and not entry.get("errors")
+            and set(frameworks) <= set(entry.get("done", []))
+        )
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(self.data, fp, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def finish(self) -> None:
+        self.data["run"]["finished"] = True
+        self.data["run"]["finished_at"] = time.time()
+        self.save()
+
+
+async def fetch_listing(url: str, render: bool) -> str:
+    if not render:
+        from direct_fetch import _get_client
+
+        resp = await _get_client().get(url)
+        resp.raise_for_status()
+        return resp.text
+
+    from browser_pool import get_browser_manager
+
+    async with get_browser_manager().lease_page() as page:
+        await page.goto(url, wait_until="domcontentloaded")
+        # 无限滚动的列表：滚动到底部直到高度不再增长
+        height = 0
+        for _ in range(RENDER_SCROLLS):
+            await page.mouse.wheel(0, 10000)
+            await page.wait_for_timeout(500)
+            new_height = await page.evaluate("document.body.scrollHeight")
+            if new_height == height:
+                break
+            height = new_height
+        return await page.content()
+
+
+async def discover(
+    listing_url: str, max_pages: int, render: bool, limiter: HostRateLimiter
+) -> List[str]:
+    """逐页收集组件链接，某一页没有新链接时停止。"""
+    found: Dict[str, None] = {}
+    for page in range(1, max(1, max_pages) + 1):
+        url = page_url(listing_url, page)
+        await limiter.wait(url)
+        try:
+            html = await fetch_listing(url, render)
+        except httpx.HTTPError as exc:
+            print(f"[crawler] 列表页 {url} 读取失败: {exc}", file=sys.stderr)
+            break
+        new = [link for link in discover_links(html, url) if link not in found]
+        print(f"[crawler] 第 {page} 页发现 {len(new)} 个新组件", file=sys.stderr, flush=True)
+        if not new:
+            break
+        found.update(dict.fromkeys(new))
+        if render:
+            # 浏览器渲染时滚动已经加载了整个列表
+            break
+    return list(found)
+
+
+async def check_changed(
+    url: str, entry: Dict[str, Any]
+) -> Tuple[Optional[bool], Optional[Dict[str, str]]]:
+    """
+    条件请求组件页面，更新条目中的 ETag / Last-Modified / 内容哈希。
+    返回 (是否变化, 页面内嵌的源码)：与上次记录的哈希不同时为 True；未变化或首次见到时为 False
+    （首次见到不强制刷新，已有的结果缓存仍可使用）；请求失败时为 None。
+    内嵌源码供 HTML 直接使用，不必为提取再请求一次页面。
+    """
+    from direct_fetch import _get_client
+
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        resp = await _get_client().get(url, headers=headers)
+    except httpx.HTTPError:
+        return None, None
+    if resp.status_code == 304:
+        return False, None
+    if resp.status_code != 200:
+        return None, None
+    entry["etag"] = resp.headers.get("etag")
+    entry["last_modified"] = resp.headers.get("last-modified")
+    fields = page_source(resp.text, url)
+    signature = content_signature(resp.text, url, fields)
+    previous = entry.get("signature")
+    entry["signature"] = signature
+    return previous is not None and signature != previous, fields
+
+
+async def crawl_item(
+    url: str, frameworks: List[str], state: CrawlState, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """检查一个组件是否变化，需要时逐个框架提取；返回该组件的处理结果。"""
+    from app import _cached_extract, _has_code, _store_result
+    from deadline import Deadline
+    from scheduler import PRIORITY_BATCH
+
+    start = time.perf_counter()
+    entry = state.item(url)
+    previous_signature = entry.get("signature")
+    changed, page_fields = await check_changed(url, entry)
+    if changed is None:
+        # 无法判断时按有变化处理（首次见到的组件本来就要全部提取，不必强制刷新），
+        # 并保留原内容哈希，下次仍会重新比较
+        changed = previous_signature is not None
+        entry["signature"] = previous_signature
+    if changed:
+        entry["done"] = []
+    todo = [fw for fw in frameworks if fw not in entry["done"]]
+    result: Dict[str, Any] = {"url": url, "frameworks": {}}
+    if not todo and not changed:
+        result["status"] = "unchanged"
+    else:
+        entry["errors"] = {}
+        for framework in todo:
+            try:
+                if framework == "HTML" and page_fields:
+                    # 检查变化时已取得最新源码，直接写入缓存
+                    fields = page_fields
+                    await _store_result(framework, url, fields)
+                else:
+                    fields = await _cached_extract(
+                        framework, url, bool(changed), PRIORITY_BATCH, Deadline(args.deadline)
+                    )
+                if not _has_code(fields):
+                    raise LookupError("未提取到代码")
+                entry["done"].append(framework)
+                result["frameworks"][framework] = "ok"
+            except Exception as exc:
+                entry["errors"][framework] = f"{type(exc).__name__}: {exc}"
+                result["frameworks"][framework] = entry["errors"][framework]
+        if entry["errors"] and changed:
+            # 有框架未能更新时保留旧哈希，下次运行仍视为有变化并全部重新提取，避免用到旧缓存
+            entry["signature"] = previous_signature
+        result["status"] = "failed" if entry["errors"] else "extracted"
+    entry["run"] = state.run_id
+    entry["checked_at"] = time.time()
+    state.save()
+    result["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from browser_pool import get_browser_manager
+    from direct_fetch import close_client
+    from framework_profiles import get_profile
+    from worker_pool import WORKERS, get_worker_pool
+
+    frameworks = list(dict.fromkeys(get_profile(name).name for name in args.frameworks))
+    state_path = args.state or "crawl-{}.json".format(
+        re.sub(r"[^\w.-]+", "_", urlsplit(args.listing).path.strip("/") or "home")
+    )
+    state = CrawlState(state_path, args.listing)
+    limiter = HostRateLimiter(args.interval)
+    counts: Dict[str, int] = {}
+    try:
+        if state.resumed and state.data.get("discovered"):
+            urls = state.data["discovered"]
+            print(f"[crawler] 继续第 {state.run_id} 轮，共 {len(urls)} 个组件", file=sys.stderr)
+        else:
+            urls = await discover(args.listing, args.max_pages, args.render, limiter)
+            # 上一轮已记录、但这次没被发现的组件也一并检查
+            seen = set(urls)
+            urls += [url for url in state.data["items"] if url not in seen]
+            state.data["discovered"] = urls
+            state.save()
+        pending = [url for url in urls if not state.finished_this_run(url, frameworks)]
+        counts["skipped"] = len(urls) - len(pending)
+        semaphore = asyncio.Semaphore(max(1, args.concurrency))
+
+        async def run_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                await limiter.wait(url)
+                return await crawl_item(url, frameworks, state, args)
+
+        for next_done in asyncio.as_completed([run_one(url) for url in pending]):
+            item = await next_done
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+        state.finish()
+    finally:
+        await get_browser_manager().close()
+        await close_client()
+        if WORKERS > 0:
+            await get_worker_pool().close()
+    print(f"[crawler] 完成：{json.dumps(counts, ensure_ascii=False)}，检查点 {state_path}", file=sys.stderr)
+    return 1 if counts.get("failed") else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="爬取 Uiverse 列表页中的全部组件并提取代码")
+    parser.add_argument("listing", help="列表页链接，例如 https://uiverse.io/buttons 或作者主页")
+    parser.add_argument("--frameworks", nargs="+", default=["HTML"], help="要提取的框架")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument(
+        "--interval", type=float, default=HOST_MIN_INTERVAL_S, help="同一域名的最小请求间隔（秒）"
+    )
+    parser.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES, help="最多读取的列表页数")
+    parser.add_argument("--render", action="store_true", help="用浏览器渲染并滚动列表页")
+    parser.add_argument("--state", default=None, help="检查点文件（默认按列表路径命名）")
+    parser.add_argument("--deadline", type=float, default=None, help="每次提取的时限（秒）")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+请求时限与自适应步骤超时。
+
+每个请求有一个总时限（Deadline），导航、菜单点击、Copy、剪贴板等各步骤的超时
+取 “该步骤的自适应超时” 与 “剩余时间（预留回退读取的时间）” 中的较小值。
+自适应超时按最近成功样本的 p95 × ADAPTIVE_FACTOR 计算，并以各步骤的默认值为上限；
+样本不足 ADAPTIVE_MIN_SAMPLES 时使用默认值。
+
+提取过程中的阶段事件（已导航、已选中框架、某个字段已取得、使用了回退读取等）通过
+Deadline.report 发出，订阅者（MCP 进度通知、合并请求的等待者、工作进程回传）各自转发。
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from metrics import STEP_SECONDS, get_registry, percentile
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_S = float(os.environ.get("UIVERSE_DEADLINE_S", "45"))
+ADAPTIVE_FACTOR = float(os.environ.get("UIVERSE_ADAPTIVE_TIMEOUT_FACTOR", "3"))
+ADAPTIVE_MIN_SAMPLES = 20
+STEP_MIN_TIMEOUT_MS = 1000
+# 为备用选择器等回退读取预留的时间
+FALLBACK_RESERVE_MS = 1000
+
+# 各步骤的超时上限（也是样本不足时的超时）
+STEP_TIMEOUTS_MS = {
+    "navigation": 30000,
+    "ready": 20000,
+    "menu": 10000,
+    "dialog": 10000,
+    "tab": 10000,
+    "copy": 20000,
+    "copied": 15000,
+    "clipboard": 2000,
+    "textarea": 5000,
+}
+_DEFAULT_STEP_TIMEOUT_MS = 10000
+_STEP_SAMPLES = 200
+
+
+ProgressListener = Callable[[str, Dict[str, Any]], None]
+
+
+class DeadlineExceeded(TimeoutError):
+    """请求总时限已用尽。"""
+
+
+class StepLatencies:
+    """按步骤记录最近的成功耗时，给出自适应超时。"""
+
+    def __init__(self, samples: int = _STEP_SAMPLES, min_samples: int = ADAPTIVE_MIN_SAMPLES):
+        self._samples = samples
+        self._min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, step: str, elapsed_ms: float) -> None:
+        if step not in self._latencies:
+            self._latencies[step] = deque(maxlen=self._samples)
+        self._latencies[step].append(elapsed_ms)
+
+    def p95_ms(self, step: str) -> Optional[float]:
+        samples = self._latencies.get(step)
+        if not samples or len(samples) < self._min_samples:
+            return None
+        return percentile(sorted(samples), 0.95)
+
+    def timeout_ms(self, step: str) -> float:
+        ceiling = STEP_TIMEOUTS_MS.get(step, _DEFAULT_STEP_TIMEOUT_MS)
+        p95 = self.p95_ms(step)
+        if p95 is None:
+            return ceiling
+        return min(ceiling, max(STEP_MIN_TIMEOUT_MS, p95 * ADAPTIVE_FACTOR))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for step in sorted(set(STEP_TIMEOUTS_MS) | set(self._latencies)):
+            samples = sorted(self._latencies.get(step, ()))
+            result[step] = {
+                "samples": len(samples),
+                "p50_ms": round(percentile(samples, 0.5), 1),
+                "p95_ms": round(percentile(samples, 0.95), 1),
+            }
+            if step in STEP_TIMEOUTS_MS:
+                result[step]["timeout_ms"] = round(self.timeout_ms(step))
+        return result
+
+
+_latencies = StepLatencies()
+
+
+def get_step_latencies() -> StepLatencies:
+    return _latencies
+
+
+def _collect_step_timeouts():
+    return [
+        (
+            "uiverse_step_timeout_ms",
+            "gauge",
+            "Current adaptive timeout of each extraction step",
+            [({"step": step}, _latencies.timeout_ms(step)) for step in STEP_TIMEOUTS_MS],
+        )
+    ]
+
+
+get_registry().register_collector(_collect_step_timeouts)
+
+
+class Deadline:
+    """单个请求的总时限；各步骤从这里领取超时，并把耗时记录为该请求的追踪（spans）。"""
+
+    def __init__(self, budget_s: Optional[float] = None):
+        self.budget_s = DEADLINE_S if budget_s is None or budget_s <= 0 else budget_s
+        self._started_at = time.monotonic()
+        self._expires_at = self._started_at + self.budget_s
+        self.spans: List[Dict[str, Any]] = []
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self._listeners: List[ProgressListener] = []
+
+    @classmethod
+    def shared(cls, first: "Deadline") -> "Deadline":
+        """合并请求共享任务的时限：起点与到期时间同第一个等待者，晚到的等待者用 extend 延长。"""
+        deadline = cls(first.budget_s)
+        deadline._started_at, deadline._expires_at = first._started_at, first._expires_at
+        return deadline
+
+    def extend(self, other: "Deadline") -> None:
+        """把到期时间推迟到 other 的到期时间（若更晚）。"""
+        if other._expires_at > self._expires_at:
+            self._expires_at = other._expires_at
+            self.budget_s = self._expires_at - self._started_at
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self._started_at
+
+    @property
+    def remaining_s(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def check(self, step: str) -> None:
+        if self.remaining_s <= 0:
+            raise DeadlineExceeded(f"请求超过时限 {self.budget_s:g} 秒（步骤：{step}）")
+
+    def timeout_ms(self, step: str) -> float:
+        """该步骤可用的超时（毫秒）；时限已用尽时抛出 DeadlineExceeded。"""
+        self.check(step)
+        budget_ms = self.remaining_s * 1000
+        if budget_ms > 2 * FALLBACK_RESERVE_MS:
+            budget_ms -= FALLBACK_RESERVE_MS
+        return max(1.0, min(_latencies.timeout_ms(step), budget_ms))
+
+    def observe(self, step: str, start: float, ok: bool = True) -> None:
+        """记录从 start（time.monotonic()）开始的一个步骤；只有成功的步骤计入自适应样本。"""
+        elapsed_ms = (time.monotonic() - start) * 1000
+        if ok:
+            _latencies.record(step, elapsed_ms)
+        STEP_SECONDS.observe(elapsed_ms / 1000, step=step, outcome="ok" if ok else "error")
+        self.spans.append(
+            {
+                "step": step,
+                "start_ms": round((start - self._started_at) * 1000, 1),
+                "ms": round(elapsed_ms, 1),
+                "ok": ok,
+            }
+        )
+
+    def merge_spans(self, spans: List[Dict[str, Any]], offset_s: float) -> None:
+        """
+        并入在其他进程（工作进程）中记录的步骤；offset_s 为对方时限起点相对本时限起点的秒数。
+        成功的步骤同样计入本进程的自适应样本与步骤耗时直方图。
+        """
+        for span in spans:
+            if span.get("ok"):
+                _latencies.record(span["step"], span["ms"])
+            STEP_SECONDS.observe(
+                span["ms"] / 1000, step=span["step"], outcome="ok" if span.get("ok") else "error"
+            )
+            self.spans.append({**span, "start_ms": round(span["start_ms"] + offset_s * 1000, 1)})
+
+    def report(self, stage: str, **detail: Any) -> None:
+        """发出一个阶段事件；订阅者在调用方的线程中同步执行，不应阻塞。"""
+        self.events.append((stage, detail))
+        for listener in list(self._listeners):
+            try:
+                listener(stage, detail)
+            except Exception:
+                logger.exception("进度订阅者处理 %s 失败", stage)
+
+    def subscribe(self, listener: ProgressListener) -> None:
+        """订阅阶段事件；先补发已发生的事件，晚到的订阅者（合并请求的等待者）同样能拿到部分结果。"""
+        for stage, detail in list(self.events):
+            listener(stage, detail)
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ProgressListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """计时一个步骤；抛出异常的步骤记为失败。"""
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.observe(name, start, ok=False)
+            raise
+        self.observe(name, start)
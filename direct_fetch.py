@@ -0,0 +1,105 @@
+"""
+直连快速路径：不启动浏览器，直接请求组件页面，从页面内嵌的水合数据
+（Remix / React Router / Next.js）或已学习到的数据接口中取出组件源码。
+
+取不到时返回 None，由调用方回退到 Playwright 流程。HTTP 连接由进程级 AsyncClient 复用。
+每次请求的超时取自请求的 Deadline（不超过 UIVERSE_DIRECT_FETCH_TIMEOUT_S），各接口之间检查时限，
+快速路径不会耗尽留给浏览器路径的时间。
+UIVERSE_ASSET_CACHE=record / replay 时，响应与浏览器流量一起录制到资源缓存 / 只从录制内容读取。
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from asset_cache import MODE_RECORD, MODE_REPLAY, get_asset_cache
+from browser_pool import CONTEXT_OPTIONS
+from component_data import component_parts, embedded_states, find_code_fields, learned_endpoints
+from deadline import Deadline
+
+DIRECT_FETCH_ENABLED = os.environ.get("UIVERSE_DIRECT_FETCH", "1") != "0"
+DIRECT_FETCH_TIMEOUT_S = float(os.environ.get("UIVERSE_DIRECT_FETCH_TIMEOUT_S", "10"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers={"User-Agent": CONTEXT_OPTIONS["user_agent"]},
+            timeout=DIRECT_FETCH_TIMEOUT_S,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _attempt_timeout_s(deadline: Deadline) -> float:
+    """单次请求的超时；时限已用尽时抛出 DeadlineExceeded。"""
+    return min(DIRECT_FETCH_TIMEOUT_S, deadline.timeout_ms("direct_fetch") / 1000)
+
+
+async def _get(
+    client: httpx.AsyncClient, url: str, timeout_s: float = DIRECT_FETCH_TIMEOUT_S
+) -> Optional[Tuple[int, str]]:
+    """GET url，返回 (状态码, 正文)；回放模式下未录制时返回 None。"""
+    assets = get_asset_cache()
+    if assets.mode == MODE_REPLAY:
+        try:
+            recorded = await assets.lookup(url)
+        except (OSError, sqlite3.Error):
+            return None
+        if recorded is None:
+            return None
+        return recorded[0], recorded[3].decode("utf-8", "replace")
+    resp = await client.get(url, timeout=timeout_s)
+    if assets.mode == MODE_RECORD and resp.status_code == 200:
+        await assets.store(url, resp.status_code, dict(resp.headers), resp.content, pinned=True)
+    return resp.status_code, resp.text
+
+
+async def fetch_component_source(
+    url: str, deadline: Optional[Deadline] = None
+) -> Optional[Dict[str, str]]:
+    """返回 {"html", "css"}；快速路径不可用时返回 None。"""
+    if not DIRECT_FETCH_ENABLED:
+        return None
+    deadline = deadline or Deadline()
+    client = _get_client()
+
+    parts = component_parts(url)
+    if parts is not None:
+        author, slug = parts
+        for template in sorted(learned_endpoints()):
+            endpoint = template.replace("{author}", author).replace("{slug}", slug)
+            try:
+                resp = await _get(client, endpoint, _attempt_timeout_s(deadline))
+                if resp is not None and resp[0] == 200:
+                    fields = find_code_fields(json.loads(resp[1]), url)
+                    if fields:
+                        return fields
+            except (httpx.HTTPError, ValueError):
+                continue
+
+    try:
+        resp = await _get(client, url, _attempt_timeout_s(deadline))
+    except httpx.HTTPError:
+        return None
+    if resp is None or resp[0] != 200:
+        return None
+    for state in embedded_states(resp[1]):
+        fields = find_code_fields(state, url)
+        if fields:
+            return fields
+    return None
@@ -0,0 +1,398 @@
+"""
+统一的提取引擎：执行声明式的框架档案（见 framework_profiles.py）。
+
+页面导航、布局分类、状态读取、剪贴板加锁、回退逻辑与步骤超时（见 deadline.py）都在这里统一实现。
+本模块随 Playwright 一起在首次提取时才被导入。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from browser_pool import get_browser_manager
+from deadline import FALLBACK_RESERVE_MS, Deadline, DeadlineExceeded
+from framework_profiles import FrameworkProfile, PaneSpec, get_profile
+from metrics import CODE_SOURCES, COPY_RETRIES, LAYOUT_LOOKUPS
+from page_capture import (
+    first_texts,
+    goto_component,
+    read_dom_code,
+    read_state_code,
+    read_textarea_code,
+)
+
+DIALOG_CLOSE_TIMEOUT_MS = 5000
+CLIPBOARD_POLL_INTERVAL_MS = 200
+COPY_BACKOFF_MS = 250
+
+# 页面布局：HTML + TailwindCSS 组合（单个 Copy 按钮）、HTML/CSS 分栏、框架代码弹窗
+LAYOUT_COMBINED = "combined"
+LAYOUT_SPLIT = "split"
+LAYOUT_DIALOG = "dialog"
+LAYOUT_UNKNOWN = "unknown"
+LAYOUT_CACHE_ITEMS = 1024
+# HTML 图标的 SVG 路径，只出现在组合布局中
+HTML_ICON_PATH = (
+    "M12 18.178l4.62-1.256.623-6.778H9.026L8.822 7.89h8.626l.227-2.211H6.325l.636 6.678h7.82"
+    "l-.261 2.866-2.52.667-2.52-.667-.158-1.844h-2.27l.329 3.544L12 18.178zM3 2h18l-1.623 18L12 22"
+    "l-7.377-2L3 2z"
+)
+COMBINED_COPY_ATTR = "data-uiverse-combined-copy"
+
+# 一次页面内求值完成布局分类；组合布局同时给它的 Copy 按钮打上标记，之后只需一次点击
+_CLASSIFY_LAYOUT_JS = """
+([iconPath, copyAttr]) => {
+    const lower = (document.body ? document.body.textContent || "" : "").toLowerCase();
+    const hasIcon = Array.from(document.querySelectorAll("svg path"))
+        .some((path) => path.getAttribute("d") === iconPath);
+    if (hasIcon && lower.includes("html") && lower.includes("tailwindcss")) {
+        const candidates = document.querySelectorAll(
+            "button, [role=button], .copy-btn, .copy-button"
+        );
+        for (const el of candidates) {
+            const label = (el.textContent || "").toLowerCase();
+            if (label.includes("copy") || el.matches(".copy-btn, .copy-button")) {
+                el.setAttribute(copyAttr, "1");
+                return "combined";
+            }
+        }
+    }
+    if (document.querySelector("button.copy-all.CSS, button.copy-all.HTML")) {
+        return "split";
+    }
+    const buttons = document.querySelectorAll("button, [role=button]");
+    for (const el of buttons) {
+        if ((el.textContent || "").trim() === "React") return "dialog";
+    }
+    return "unknown";
+}
+"""
+
+
+async def _present(locator) -> bool:
+    """元素当前是否在 DOM 中；不等待。"""
+    try:
+        return await locator.count() > 0
+    except Exception:
+        return False
+
+
+async def _clear_clipboard(page) -> None:
+    """
+    剪贴板由同一浏览器进程的所有页面共享：在 clipboard_lock 内、点击 Copy 之前清空，
+    之后读到的非空内容才一定来自本次复制，而不是其他请求留下的代码。
+    """
+    try:
+        await page.evaluate('navigator.clipboard.writeText("")')
+    except Exception:
+        pass
+
+
+async def _read_clipboard_nonempty(page, deadline: Deadline) -> str:
+    start = time.monotonic()
+    give_up_at = start + deadline.timeout_ms("clipboard") / 1000
+    while True:
+        try:
+            txt = await page.evaluate("navigator.clipboard.readText()")
+            if txt and txt.strip():
+                deadline.observe("clipboard", start)
+                return txt
+        except Exception:
+            pass
+        if time.monotonic() >= give_up_at:
+            deadline.observe("clipboard", start, ok=False)
+            return ""
+        await page.wait_for_timeout(CLIPBOARD_POLL_INTERVAL_MS)
+
+
+async def _first_text_by_selectors(scope, selectors: Tuple[str, ...]) -> str:
+    """第一个匹配 selectors 的元素的文本；所有选择器在一次 evaluate 中完成。"""
+    return (await first_texts(scope, [selectors]))[0]
+
+
+class LayoutCache:
+    """按组件缓存页面布局分类（同一组件的布局不会变化），LRU 淘汰。"""
+
+    def __init__(self, max_items: int = LAYOUT_CACHE_ITEMS):
+        self._max_items = max_items
+        self._layouts: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path.rstrip('/')}"
+
+    def get(self, url: str) -> Optional[str]:
+        key = self.key(url)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self._layouts.move_to_end(key)
+        return layout
+
+    def set(self, url: str, layout: str) -> None:
+        key = self.key(url)
+        self._layouts[key] = layout
+        self._layouts.move_to_end(key)
+        while len(self._layouts) > self._max_items:
+            self._layouts.popitem(last=False)
+
+
+_layout_cache = LayoutCache()
+
+
+def get_layout_cache() -> LayoutCache:
+    return _layout_cache
+
+
+async def classify_layout(page) -> str:
+    """
+    返回页面布局：LAYOUT_COMBINED / LAYOUT_SPLIT / LAYOUT_DIALOG，无法判断时为 LAYOUT_UNKNOWN。
+    已缓存的组合布局之外，其余布局命中缓存时不访问页面；组合布局每次都要重新标记 Copy 按钮。
+    """
+    cached = _layout_cache.get(page.url)
+    if cached is not None and cached != LAYOUT_COMBINED:
+        LAYOUT_LOOKUPS.inc(layout=cached, cached="true")
+        return cached
+    try:
+        layout = await page.evaluate(_CLASSIFY_LAYOUT_JS, [HTML_ICON_PATH, COMBINED_COPY_ATTR])
+    except Exception:
+        layout = LAYOUT_UNKNOWN
+    if layout != LAYOUT_UNKNOWN:
+        _layout_cache.set(page.url, layout)
+    LAYOUT_LOOKUPS.inc(layout=layout, cached="false")
+    return layout
+
+
+async def _click_copy_button_direct(page, deadline: Deadline) -> bool:
+    """
+    点击组合布局中由 classify_layout 标记的 Copy 按钮；该按钮没有已复制标记，
+    由调用方在点击前清空剪贴板，再轮询到非空内容为止。
+    """
+    button = page.locator(f"[{COMBINED_COPY_ATTR}]").first
+    if not await _present(button):
+        return False
+    try:
+        with deadline.step("copy"):
+            await button.wait_for(state="visible", timeout=deadline.timeout_ms("copy"))
+            await button.click()
+        return True
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        return False
+
+
+async def _click_and_wait_copied(page, scope, pane: PaneSpec, deadline: Deadline) -> bool:
+    """
+    点击窗格的 Copy 按钮并等待按钮文字变为已复制标记，最多尝试 pane.copy_retries 次。
+    按钮不在 DOM 中时立即放弃，交给后续的回退读取。
+    """
+    button = scope.locator(pane.copy_selector).first
+    if not await _present(button):
+        return False
+    for attempt in range(pane.copy_retries):
+        try:
+            with deadline.step("copy"):
+                await button.wait_for(state="visible", timeout=deadline.timeout_ms("copy"))
+                await button.click()
+            with deadline.step("copied"):
+                await button.locator(".copy-all__text").filter(
+                    has_text=pane.copied_text
+                ).first.wait_for(timeout=deadline.timeout_ms("copied"))
+            return True
+        except DeadlineExceeded:
+            return False
+        except Exception:
+            if attempt + 1 < pane.copy_retries:
+                COPY_RETRIES.inc(pane=pane.name)
+                backoff_ms = COPY_BACKOFF_MS * 2 ** attempt
+                if deadline.remaining_s * 1000 <= backoff_ms + FALLBACK_RESERVE_MS:
+                    return False
+                await page.wait_for_timeout(backoff_ms)
+    return False
+
+
+async def _open_dialog(page, menu_path: Tuple[Tuple[str, str], ...], deadline: Deadline):
+    for index, (role, name) in enumerate(menu_path):
+        item = page.get_by_role(role, name=name)
+        # 菜单入口在页面就绪时就应存在；不存在说明页面结构不同，立即失败
+        if index == 0 and not await _present(item):
+            raise LookupError(f"页面中没有 {role} “{name}”")
+        with deadline.step("menu"):
+            await item.wait_for(state="visible", timeout=deadline.timeout_ms("menu"))
+            await item.click()
+    dialog = page.get_by_role("dialog")
+    with deadline.step("dialog"):
+        await dialog.wait_for(state="visible", timeout=deadline.timeout_ms("dialog"))
+    return dialog
+
+
+async def _close_dialog(page) -> None:
+    """关闭框架代码弹窗，以便再次打开下拉菜单。"""
+    dialog = page.get_by_role("dialog")
+    if await dialog.count() == 0:
+        return
+    await page.keyboard.press("Escape")
+    try:
+        await dialog.first.wait_for(state="hidden", timeout=DIALOG_CLOSE_TIMEOUT_MS)
+    except Exception:
+        pass
+
+
+async def _textarea_value(scope, selectors: Tuple[str, ...]) -> str:
+    textarea = scope.locator(", ".join(selectors)).first
+    try:
+        if await textarea.count() == 0:
+            return ""
+        return await textarea.input_value()
+    except Exception:
+        try:
+            return await textarea.evaluate("el => el.value")
+        except Exception:
+            return ""
+
+
+async def _extract_pane(page, scope, pane: PaneSpec, clipboard_lock, deadline: Deadline) -> str:
+    """
+    依次尝试：直接读取文本域 → 点击 Copy 并读取剪贴板 → 读取文本域当前值 → 备用选择器。
+    """
+    if pane.tab:
+        tab = page.get_by_role("tab", name=pane.tab)
+        if not await _present(tab):
+            raise LookupError(f"页面中没有 “{pane.tab}” 标签页")
+        with deadline.step("tab"):
+            await tab.wait_for(state="visible", timeout=deadline.timeout_ms("tab"))
+            await tab.click()
+
+    code, source = "", "none"
+    if pane.textarea_selectors:
+        start = time.monotonic()
+        code = await read_textarea_code(
+            page, scope, ", ".join(pane.textarea_selectors), deadline.timeout_ms("textarea")
+        )
+        deadline.observe("textarea", start, ok=bool(code))
+        source = "textarea"
+    if not code:
+        async with clipboard_lock:
+            await _clear_clipboard(page)
+            if await _click_and_wait_copied(page, scope, pane, deadline):
+                code = await _read_clipboard_nonempty(page, deadline)
+        source = "clipboard"
+    if not code and pane.textarea_selectors:
+        deadline.report("fallback", field=pane.name, via="textarea_value")
+        code = await _textarea_value(scope, pane.textarea_selectors)
+        source = "textarea_value"
+    if not code and pane.fallback_selectors:
+        deadline.report("fallback", field=pane.name, via="fallback_selectors")
+        with deadline.step("fallback_selectors"):
+            code = await _first_text_by_selectors(scope, pane.fallback_selectors)
+        source = "fallback_selectors"
+    CODE_SOURCES.inc(pane=pane.name, source=source if code else "none")
+    return code
+
+
+def _report_field(deadline: Deadline, framework: str, name: str, code: str) -> None:
+    """把已取得的字段作为部分结果发出，其余字段仍在提取时客户端即可先拿到它。"""
+    size = len(code.encode("utf-8"))
+    deadline.report("field", framework=framework, field=name, bytes=size, code=code)
+
+
+async def extract_fields(page, profile: FrameworkProfile, deadline: Deadline) -> Dict[str, str]:
+    """在已打开的组件页面上按档案提取各字段（不负责导航）；每取得一个字段即通过 deadline 发出。"""
+    clipboard_lock = get_browser_manager().clipboard_lock(page)
+
+    if profile.page_state:
+        # 优先从已捕获的网络响应或页面应用状态读取，免去点击 Copy 与剪贴板轮询
+        with deadline.step("state_read"):
+            fields = await read_state_code(page)
+        if fields:
+            CODE_SOURCES.inc(pane="html", source="state")
+            CODE_SOURCES.inc(pane="css", source="state")
+            for name, code in fields.items():
+                _report_field(deadline, profile.name, name, code)
+            return fields
+
+    layout = LAYOUT_UNKNOWN
+    if profile.detect_special_layout:
+        with deadline.step("layout"):
+            layout = await classify_layout(page)
+    if layout == LAYOUT_COMBINED:
+        # 特殊内容（HTML + TailwindCSS）只有一个 Copy 按钮，复制的是 HTML 与 CSS 的组合
+        async with clipboard_lock:
+            await _clear_clipboard(page)
+            copy_ok = await _click_copy_button_direct(page, deadline)
+            combined = await _read_clipboard_nonempty(page, deadline) if copy_ok else ""
+        if combined:
+            CODE_SOURCES.inc(pane="combined", source="special")
+            _report_field(deadline, profile.name, "combined", combined)
+            return {"combined": combined}
+
+    scope = page
+    if profile.menu_path:
+        scope = await _open_dialog(page, profile.menu_path, deadline)
+        deadline.report("framework_selected", framework=profile.name)
+    fields: Dict[str, str] = {}
+    if profile.notes_selectors:
+        fields["notes"] = await _first_text_by_selectors(scope, profile.notes_selectors)
+    # 正在显示的代码窗格一次从 DOM 读出，免去点击 Copy 与剪贴板轮询；未选中的标签页照常切换后读取
+    dom_panes = [pane for pane in profile.panes if pane.dom_selectors]
+    prefilled: Dict[str, str] = {}
+    if dom_panes:
+        with deadline.step("dom_read"):
+            texts = await read_dom_code(scope, [pane.dom_selectors for pane in dom_panes])
+        prefilled = {pane.name: text for pane, text in zip(dom_panes, texts) if text.strip()}
+    for pane in profile.panes:
+        if pane.name in prefilled:
+            fields[pane.name] = prefilled[pane.name]
+            CODE_SOURCES.inc(pane=pane.name, source="dom")
+        else:
+            fields[pane.name] = await _extract_pane(page, scope, pane, clipboard_lock, deadline)
+        if fields[pane.name]:
+            _report_field(deadline, profile.name, pane.name, fields[pane.name])
+    return fields
+
+
+async def extract(url: str, framework: str, deadline: Optional[Deadline] = None) -> Dict[str, str]:
+    """打开组件页面并按框架档案提取，返回各字段（保留原始换行，由 render 生成 Markdown）。"""
+    profile = get_profile(framework)
+    deadline = deadline or Deadline()
+    start = time.monotonic()
+    async with get_browser_manager().lease_page() as page:
+        deadline.observe("lease", start)
+        await goto_component(page, url, profile.filter_profile, profile.ready_selector, deadline)
+        deadline.report("navigated", url=url)
+        return await extract_fields(page, profile, deadline)
+
+
+async def extract_many(
+    url: str, frameworks: List[str], deadline: Optional[Deadline] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    一次页面加载依次提取多个框架：每个框架提取完成后关闭弹窗，继续下一个。
+    返回 {"results": {框架: 字段}, "errors": {框架: 错误信息}, "error_types": {框架: 异常类型名}}；
+    单个框架失败不影响其他框架。所有框架共用同一个请求时限。
+    """
+    profiles = [get_profile(name) for name in frameworks]
+    deadline = deadline or Deadline()
+    results: Dict[str, Dict[str, str]] = {}
+    errors: Dict[str, str] = {}
+    error_types: Dict[str, str] = {}
+    if not profiles:
+        return {"results": results, "errors": errors, "error_types": error_types}
+    # 只要包含弹窗类框架就使用其过滤档案（放行代码转换所需的 CDN）与就绪元素
+    primary = next((p for p in profiles if p.menu_path), profiles[0])
+    start = time.monotonic()
+    async with get_browser_manager().lease_page() as page:
+        deadline.observe("lease", start)
+        await goto_component(page, url, primary.filter_profile, primary.ready_selector, deadline)
+        deadline.report("navigated", url=url)
+        for profile in profiles:
+            try:
+                results[profile.name] = await extract_fields(page, profile, deadline)
+            except Exception as exc:
+                errors[profile.name] = f"{type(exc).__name__}: {exc}"
+                error_types[profile.name] = type(exc).__name__
+            finally:
+                await _close_dialog(page)
+    return {"results": results, "errors": errors, "error_types": error_types}
@@ -0,0 +1,252 @@
+"""
+失败防护：让注定失败的请求快速失败，而不是每次都走完超时、重试与回退读取。
+
+- 负缓存（NegativeCache）：同一 (框架, 链接) 连续失败 NEGATIVE_AFTER_FAILURES 次（页面 404/410 时一次即可）后，
+  在 UIVERSE_NEGATIVE_TTL_S 内直接以 ComponentUnavailableError 拒绝，并给出最近的错误；force_refresh 跳过
+- 熔断器（CircuitBreaker）：按框架统计最近 BREAKER_WINDOW 次浏览器提取，至少 BREAKER_MIN_CALLS 次且失败率
+  达到 UIVERSE_BREAKER_FAILURE_RATE 时断开（例如站点改版后 “React” 下拉菜单不再匹配）。断开期间该框架的
+  请求以 CircuitOpenError 立即失败并附带诊断；UIVERSE_BREAKER_OPEN_S 秒后进入半开状态，放行一个探测请求，
+  成功则恢复，失败则重新断开
+"""
+
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from metrics import get_registry
+
+NEGATIVE_TTL_S = float(os.environ.get("UIVERSE_NEGATIVE_TTL_S", "600"))
+NEGATIVE_AFTER_FAILURES = 2
+NEGATIVE_CACHE_ITEMS = 4096
+
+BREAKER_FAILURE_RATE = float(os.environ.get("UIVERSE_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_S = float(os.environ.get("UIVERSE_BREAKER_OPEN_S", "60"))
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 8
+BREAKER_RECENT_ERRORS = 3
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_NEGATIVE_HITS = get_registry().counter(
+    "uiverse_negative_cache_hits_total", "Requests rejected by the negative result cache"
+)
+_BREAKER_TRANSITIONS = get_registry().counter(
+    "uiverse_breaker_transitions_total", "Circuit breaker state changes by framework and state"
+)
+_BREAKER_REJECTED = get_registry().counter(
+    "uiverse_breaker_rejected_total", "Requests rejected by an open circuit breaker"
+)
+
+
+class ComponentNotFoundError(LookupError):
+    """组件页面返回 404 / 410。"""
+
+
+class ComponentUnavailableError(LookupError):
+    """该组件最近反复提取失败，负缓存期内不再尝试。"""
+
+
+class CircuitOpenError(RuntimeError):
+    """该框架的熔断器已断开。"""
+
+
+class ExtractionFailed(RuntimeError):
+    """只以 “类型: 信息” 文本形式得知的失败（如一次页面加载提取多个框架时的单个框架错误）。"""
+
+
+def _describe(error: BaseException) -> str:
+    if isinstance(error, ExtractionFailed):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+class NegativeCache:
+    """(框架, 链接) → (连续失败次数, 最近错误, 最近失败时间)；只存在于进程内。"""
+
+    def __init__(self, ttl_s: float = NEGATIVE_TTL_S, max_items: int = NEGATIVE_CACHE_ITEMS):
+        self._ttl_s = ttl_s
+        self._max_items = max_items
+        self._entries: "OrderedDict[str, Tuple[int, str, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_s > 0
+
+    def check(self, key: str) -> None:
+        """已确定不可用时抛出 ComponentUnavailableError。"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        failures, error, failed_at = entry
+        age_s = time.time() - failed_at
+        if age_s > self._ttl_s:
+            del self._entries[key]
+            return
+        if failures < NEGATIVE_AFTER_FAILURES:
+            return
+        _NEGATIVE_HITS.inc()
+        raise ComponentUnavailableError(
+            f"该组件最近连续 {failures} 次提取失败（最近错误：{error}），"
+            f"{self._ttl_s - age_s:.0f} 秒内不再重试；可用 force_refresh=True 强制重试"
+        )
+
+    def record_failure(self, key: str, error: BaseException) -> None:
+        if not self.enabled:
+            return
+        failures = self._entries.get(key, (0, "", 0.0))[0] + 1
+        if isinstance(error, ComponentNotFoundError):
+            failures = max(failures, NEGATIVE_AFTER_FAILURES)
+        self._entries[key] = (failures, _describe(error), time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_items:
+            self._entries.popitem(last=False)
+
+    def record_success(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        open_s: float = BREAKER_OPEN_S,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+    ):
+        self.name = name
+        self._failure_rate = failure_rate
+        self._open_s = open_s
+        self._min_calls = max(1, min_calls)
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window))
+        self._errors: Deque[str] = deque(maxlen=BREAKER_RECENT_ERRORS)
+        self.state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return 0 < self._failure_rate <= 1
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            _BREAKER_TRANSITIONS.inc(framework=self.name, state=state)
+
+    def _failure_ratio(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def admit(self) -> bool:
+        """
+        请求开始浏览器提取前调用：断开时抛出 CircuitOpenError；返回值表示本次是否为半开探测，
+        需原样传给 record()。
+        """
+        if not self.enabled or self.state == STATE_CLOSED:
+            return False
+        retry_in_s = self._opened_at + self._open_s - time.monotonic()
+        if self.state == STATE_OPEN and retry_in_s <= 0:
+            self._set_state(STATE_HALF_OPEN)
+        if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        _BREAKER_REJECTED.inc(framework=self.name)
+        wait = f"{max(0.0, retry_in_s):.0f} 秒后" if self.state == STATE_OPEN else "探测请求完成后"
+        recent = "；".join(self._errors) or "无"
+        raise CircuitOpenError(
+            f"{self.name} 提取已熔断：最近 {len(self._outcomes)} 次中失败率 "
+            f"{self._failure_ratio():.0%}，页面结构可能已变化（最近错误：{recent}）。{wait}自动重试"
+        )
+
+    def record(
+        self, ok: Optional[bool], probe: bool = False, error: Optional[BaseException] = None
+    ) -> None:
+        """记录一次浏览器提取的结果；ok 为 None 表示未得出结论（如被取消），只释放探测名额。"""
+        if probe:
+            self._probe_in_flight = False
+        if ok is None or not self.enabled:
+            return
+        if not ok and error is not None:
+            self._errors.append(_describe(error))
+        if probe:
+            if ok:
+                self._outcomes.clear()
+                self._set_state(STATE_CLOSED)
+            else:
+                self._open()
+            return
+        self._outcomes.append(ok)
+        if (
+            self.state == STATE_CLOSED
+            and len(self._outcomes) >= self._min_calls
+            and self._failure_ratio() >= self._failure_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._set_state(STATE_OPEN)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "failure_rate": round(self._failure_ratio(), 3),
+            "rejected": self.rejected,
+            "recent_errors": list(self._errors),
+        }
+
+
+_negative = NegativeCache()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_negative_cache() -> NegativeCache:
+    return _negative
+
+
+def get_breaker(framework: str) -> CircuitBreaker:
+    breaker = _breakers.get(framework)
+    if breaker is None:
+        breaker = _breakers[framework] = CircuitBreaker(framework)
+    return breaker
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "negative_cache_entries": len(_negative),
+        "breakers": {name: breaker.stats() for name, breaker in sorted(_breakers.items())},
+    }
+
+
+def _collect_metrics():
+    samples: List[Tuple[Dict[str, str], float]] = [
+        ({"framework": name}, 0 if breaker.state == STATE_CLOSED else 1)
+        for name, breaker in sorted(_breakers.items())
+    ]
+    return [
+        (
+            "uiverse_breaker_open",
+            "gauge",
+            "1 while a framework's circuit breaker is not closed",
+            samples,
+        ),
+        (
+            "uiverse_negative_cache_entries",
+            "gauge",
+            "Entries in the negative result cache",
+            [({}, len(_negative))],
+        ),
+    ]
+
+
+get_registry().register_collector(_collect_metrics)
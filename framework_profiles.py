@@ -0,0 +1,148 @@
+"""
+框架档案（FrameworkProfile）：每个框架只描述差异——打开代码弹窗的菜单路径、要读取的代码窗格
+（Copy 按钮、备用文本域与选择器）、输出 Markdown 的代码块语言，以及使用的请求过滤档案与就绪元素。
+
+本模块不依赖 Playwright，服务启动与 list_supported_frameworks 等轻量工具只需导入这里；
+执行档案的提取引擎见 extractor_engine.py。新增框架（如 Angular、Solid）只需在 PROFILES 中添加一项。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 框架弹窗中保存完整代码的文本域
+DIALOG_TEXTAREAS = ("textarea[name=code]", "textarea#codeArea2")
+
+
+def _one_line(text: Optional[str]) -> str:
+    if text is None:
+        return ""
+    return text.replace("\r", " ").replace("\n", " ")
+
+
+@dataclass(frozen=True)
+class PaneSpec:
+    """
+    一个代码窗格：结果字段名（同时是结构化输出中的字段，如 html、css、tsx）、
+    Markdown 标题与代码块语言，以及读取它的各种途径。
+    """
+
+    name: str
+    title: str
+    language: str
+    copy_selector: str = "button.copy-all"
+    copied_text: str = "Copied"
+    tab: Optional[str] = None
+    copy_retries: int = 1
+    textarea_selectors: Tuple[str, ...] = ()
+    # 只含完整代码的元素（如 [data-language=css]），正在显示的窗格在一次 DOM 读取中读出，读到即跳过点击
+    dom_selectors: Tuple[str, ...] = ()
+    fallback_selectors: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FrameworkProfile:
+    name: str
+    panes: Tuple[PaneSpec, ...]
+    # 依次点击的 (role, name)，最后等待代码弹窗出现；为空表示代码直接在页面的标签页中
+    menu_path: Tuple[Tuple[str, str], ...] = ()
+    filter_profile: str = "default"
+    ready_selector: Optional[str] = None
+    notes_title: Optional[str] = None
+    notes_selectors: Tuple[str, ...] = ()
+    output_order: Tuple[str, ...] = ()
+    # 页面数据中直接带有 html/css 字段，可跳过点击
+    page_state: bool = False
+    detect_special_layout: bool = False
+
+    def render(self, fields: Dict[str, str]) -> str:
+        """按档案把提取到的字段渲染为单行 Markdown。"""
+        if fields.get("combined"):
+            return f"### HTML+CSS（特殊内容） ```html {_one_line(fields['combined'])} ```"
+        parts: List[str] = []
+        if self.notes_title is not None:
+            parts.append(f"### {self.notes_title} {_one_line(fields.get('notes'))}")
+        panes = {pane.name: pane for pane in self.panes}
+        for name in self.output_order or tuple(panes):
+            pane = panes[name]
+            parts.append(f"### {pane.title} ```{pane.language} {_one_line(fields.get(name))} ```")
+        return " ".join(parts)
+
+
+def _framework(name: str, language: str, **options) -> FrameworkProfile:
+    """通过 “React” 下拉菜单打开代码弹窗的框架。"""
+    return FrameworkProfile(
+        name=name,
+        panes=(
+            PaneSpec(
+                name=language,
+                title=name,
+                language=language,
+                copied_text="✔",
+                textarea_selectors=DIALOG_TEXTAREAS,
+            ),
+        ),
+        menu_path=(("button", "React"), ("menuitem", name)),
+        filter_profile="framework",
+        ready_selector='role=button[name="React"]',
+        **options,
+    )
+
+
+PROFILES: Dict[str, FrameworkProfile] = {
+    "HTML": FrameworkProfile(
+        name="HTML",
+        panes=(
+            PaneSpec(
+                name="css",
+                title="CSS",
+                language="css",
+                copy_selector="button.copy-all.CSS",
+                copy_retries=3,
+                dom_selectors=('[data-language="css"]',),
+                fallback_selectors=('[data-language="css"]', "pre:has-text('{')", "code:has-text('{')"),
+            ),
+            PaneSpec(
+                name="html",
+                title="HTML",
+                language="html",
+                copy_selector="button.copy-all.HTML",
+                tab="HTML",
+                copy_retries=3,
+                dom_selectors=('[data-language="html"]',),
+                fallback_selectors=(
+                    '[data-language="html"]',
+                    "pre:has-text('<')",
+                    "code:has-text('<')",
+                    "textarea",
+                ),
+            ),
+        ),
+        filter_profile="HTML",
+        ready_selector="button.copy-all",
+        output_order=("html", "css"),
+        page_state=True,
+        detect_special_layout=True,
+    ),
+    "React": _framework(
+        "React",
+        "tsx",
+        notes_title="内容",
+        notes_selectors=(
+            "div.text-offwhite",
+            "[data-testid=modal] .text-offwhite",
+            "div:has(a[href*='styled-components'])",
+        ),
+    ),
+    "Vue": _framework("Vue", "vue"),
+    "Svelte": _framework("Svelte", "svelte"),
+    "Lit": _framework("Lit", "ts"),
+}
+
+
+def get_profile(framework: str) -> FrameworkProfile:
+    """按名称（不区分大小写）查找框架档案。"""
+    fw = framework.strip().lower()
+    for name, profile in PROFILES.items():
+        if name.lower() == fw:
+            return profile
+    raise ValueError(f"不支持的框架: {framework}")
@@ -0,0 +1,277 @@
+"""
+进程内指标：计数器、直方图与最近请求的步骤追踪。
+
+不依赖 prometheus_client；render_prometheus() 输出 Prometheus 文本格式，
+SSE / HTTP 传输下由 /metrics 路由暴露，stdio 部署通过 get_stats 工具读取 snapshot()。
+其他模块的现有统计（请求过滤、准入队列、步骤超时）通过 register_collector 接入。
+工作进程模式下，工作进程在每次回传时附带自上次回传以来的增量（export_delta），由服务进程并入（merge_delta）。
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 单位为秒的默认直方图分桶：覆盖从毫秒级的缓存命中到数十秒的浏览器提取
+DEFAULT_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 45, 90)
+RECENT_TRACES = 20
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """已排序样本的 q 分位数（0 ≤ q ≤ 1，取最近秩）；没有样本时为 0。"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [{**dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+    def values(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, delta: Dict[LabelKey, float]) -> None:
+        with self._lock:
+            for key, value in delta.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 每组标签：[各桶计数..., 总和, 总数]
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def _quantile(self, entry: List[float], q: float) -> float:
+        # 取第一个累计计数达到 q 的桶的上界
+        target = q * entry[-1]
+        for i, bound in enumerate(self.buckets):
+            if entry[i] >= target:
+                return bound if bound != math.inf else self.buckets[-2]
+        return self.buckets[-2]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, entry in sorted(self._values.items()):
+            for i, bound in enumerate(self.buckets):
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} "
+                    f"{_format_value(entry[i])}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(round(entry[-2], 6))}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(entry[-1])}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        result = []
+        for key, entry in sorted(self._values.items()):
+            count = entry[-1]
+            result.append(
+                {
+                    **dict(key),
+                    "count": int(count),
+                    "avg_s": round(entry[-2] / count, 4) if count else 0.0,
+                    "p50_s_le": self._quantile(entry, 0.5),
+                    "p95_s_le": self._quantile(entry, 0.95),
+                }
+            )
+        return result
+
+    def values(self) -> Dict[LabelKey, List[float]]:
+        with self._lock:
+            return {key: list(entry) for key, entry in self._values.items()}
+
+    def merge(self, delta: Dict[LabelKey, List[float]]) -> None:
+        with self._lock:
+            for key, values in delta.items():
+                entry = self._values.get(key)
+                if entry is None:
+                    entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+                for i, value in enumerate(values):
+                    entry[i] += value
+
+
+# 采集器返回 [(指标名, 类型, 说明, [(标签, 值), ...]), ...]，在输出时才读取
+Collector = Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]]]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Collector] = []
+        self._traces: Deque[Dict[str, Any]] = deque(maxlen=RECENT_TRACES)
+        # export_delta 上次导出时各指标的值
+        self._exported: Dict[str, Dict[LabelKey, Any]] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(
+        self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def export_delta(self, exclude: Tuple[str, ...] = ()) -> Dict[str, Dict[LabelKey, Any]]:
+        """自上次调用以来各计数器与直方图的增量，只含有变化的标签组。"""
+        delta: Dict[str, Dict[LabelKey, Any]] = {}
+        for name, metric in self._metrics.items():
+            if name in exclude:
+                continue
+            current = metric.values()
+            previous = self._exported.get(name, {})
+            changes: Dict[LabelKey, Any] = {}
+            for key, value in current.items():
+                before = previous.get(key)
+                if isinstance(value, list):
+                    diff = [a - b for a, b in zip(value, before)] if before else value
+                    if any(diff):
+                        changes[key] = diff
+                elif value != (before or 0):
+                    changes[key] = value - (before or 0)
+            self._exported[name] = current
+            if changes:
+                delta[name] = changes
+        return delta
+
+    def merge_delta(self, delta: Dict[str, Dict[LabelKey, Any]]) -> None:
+        """并入其他进程 export_delta 的结果；本进程未定义的指标忽略。"""
+        for name, changes in delta.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(changes)
+
+    def add_trace(self, trace: Dict[str, Any]) -> None:
+        self._traces.append(trace)
+
+    def _collected(self):
+        for collector in self._collectors:
+            try:
+                yield from collector()
+            except Exception:
+                continue
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for name, kind, help_text, samples in self._collected():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "metrics": {name: metric.snapshot() for name, metric in self._metrics.items()},
+            "collected": {
+                name: [{**labels, "value": value} for labels, value in samples]
+                for name, _, _, samples in self._collected()
+            },
+            "recent_traces": list(self._traces),
+        }
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def diff_numbers(current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+    """两份统计字典（可嵌套）中数值字段的差，只含有变化的字段；非数值字段忽略。"""
+    delta: Dict[str, Any] = {}
+    for key, value in current.items():
+        before = previous.get(key)
+        if isinstance(value, dict):
+            sub = diff_numbers(value, before if isinstance(before, dict) else {})
+            if sub:
+                delta[key] = sub
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            diff = value - (before if isinstance(before, (int, float)) else 0)
+            if diff:
+                delta[key] = diff
+    return delta
+
+
+EXTRACTIONS = _registry.counter(
+    "uiverse_extractions_total", "Extraction requests by framework, source and outcome"
+)
+EXTRACT_SECONDS = _registry.histogram(
+    "uiverse_extract_seconds", "End-to-end extraction latency by framework and source"
+)
+STEP_SECONDS = _registry.histogram(
+    "uiverse_step_seconds", "Latency of individual extraction steps by step and outcome"
+)
+CODE_SOURCES = _registry.counter(
+    "uiverse_code_source_total", "Which read path produced the code of a pane"
+)
+LAYOUT_LOOKUPS = _registry.counter(
+    "uiverse_layout_lookups_total", "Page layout classifications by layout and cache hit"
+)
+COPY_RETRIES = _registry.counter("uiverse_copy_retries_total", "Copy button retries by pane")
+CACHE_LOOKUPS = _registry.counter("uiverse_cache_lookups_total", "Result cache lookups by tier")
+BROWSER_LAUNCHES = _registry.counter("uiverse_browser_launches_total", "Chromium launches")
+BROWSER_LAUNCH_SECONDS = _registry.histogram(
+    "uiverse_browser_launch_seconds", "Time to start Playwright and launch Chromium"
+)
@@ -0,0 +1,202 @@
+"""
+不经剪贴板读取代码：记录页面加载过程中的 JSON 响应，读取页面内的应用状态，
+直接读取框架弹窗中代码文本域的值，以及在一次 evaluate 中按多组选择器读取代码窗格的文本。
+
+UIVERSE_CAPTURE_MODE=state（默认）时提取引擎先走这里，取不到再回退到点击 Copy + 读取剪贴板；
+设为 clipboard 则只使用原有的剪贴板流程。
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from weakref import WeakKeyDictionary
+
+import request_filter
+from component_data import find_code_fields, remember_endpoint
+from deadline import Deadline, DeadlineExceeded
+from failure_guard import ComponentNotFoundError
+
+# domcontentloaded（默认）：DOM 就绪后只等待代码面板所需的元素出现；
+# networkidle / load：与旧行为一致，等待整个页面加载完毕
+LOAD_STRATEGY = os.environ.get("UIVERSE_LOAD_STRATEGY", "domcontentloaded").strip().lower()
+
+CAPTURE_MODE = os.environ.get("UIVERSE_CAPTURE_MODE", "state").strip().lower()
+STATE_CAPTURE = CAPTURE_MODE != "clipboard"
+DIALOG_CODE_TIMEOUT_MS = 5000
+
+# 常见前端框架把路由数据挂在 window 上的位置
+_APP_STATE_JS = """
+() => {
+    const candidates = [
+        () => window.__remixContext && window.__remixContext.state,
+        () => window.__remixRouter && window.__remixRouter.state.loaderData,
+        () => window.__reactRouterDataRouter && window.__reactRouterDataRouter.state.loaderData,
+        () => window.__NEXT_DATA__ && window.__NEXT_DATA__.props,
+    ];
+    const found = [];
+    for (const get of candidates) {
+        try {
+            const value = get();
+            if (value) found.push(JSON.parse(JSON.stringify(value)));
+        } catch (e) {}
+    }
+    return found;
+}
+"""
+
+# 每组选择器依次尝试，返回第一个匹配元素的文本（文本域取 value）；root 为 document 或弹窗元素。
+# visibleOnly 时跳过未显示的元素（隐藏标签页的 innerText 退化为 textContent，逐行 div 的换行会丢失）
+# 与虚拟滚动编辑器中的元素（只渲染了可见的行）
+_FIRST_TEXTS_JS = """
+(root, [groups, visibleOnly]) => groups.map((specs) => {
+    for (const [css, hasText] of specs) {
+        let nodes;
+        try { nodes = root.querySelectorAll(css); } catch (e) { continue; }
+        for (const el of nodes) {
+            if (hasText && !(el.textContent || "").includes(hasText)) continue;
+            if (visibleOnly && (
+                !el.getClientRects().length
+                || getComputedStyle(el).visibility === "hidden"
+                || el.closest(".cm-editor, .monaco-editor")
+            )) continue;
+            const tag = el.tagName;
+            return (tag === "TEXTAREA" || tag === "INPUT" ? el.value : el.innerText) || "";
+        }
+    }
+    return "";
+})
+"""
+# Playwright 的 :has-text() 不是 CSS，拆成 (CSS 选择器, 需包含的文本) 后在页面内过滤
+_HAS_TEXT_RE = re.compile(r"""^(.*):has-text\((['"])(.*)\2\)$""")
+
+_captured: "WeakKeyDictionary[Any, List[Any]]" = WeakKeyDictionary()
+_listeners: "WeakKeyDictionary[Any, Any]" = WeakKeyDictionary()
+
+
+async def goto_component(
+    page,
+    url: str,
+    filter_profile: str = "default",
+    ready_selector: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> None:
+    """
+    导航到组件页面，并在加载过程中记录 xhr/fetch 返回的 JSON 响应。
+    filter_profile 为使用的请求过滤档案；ready_selector 为 domcontentloaded 策略下等待的就绪元素；
+    导航与等待就绪的超时从 deadline 领取；页面返回 404 / 410 时抛出 ComponentNotFoundError。
+    """
+    deadline = deadline or Deadline()
+    page_filter = request_filter.for_page(page)
+    if page_filter is not None:
+        page_filter.use_profile(filter_profile)
+
+    previous = _listeners.pop(page, None)
+    if previous is not None:
+        page.remove_listener("response", previous)
+    responses: List[Any] = []
+
+    def on_response(response) -> None:
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if "json" in (response.headers.get("content-type") or ""):
+            responses.append(response)
+
+    if STATE_CAPTURE:
+        page.on("response", on_response)
+        _listeners[page] = on_response
+    _captured[page] = responses
+
+    wait_until = LOAD_STRATEGY if LOAD_STRATEGY in ("networkidle", "load") else "domcontentloaded"
+    with deadline.step("navigation"):
+        response = await page.goto(
+            url, wait_until=wait_until, timeout=deadline.timeout_ms("navigation")
+        )
+    if response is not None and response.status in (404, 410):
+        raise ComponentNotFoundError(f"组件不存在（HTTP {response.status}）: {url}")
+    if wait_until != "domcontentloaded" or not ready_selector:
+        return
+    try:
+        with deadline.step("ready"):
+            await page.locator(ready_selector).first.wait_for(
+                state="visible", timeout=deadline.timeout_ms("ready")
+            )
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        # 就绪元素未出现时不在此处报错，由后续提取步骤给出具体失败原因
+        pass
+
+
+async def read_state_code(page) -> Optional[Dict[str, str]]:
+    """从已记录的 JSON 响应或页面应用状态中取出 {"html", "css"}。"""
+    if not STATE_CAPTURE:
+        return None
+    for response in list(_captured.get(page, [])):
+        try:
+            fields = find_code_fields(await response.json(), page.url)
+        except Exception:
+            continue
+        if fields:
+            # 记住该接口，之后直连快速路径可以直接请求它
+            remember_endpoint(response.url, page.url)
+            return fields
+    try:
+        states = await page.evaluate(_APP_STATE_JS)
+    except Exception:
+        return None
+    return find_code_fields(states, page.url)
+
+
+def _selector_spec(selector: str) -> Tuple[str, str]:
+    match = _HAS_TEXT_RE.match(selector)
+    if match is None:
+        return selector, ""
+    return match.group(1) or "*", match.group(3)
+
+
+async def first_texts(
+    scope, groups: Sequence[Sequence[str]], visible_only: bool = False
+) -> List[str]:
+    """
+    在 scope（页面或弹窗 Locator）中一次 evaluate 读取多组选择器：每组返回第一个匹配元素的文本，
+    没有匹配时为 ""。取代逐个选择器 count() + inner_text() 的多次往返。
+    visible_only 时只读取正在显示、且不在虚拟滚动编辑器中的元素。
+    """
+    specs = [[_selector_spec(selector) for selector in group] for group in groups]
+    arg = [specs, visible_only]
+    try:
+        first = getattr(scope, "first", None)
+        if first is not None:
+            return await first.evaluate(_FIRST_TEXTS_JS, arg)
+        return await scope.evaluate(f"(arg) => ({_FIRST_TEXTS_JS})(document, arg)", arg)
+    except Exception:
+        return [""] * len(specs)
+
+
+async def read_dom_code(scope, groups: Sequence[Sequence[str]]) -> List[str]:
+    """
+    按各窗格的 dom_selectors 直接读取代码；只读取正在显示的窗格，未选中的标签页返回 ""，
+    由调用方切换标签后照常读取。clipboard 模式下不读取。
+    """
+    if not STATE_CAPTURE or not groups:
+        return [""] * len(groups)
+    return await first_texts(scope, groups, visible_only=True)
+
+
+async def read_textarea_code(
+    page, scope, selector: str, timeout_ms: int = DIALOG_CODE_TIMEOUT_MS
+) -> str:
+    """等待 scope 中的代码文本域被填充后直接读取其值，无需点击 Copy 与轮询剪贴板。"""
+    if not STATE_CAPTURE:
+        return ""
+    textarea = scope.locator(selector).first
+    try:
+        if await textarea.count() == 0:
+            return ""
+        handle = await textarea.element_handle()
+        await page.wait_for_function(
+            "el => !!(el.value && el.value.trim())", arg=handle, timeout=timeout_ms
+        )
+        return await textarea.input_value()
+    except Exception:
+        return ""
@@ -0,0 +1,476 @@
+"""
+可选的代码后处理：在返回给客户端之前压缩提取到的代码，减少进入 LLM 上下文的 token 数。
+
+步骤（按此顺序执行，可任选）：
+- strip_comments：去掉 CSS 注释 /* */ 与标记中的 <!-- --> 注释
+- minify：CSS 去除多余空白、分号与注释
+- dedupe_prefixes：同一声明块中已有标准写法时去掉带浏览器前缀的重复声明（-webkit-transform 等），
+  以及完全相同的重复声明（保留最后一次）；会同时去掉 CSS 注释
+- dedupe_shared：一次提取多个框架时，框架代码 <style> 中与 HTML 的 CSS 相同的内容替换为引用注释
+
+CSS 字段整体按 CSS 处理；html / vue / svelte 等标记字段只处理其中的 <style> 块与标记注释；
+tsx / ts 等脚本字段保持原样。CSS 变换以流式状态机实现（feed 分块输入、逐块输出），
+结果按 (步骤, 内容 sha256) 缓存，重复出现的组件不会再次处理。结果缓存中保存的始终是原始代码。
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from metrics import get_registry
+
+STEP_STRIP_COMMENTS = "strip_comments"
+STEP_MINIFY = "minify"
+STEP_DEDUPE_PREFIXES = "dedupe_prefixes"
+STEP_DEDUPE_SHARED = "dedupe_shared"
+STEPS = (STEP_STRIP_COMMENTS, STEP_MINIFY, STEP_DEDUPE_PREFIXES, STEP_DEDUPE_SHARED)
+
+CSS_FIELDS = frozenset({"css"})
+MARKUP_FIELDS = frozenset({"html", "vue", "svelte", "combined"})
+STREAM_CHUNK_CHARS = 16 * 1024
+POSTPROCESS_CACHE_ITEMS = 512
+SHARED_CSS_MARKER = "/* = HTML css */"
+
+VENDOR_PREFIXES = ("-webkit-", "-moz-", "-ms-", "-o-")
+# 其后的空白可以去掉（括号内除外）
+_NO_SPACE_AFTER = frozenset("{};:,>~+(")
+# 其前的空白可以去掉；不含 ":"，选择器 "a :hover" 与 "a:hover" 含义不同
+_NO_SPACE_BEFORE = frozenset("{};,>~+)!")
+_STYLE_BLOCK_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+_MARKUP_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+
+_BYTES_SAVED = get_registry().counter(
+    "uiverse_postprocess_bytes_saved_total", "Bytes removed from returned code by post-processing"
+)
+_CACHE_LOOKUPS = get_registry().counter(
+    "uiverse_postprocess_cache_lookups_total", "Post-processing cache lookups by result"
+)
+
+
+def check_steps(steps: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    """规范化步骤列表（"all" 表示全部步骤），并按执行顺序返回；未知步骤抛出 ValueError。"""
+    if isinstance(steps, str):
+        steps = steps.split(",")
+    if not steps:
+        return ()
+    names = {str(step).strip().lower() for step in steps}
+    if "all" in names:
+        return STEPS
+    unknown = names - set(STEPS)
+    if unknown:
+        raise ValueError(
+            f"不支持的后处理步骤: {', '.join(sorted(unknown))}（可选 {', '.join(STEPS)} 或 all）"
+        )
+    return tuple(step for step in STEPS if step in names)
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch in "-_%\\" or ord(ch) > 127
+
+
+class CssMinifier:
+    """
+    流式 CSS 变换：feed() 接收任意切分的文本块并返回可以确定的输出，close() 返回剩余部分。
+    总是去掉注释；minify 时另外压缩空白、去掉 "}" 前的分号。字符串内容原样保留。
+
+    注释不等同于空白：".x/**/.y" 是复合选择器 ".x.y"，不能变成后代选择器 ".x .y"，因此去掉注释时
+    不插入空格，只保留注释前后原有的空白。两侧都是词字符时（如 "a/**/b"）直接相连会合成一个词，
+    此时保留一个空注释 "/**/" 作为分隔。
+    """
+
+    def __init__(self, minify: bool = True):
+        self._minify = minify
+        self._quote = ""
+        self._escape = False
+        self._in_comment = False
+        self._slash = False
+        self._star = False
+        self._space = False
+        self._semicolon = False
+        self._joined = False
+        self._depth = 0
+        self._last = ""
+
+    def _emit(self, out: List[str], ch: str) -> None:
+        joined, self._joined = self._joined, False
+        if joined and self._last and _is_word(self._last) and _is_word(ch) and not self._space:
+            out.append("/**/")
+        if self._minify:
+            if self._semicolon:
+                self._semicolon = False
+                if ch != "}":
+                    out.append(";")
+                    self._last = ";"
+            if self._space:
+                self._space = False
+                keep = self._last and (
+                    self._depth > 0
+                    and ch != ","
+                    and self._last not in "(,"
+                    and ch != ")"
+                    or self._last not in _NO_SPACE_AFTER
+                    and ch not in _NO_SPACE_BEFORE
+                )
+                if keep:
+                    out.append(" ")
+            if ch == ";" and self._depth == 0 and not self._quote:
+                # 暂缓输出，紧跟 "}" 时丢弃
+                self._semicolon = True
+                return
+        out.append(ch)
+        self._last = ch
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        for ch in text:
+            if self._in_comment:
+                if self._star and ch == "/":
+                    self._in_comment = False
+                    self._joined = True
+                self._star = ch == "*"
+                continue
+            if self._slash:
+                self._slash = False
+                if ch == "*":
+                    self._in_comment, self._star = True, False
+                    continue
+                self._emit(out, "/")
+            if self._quote:
+                out.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = ""
+                self._last = ch
+                continue
+            if ch == "/":
+                self._slash = True
+                continue
+            if self._minify and ch in " \t\r\n\f":
+                self._space = True
+                continue
+            if ch in "\"'":
+                self._emit(out, ch)
+                self._quote = ch
+                continue
+            if ch == "(":
+                self._emit(out, ch)
+                self._depth += 1
+                continue
+            if ch == ")":
+                self._depth = max(0, self._depth - 1)
+            self._emit(out, ch)
+        return "".join(out)
+
+    def close(self) -> str:
+        out: List[str] = []
+        if self._slash:
+            self._slash = False
+            self._emit(out, "/")
+        if self._semicolon:
+            out.append(";")
+            self._semicolon = False
+        return "".join(out)
+
+
+def _split_top_level(text: str, sep: str) -> List[str]:
+    """按 sep 切分，忽略字符串、注释与括号内的 sep。"""
+    parts, start, depth, quote, i = [], 0, 0, "", 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = ""
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end < 0 else end + 1
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _unprefixed(name: str) -> str:
+    for prefix in VENDOR_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def _value_word(value: str) -> str:
+    """值的第一个词（函数名或关键字），去掉浏览器前缀后用于比较。"""
+    words = _unprefixed(value.lower()).split("(", 1)[0].split()
+    return words[0] if words else ""
+
+
+def dedupe_declarations(block: str) -> str:
+    """
+    处理一个声明块的内容（不含花括号）：
+    - 同一属性已有标准写法时去掉带前缀的属性（-webkit-transform）
+    - 同一属性已有同名的标准值时去掉带前缀的值（-webkit-linear-gradient(...)、position: -webkit-sticky）；
+      display: -webkit-box 与 display: flex 不是同一个值，保留
+    - 完全相同的重复声明只保留最后一次，层叠结果不变
+    """
+    parsed = []
+    for decl in _split_top_level(block, ";"):
+        name, colon, value = decl.partition(":")
+        key = name.strip().lower()
+        parsed.append((decl, key if colon else "", value.strip()))
+    standard = {key for _, key, _ in parsed if key and not key.startswith(VENDOR_PREFIXES)}
+    plain_words = {
+        (key, _value_word(value))
+        for _, key, value in parsed
+        if key and not value.lower().startswith(VENDOR_PREFIXES)
+    }
+    kept, seen = [], set()
+    for decl, key, value in reversed(parsed):
+        if key:
+            if key.startswith(VENDOR_PREFIXES) and _unprefixed(key) in standard:
+                continue
+            if value.lower().startswith(VENDOR_PREFIXES) and (key, _value_word(value)) in plain_words:
+                continue
+            signature = (key, re.sub(r"\s+", " ", value))
+            if signature in seen:
+                continue
+            seen.add(signature)
+        kept.append(decl)
+    return ";".join(reversed(kept))
+
+
+class PrefixDeduper:
+    """流式去重：缓冲最内层的声明块，遇到 "}" 时去重后输出；含嵌套块（@media 等）的外层原样输出。"""
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._open = False
+        self._quote = ""
+        self._escape = False
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        for ch in text:
+            if self._quote:
+                (self._buffer if self._open else out).append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = ""
+                continue
+            if ch in "\"'":
+                self._quote = ch
+            if ch == "{":
+                if self._open:
+                    # 外层是分组规则，已缓冲的是其前言部分
+                    out.extend(self._buffer)
+                out.append(ch)
+                self._buffer, self._open = [], True
+                continue
+            if ch == "}" and self._open:
+                out.append(dedupe_declarations("".join(self._buffer)))
+                self._buffer, self._open = [], False
+            (self._buffer if self._open else out).append(ch)
+        return "".join(out)
+
+    def close(self) -> str:
+        rest = "".join(self._buffer)
+        self._buffer, self._open = [], False
+        return rest
+
+
+def transform_css(chunks: Iterable[str], steps: Sequence[str]) -> Iterator[str]:
+    """把 CSS 文本块依次流经所选的变换，逐块产出结果。"""
+    stages = []
+    if any(step in steps for step in (STEP_STRIP_COMMENTS, STEP_MINIFY, STEP_DEDUPE_PREFIXES)):
+        # 去重按花括号与分号切分，注释中的 "{" ";" 会干扰，因此总是先去掉注释
+        stages.append(CssMinifier(minify=STEP_MINIFY in steps))
+    if STEP_DEDUPE_PREFIXES in steps:
+        stages.append(PrefixDeduper())
+    for chunk in chunks:
+        for stage in stages:
+            chunk = stage.feed(chunk)
+        if chunk:
+            yield chunk
+    tail = ""
+    for stage in stages:
+        tail = stage.feed(tail) + stage.close()
+    if tail:
+        yield tail
+
+
+def _chunks(text: str) -> Iterator[str]:
+    for start in range(0, len(text), STREAM_CHUNK_CHARS):
+        yield text[start:start + STREAM_CHUNK_CHARS]
+
+
+class PostprocessCache:
+    """(步骤, 字段类型, 内容 sha256) → 处理结果，LRU 淘汰。"""
+
+    def __init__(self, max_items: int = POSTPROCESS_CACHE_ITEMS):
+        self._max_items = max_items
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def key(steps: Sequence[str], kind: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{','.join(steps)}:{kind}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._items.get(key)
+        if value is None:
+            _CACHE_LOOKUPS.inc(result="miss")
+            return None
+        _CACHE_LOOKUPS.inc(result="hit")
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_items:
+            self._items.popitem(last=False)
+
+
+_cache = PostprocessCache()
+
+
+def get_postprocess_cache() -> PostprocessCache:
+    return _cache
+
+
+def _process_css(text: str, steps: Sequence[str]) -> str:
+    return "".join(transform_css(_chunks(text), steps)).strip()
+
+
+def _process_markup(text: str, steps: Sequence[str]) -> str:
+    if STEP_STRIP_COMMENTS in steps or STEP_MINIFY in steps:
+        text = _MARKUP_COMMENT_RE.sub("", text)
+
+    def style_block(match: "re.Match[str]") -> str:
+        return match.group(1) + _process_css(match.group(2), steps) + match.group(3)
+
+    return _STYLE_BLOCK_RE.sub(style_block, text)
+
+
+def process_field(name: str, text: str, steps: Sequence[str]) -> str:
+    """按字段类型处理一个字段；结果按内容哈希缓存。"""
+    if name in CSS_FIELDS:
+        kind = "css"
+    elif name in MARKUP_FIELDS:
+        kind = "markup"
+    else:
+        return text
+    field_steps = [step for step in steps if step != STEP_DEDUPE_SHARED]
+    if not text or not field_steps:
+        return text
+    key = PostprocessCache.key(field_steps, kind, text)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    result = _process_css(text, field_steps) if kind == "css" else _process_markup(text, field_steps)
+    _cache.set(key, result)
+    return result
+
+
+def _size(text: Optional[str]) -> int:
+    return len((text or "").encode("utf-8"))
+
+
+def postprocess_fields(
+    fields: Dict[str, str], steps: Sequence[str]
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, int]]]:
+    """返回 (处理后的字段, {字段: {"before", "after"}})。"""
+    processed: Dict[str, str] = {}
+    sizes: Dict[str, Dict[str, int]] = {}
+    for name, value in fields.items():
+        processed[name] = process_field(name, value or "", steps)
+        sizes[name] = {"before": _size(value), "after": _size(processed[name])}
+        _BYTES_SAVED.inc(sizes[name]["before"] - sizes[name]["after"])
+    return processed, sizes
+
+
+def dedupe_shared_css(results: Dict[str, Dict[str, str]], source: str = "HTML") -> List[str]:
+    """
+    把各框架代码 <style> 块中与 results[source]["css"] 相同的内容替换为 SHARED_CSS_MARKER（原地修改），
+    返回被替换的 “框架.字段” 列表。比较前已经过相同的后处理，空白差异不影响。
+    """
+    shared = ((results.get(source) or {}).get("css") or "").strip()
+    if not shared:
+        return []
+    replaced = []
+    for framework, fields in results.items():
+        if framework == source:
+            continue
+        for name, value in fields.items():
+            if name not in MARKUP_FIELDS or not value:
+                continue
+
+            def style_block(match: "re.Match[str]") -> str:
+                if match.group(2).strip() != shared:
+                    return match.group(0)
+                return match.group(1) + SHARED_CSS_MARKER + match.group(3)
+
+            new_value = _STYLE_BLOCK_RE.sub(style_block, value)
+            if new_value != value:
+                fields[name] = new_value
+                replaced.append(f"{framework}.{name}")
+    return replaced
+
+
+def report(
+    steps: Sequence[str], sizes: Dict[str, Dict[str, int]], shared: Sequence[str] = ()
+) -> Dict[str, object]:
+    """后处理报告：所用步骤、各字段与合计的处理前后字节数。"""
+    before = sum(size["before"] for size in sizes.values())
+    after = sum(size["after"] for size in sizes.values())
+    result: Dict[str, object] = {
+        "steps": list(steps),
+        "bytes_before": before,
+        "bytes_after": after,
+        "saved_pct": round(100 * (before - after) / before, 1) if before else 0.0,
+        "fields": sizes,
+    }
+    if shared:
+        result["shared"] = list(shared)
+    return result
+
+
+def postprocess_results(
+    results: Dict[str, Dict[str, str]], steps: Sequence[str]
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, object]]]:
+    """
+    处理 {框架: 字段} 中的每个框架（选了 dedupe_shared 时再做跨框架去重），
+    返回 (处理后的 {框架: 字段}, {框架: 报告})；传入的字段不会被修改。
+    """
+    processed: Dict[str, Dict[str, str]] = {}
+    sizes: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for framework, fields in results.items():
+        processed[framework], sizes[framework] = postprocess_fields(fields, steps)
+    shared = dedupe_shared_css(processed) if STEP_DEDUPE_SHARED in steps else []
+    for item in shared:
+        framework, name = item.split(".", 1)
+        after = _size(processed[framework][name])
+        _BYTES_SAVED.inc(sizes[framework][name]["after"] - after)
+        sizes[framework][name]["after"] = after
+    reports = {
+        framework: report(
+            steps, sizes[framework], [item for item in shared if item.startswith(f"{framework}.")]
+        )
+        for framework in processed
+    }
+    return processed, reports
+
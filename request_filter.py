@@ -0,0 +1,214 @@
+"""
+请求过滤：按框架配置的拦截规则，屏蔽提取不需要的资源。
+
+默认屏蔽图片、媒体、字体、第三方样式表、分析/广告域名与 WebSocket；
+HTML 档案同时屏蔽全部第三方脚本，框架档案放行代码转换可能用到的公共 CDN。
+每个页面与进程全局都会统计拦截的请求数与估算节省的字节数。
+放行的请求交给资源缓存（asset_cache.py），命中的脚本 / 样式表不再访问网络。
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+from asset_cache import AssetCache, get_asset_cache
+from metrics import get_registry
+
+FIRST_PARTY_SUFFIX = "uiverse.io"
+
+ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "carbonads.net",
+    "buysellads.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "sentry.io",
+    "posthog.com",
+    "plausible.io",
+    "cloudflareinsights.com",
+)
+
+CDN_HOSTS = (
+    "unpkg.com",
+    "cdn.jsdelivr.net",
+    "esm.sh",
+    "cdnjs.cloudflare.com",
+)
+
+# 被拦截请求无法得知真实大小，按资源类型的典型体积估算节省的字节数
+_ESTIMATED_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 15_000,
+    "script": 60_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "websocket": 0,
+}
+_DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+@dataclass(frozen=True)
+class FilterProfile:
+    blocked_types: FrozenSet[str] = frozenset({"image", "media", "font"})
+    block_analytics: bool = True
+    block_websockets: bool = True
+    block_third_party_stylesheets: bool = True
+    block_third_party_scripts: bool = False
+    allowed_hosts: Tuple[str, ...] = ()
+
+
+PROFILES: Dict[str, FilterProfile] = {
+    "default": FilterProfile(),
+    "HTML": FilterProfile(block_third_party_scripts=True),
+    "framework": FilterProfile(block_third_party_scripts=True, allowed_hosts=CDN_HOSTS),
+}
+
+
+@dataclass
+class FilterStats:
+    allowed: int = 0
+    blocked: int = 0
+    bytes_saved_estimate: int = 0
+    blocked_by_reason: Dict[str, int] = field(default_factory=dict)
+
+    def record_block(self, reason: str, resource_type: str) -> None:
+        self.blocked += 1
+        self.bytes_saved_estimate += _ESTIMATED_BYTES.get(resource_type, _DEFAULT_ESTIMATED_BYTES)
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def merge(self, delta: Dict[str, Any]) -> None:
+        """并入工作进程回传的增量（见 metrics.diff_numbers）。"""
+        self.allowed += delta.get("allowed", 0)
+        self.blocked += delta.get("blocked", 0)
+        self.bytes_saved_estimate += delta.get("bytes_saved_estimate", 0)
+        for reason, count in delta.get("blocked_by_reason", {}).items():
+            self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + count
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+        }
+
+
+_totals = FilterStats()
+
+
+def totals() -> Dict[str, object]:
+    """进程启动以来所有页面的拦截统计（工作进程模式下含各工作进程并入的部分）。"""
+    return _totals.as_dict()
+
+
+def merge_totals(delta: Dict[str, Any]) -> None:
+    _totals.merge(delta)
+
+
+def _collect_metrics():
+    blocked = sorted(_totals.blocked_by_reason.items())
+    return [
+        (
+            "uiverse_requests_allowed_total",
+            "counter",
+            "Requests allowed by the request filter",
+            [({}, _totals.allowed)],
+        ),
+        (
+            "uiverse_requests_blocked_total",
+            "counter",
+            "Requests blocked by the request filter",
+            [({"reason": reason}, count) for reason, count in blocked],
+        ),
+        (
+            "uiverse_blocked_bytes_saved_estimate",
+            "counter",
+            "Estimated bytes saved by blocking requests",
+            [({}, _totals.bytes_saved_estimate)],
+        ),
+    ]
+
+
+get_registry().register_collector(_collect_metrics)
+
+
+def _host_matches(host: str, suffixes: Tuple[str, ...]) -> bool:
+    return any(host == s or host.endswith("." + s) for s in suffixes)
+
+
+class RequestFilter:
+    """安装在单个 BrowserContext 上的过滤器；profile 可在每次借出页面时切换。"""
+
+    def __init__(self, profile: str = "default", assets: Optional[AssetCache] = None):
+        self.profile = PROFILES[profile]
+        self.stats = FilterStats()
+        self.assets = assets
+
+    def use_profile(self, name: str) -> None:
+        self.profile = PROFILES.get(name, PROFILES["default"])
+        self.stats = FilterStats()
+
+    def _block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        profile = self.profile
+        host = urlsplit(url).hostname or ""
+        if not host:
+            return None
+        if resource_type in profile.blocked_types:
+            return resource_type
+        if profile.block_analytics and _host_matches(host, ANALYTICS_HOSTS):
+            return "analytics"
+        if _host_matches(host, (FIRST_PARTY_SUFFIX,)) or _host_matches(host, profile.allowed_hosts):
+            return None
+        if resource_type == "stylesheet" and profile.block_third_party_stylesheets:
+            return "third-party-stylesheet"
+        if resource_type == "script" and profile.block_third_party_scripts:
+            return "third-party-script"
+        return None
+
+    async def handle(self, route, request) -> None:
+        reason = self._block_reason(request.url, request.resource_type)
+        if reason is None:
+            self.stats.allowed += 1
+            _totals.allowed += 1
+            if self.assets is not None and self.assets.enabled:
+                await self.assets.handle(route, request)
+            else:
+                await route.continue_()
+            return
+        self.stats.record_block(reason, request.resource_type)
+        _totals.record_block(reason, request.resource_type)
+        await route.abort()
+
+    async def handle_websocket(self, ws) -> None:
+        if not self.profile.block_websockets:
+            ws.connect_to_server()
+            return
+        self.stats.record_block("websocket", "websocket")
+        _totals.record_block("websocket", "websocket")
+        await ws.close()
+
+
+_filters: "WeakKeyDictionary[object, RequestFilter]" = WeakKeyDictionary()
+
+
+async def install(context) -> RequestFilter:
+    """在 context 上安装过滤器（含 WebSocket 拦截与资源缓存）。"""
+    request_filter = RequestFilter(assets=get_asset_cache())
+    await context.route("**/*", request_filter.handle)
+    await context.route_web_socket("**/*", request_filter.handle_websocket)
+    _filters[context] = request_filter
+    return request_filter
+
+
+def for_page(page) -> Optional[RequestFilter]:
+    return _filters.get(page.context)
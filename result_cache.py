@@ -0,0 +1,149 @@
+"""
+提取结果缓存：以 (框架, 组件链接) 为键，值为提取到的各字段（{"html": ..., "css": ...}）。
+
+两级结构：进程内 LRU（命中即返回）+ 磁盘 SQLite（服务重启后仍然有效）。
+条目超过 TTL 视为过期；磁盘条目数超过上限时按最近访问时间淘汰。
+磁盘中以 JSON 保存；无法解析为字段的旧条目（早期版本缓存的 Markdown）视为未命中。
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from metrics import CACHE_LOOKUPS
+
+CACHE_DIR = os.environ.get(
+    "UIVERSE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "uiverse-mcp")
+)
+CACHE_TTL_S = float(os.environ.get("UIVERSE_CACHE_TTL_S", str(7 * 24 * 3600)))
+CACHE_MEMORY_ITEMS = int(os.environ.get("UIVERSE_CACHE_MEMORY_ITEMS", "256"))
+CACHE_MAX_ENTRIES = int(os.environ.get("UIVERSE_CACHE_MAX_ENTRIES", "5000"))
+
+
+def cache_key(framework: str, url: str) -> str:
+    return f"{framework.strip().lower()} {url.strip().rstrip('/')}"
+
+
+class ResultCache:
+    def __init__(
+        self,
+        path: str,
+        ttl_s: float = CACHE_TTL_S,
+        memory_items: int = CACHE_MEMORY_ITEMS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        self._path = path
+        self._ttl_s = ttl_s
+        self._memory_items = max(0, memory_items)
+        self._max_entries = max(1, max_entries)
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_s > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            db = sqlite3.connect(self._path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed_at)")
+            self._db = db
+        return self._db
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, str]) -> None:
+        if self._memory_items == 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT created_at, value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[0] > self._ttl_s:
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, created_at: float, value: str) -> None:
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, created_at, created_at),
+            )
+            # 超出上限时淘汰最久未访问的条目
+            db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
+            db.commit()
+
+    async def get(self, framework: str, url: str) -> Optional[Dict[str, str]]:
+        if not self.enabled:
+            return None
+        key = cache_key(framework, url)
+        entry = self._memory.get(key)
+        if entry is not None:
+            if time.time() - entry[0] <= self._ttl_s:
+                self._memory.move_to_end(key)
+                CACHE_LOOKUPS.inc(tier="memory")
+                return entry[1]
+            del self._memory[key]
+        entry = await asyncio.to_thread(self._disk_get, key)
+        try:
+            value = json.loads(entry[1]) if entry is not None else None
+        except ValueError:
+            value = None
+        if not isinstance(value, dict):
+            CACHE_LOOKUPS.inc(tier="miss")
+            return None
+        CACHE_LOOKUPS.inc(tier="disk")
+        self._remember(key, entry[0], value)
+        return value
+
+    async def set(self, framework: str, url: str, value: Dict[str, str]) -> None:
+        if not self.enabled:
+            return
+        key = cache_key(framework, url)
+        created_at = time.time()
+        self._remember(key, created_at, value)
+        await asyncio.to_thread(
+            self._disk_set, key, created_at, json.dumps(value, ensure_ascii=False)
+        )
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache(os.path.join(CACHE_DIR, "results.sqlite3"))
+    return _cache
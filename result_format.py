@@ -0,0 +1,94 @@
+"""
+结构化输出：与单行 Markdown 并列的无损格式。
+
+output="json" 时返回各字段的原始代码（保留换行）、字节数与内容哈希；
+超过 INLINE_MAX_BYTES 的字段不内联（值为 null 并列入 "chunked"），
+由 read_chunk / get_result_chunk 按字节偏移分块取回。
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+OUTPUT_FORMATS = ("markdown", "json")
+INLINE_MAX_BYTES = int(os.environ.get("UIVERSE_INLINE_MAX_BYTES", str(64 * 1024)))
+CHUNK_BYTES = int(os.environ.get("UIVERSE_CHUNK_BYTES", str(32 * 1024)))
+
+
+def check_output(output: str) -> str:
+    fmt = (output or "markdown").strip().lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {output}（可选 {', '.join(OUTPUT_FORMATS)}）")
+    return fmt
+
+
+def content_hash(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def structured(
+    framework: str,
+    url: str,
+    fields: Dict[str, str],
+    inline_max_bytes: int = INLINE_MAX_BYTES,
+) -> Dict[str, Any]:
+    """
+    {"framework", "url", "fields": {字段: 代码或 null}, "sizes": {字段: 字节数},
+     "hashes": {字段: "sha256:..."}, "total_bytes", "chunked": [未内联的字段]}
+    """
+    out: Dict[str, Optional[str]] = {}
+    sizes: Dict[str, int] = {}
+    hashes: Dict[str, str] = {}
+    chunked = []
+    for name, value in fields.items():
+        data = (value or "").encode("utf-8")
+        sizes[name] = len(data)
+        hashes[name] = content_hash(data)
+        if len(data) > inline_max_bytes:
+            out[name] = None
+            chunked.append(name)
+        else:
+            out[name] = value or ""
+    return {
+        "framework": framework,
+        "url": url,
+        "fields": out,
+        "sizes": sizes,
+        "hashes": hashes,
+        "total_bytes": sum(sizes.values()),
+        "chunked": chunked,
+    }
+
+
+def _char_start(data: bytes, pos: int) -> int:
+    # 退回到 UTF-8 字符的起始字节，保证每块都能独立解码
+    while 0 < pos < len(data) and (data[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def read_chunk(
+    fields: Dict[str, str], field: str, offset: int = 0, max_bytes: int = CHUNK_BYTES
+) -> Dict[str, Any]:
+    """
+    读取 fields[field] 从字节偏移 offset 起最多 max_bytes 字节（按字符边界截断）。
+    返回 {"field", "offset", "next_offset"（读完时为 null）, "total_bytes", "hash", "data"}。
+    """
+    if field not in fields:
+        raise ValueError(f"结果中没有字段: {field}（可选 {', '.join(fields)}）")
+    data = (fields[field] or "").encode("utf-8")
+    start = _char_start(data, max(0, min(offset, len(data))))
+    end = _char_start(data, min(len(data), start + max(1, max_bytes)))
+    if end <= start < len(data):
+        # max_bytes 小于单个字符时至少返回一个完整字符
+        end = start + 1
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end += 1
+    return {
+        "field": field,
+        "offset": start,
+        "next_offset": end if end < len(data) else None,
+        "total_bytes": len(data),
+        "hash": content_hash(data),
+        "data": data[start:end].decode("utf-8"),
+    }
@@ -0,0 +1,182 @@
+"""
+服务器级准入控制：限制同时进行的浏览器提取数，其余请求进入有界的优先级等待队列。
+
+交互式调用（parse_and_extract 等）优先于批量调用；队列已满时先让出优先级更低的等待者中最晚到的一个，
+没有可让出的才立即拒绝，排队超时同样以 ServerBusyError 结束（调用方按请求时限缩短排队时间时，
+由调用方改报 DeadlineExceeded）。合并请求的共享任务可用 promote 随更紧急的等待者提升优先级。
+队列深度与等待时间可通过 stats() 查看。
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from metrics import get_registry, percentile
+
+MAX_CONCURRENT_BROWSERS = int(os.environ.get("UIVERSE_MAX_CONCURRENT_BROWSERS", "4"))
+MAX_QUEUE = int(os.environ.get("UIVERSE_MAX_QUEUE", "32"))
+QUEUE_TIMEOUT_S = float(os.environ.get("UIVERSE_QUEUE_TIMEOUT_S", "60"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+_WAIT_SAMPLES = 500
+
+
+class ServerBusyError(RuntimeError):
+    """等待队列已满或排队超时。"""
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_BROWSERS,
+        max_queue: int = MAX_QUEUE,
+        queue_timeout_s: float = QUEUE_TIMEOUT_S,
+    ):
+        self._max_concurrent = max(1, max_concurrent)
+        self._max_queue = max(0, max_queue)
+        self._queue_timeout_s = queue_timeout_s
+        self._active = 0
+        self._waiters: List[list] = []
+        # 被 promote 提升过的占用者（合并请求的共享 Deadline）及其优先级
+        self._promoted: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+        self._seq = itertools.count()
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._max_wait_s = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut, _ in self._waiters if not fut.done())
+
+    def _record_wait(self, wait_s: float) -> None:
+        self._admitted += 1
+        self._waits.append(wait_s)
+        self._max_wait_s = max(self._max_wait_s, wait_s)
+
+    async def _acquire(self, priority: int, timeout_s: Optional[float], owner: Any = None) -> None:
+        start = time.monotonic()
+        if owner is not None:
+            priority = min(priority, self._promoted.get(owner, priority))
+        if self._active < self._max_concurrent and self.queue_depth == 0:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+        if self.queue_depth >= self._max_queue and not self._evict_below(priority):
+            self._rejected += 1
+            raise ServerBusyError(self._full_message())
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), fut, owner])
+        timeout_s = self._queue_timeout_s if timeout_s is None else timeout_s
+        try:
+            await asyncio.wait_for(fut, timeout_s)
+        except BaseException as exc:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                # 放弃等待的同时恰好被分配到名额：转交给下一个等待者
+                self._release()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._timed_out += 1
+                raise ServerBusyError(f"服务器繁忙：排队超过 {timeout_s:g} 秒，请稍后重试") from None
+            raise
+        self._record_wait(time.monotonic() - start)
+
+    def _full_message(self) -> str:
+        return (
+            f"服务器繁忙：{self._active} 个提取正在进行，等待队列已满"
+            f"（{self._max_queue}），请稍后重试"
+        )
+
+    def _evict_below(self, priority: int) -> bool:
+        """队列已满时让出位置：拒绝优先级低于 priority 的等待者中最晚到的一个；没有可让出的返回 False。"""
+        pending = [waiter for waiter in self._waiters if not waiter[2].done()]
+        victim = max(pending, key=lambda waiter: (waiter[0], waiter[1]), default=None)
+        if victim is None or victim[0] <= priority:
+            return False
+        self._rejected += 1
+        victim[2].set_exception(ServerBusyError(self._full_message()))
+        return True
+
+    def _release(self) -> None:
+        # 名额直接转交给优先级最高的等待者，活跃数不变
+        while self._waiters:
+            _, _, fut, _ = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._active -= 1
+
+    def promote(self, owner: Any, priority: int) -> None:
+        """把 owner 的优先级提升到 priority：已在排队的立即前移，尚未排队的在排队时生效。"""
+        if priority >= self._promoted.get(owner, priority + 1):
+            return
+        self._promoted[owner] = priority
+        for waiter in self._waiters:
+            if waiter[3] is owner and waiter[0] > priority:
+                waiter[0] = priority
+        heapq.heapify(self._waiters)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout_s: Optional[float] = None,
+        owner: Any = None,
+    ) -> AsyncIterator[None]:
+        """占用一个浏览器提取名额，退出时归还；owner 用于 promote 识别同一请求。"""
+        await self._acquire(priority, timeout_s, owner)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "active": self._active,
+            "max_concurrent": self._max_concurrent,
+            "queue_depth": self.queue_depth,
+            "max_queue": self._max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "wait_avg_s": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "wait_p95_s": round(percentile(waits, 0.95), 3),
+            "wait_max_s": round(self._max_wait_s, 3),
+        }
+
+
+_scheduler: Optional[AdmissionController] = None
+
+
+def get_scheduler() -> AdmissionController:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AdmissionController()
+    return _scheduler
+
+
+def _collect_metrics():
+    stats = get_scheduler().stats()
+    return [
+        ("uiverse_queue_active", "gauge", "Browser extractions in progress", [({}, stats["active"])]),
+        ("uiverse_queue_depth", "gauge", "Requests waiting for a slot", [({}, stats["queue_depth"])]),
+        (
+            "uiverse_queue_requests_total",
+            "counter",
+            "Admission decisions by result",
+            [({"result": name}, stats[name]) for name in ("admitted", "rejected", "timed_out")],
+        ),
+    ]
+
+
+get_registry().register_collector(_collect_metrics)
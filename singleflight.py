@@ -0,0 +1,36 @@
+"""
+请求合并（single-flight）：同一键的并发调用只执行一次，结果（或异常）分发给所有等待者。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待者都已取消时，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def start(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Tuple[asyncio.Task, bool]:
+        """
+        同步取得同键的共享任务，没有时以 factory() 新建；返回 (任务, 是否新建)。
+        调用方可在任务上挂完成回调，把附属状态的生命周期绑定到任务本身。
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return task, False
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        return task, True
@@ -0,0 +1,283 @@
+"""
+本地 Uiverse 替身站点：供基准测试与回归测试使用，无需访问 uiverse.io。
+
+每个组件页面复现提取器依赖的页面结构：
+- HTML / CSS 标签页（role=tab）与 button.copy-all.CSS / button.copy-all.HTML（文字变为 “Copied”）
+- “React” 下拉按钮、各框架的 menuitem，以及带 textarea[name=code]、
+  div.text-offwhite 说明与 Copy 按钮（文字变为 “✔”）的 role=dialog 弹窗，Escape 关闭
+- embed_state=True 时额外内嵌 window.__remixContext，走状态读取 / 直连快速路径
+
+/ 与 /components 是分页的组件列表页（?page=N），所有页面都带 ETag 并支持 If-None-Match。
+
+组件来自 records_dir 中录制的 JSON（{"author", "slug", "html", "css", "frameworks": {...}}），
+否则按序号生成合成组件。脚本全部内联，不会被请求过滤拦截。
+"""
+
+import glob
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+FRAMEWORK_LANGUAGES = {"React": "tsx", "Vue": "vue", "Svelte": "svelte", "Lit": "ts"}
+REACT_NOTES = "This component uses styled-components."
+LISTING_PAGE_SIZE = 24
+
+_PAGE_TEMPLATE = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  [hidden] { display: none !important; }
+  .menu { border: 1px solid #ccc; }
+  [role=dialog] { position: fixed; inset: 10%; background: #222; color: #eee; }
+</style>
+</head>
+<body>
+<header>
+  <button type="button" id="fw-trigger" aria-haspopup="menu">React</button>
+  <div role="menu" class="menu" id="fw-menu" hidden>__MENU_ITEMS__</div>
+</header>
+<main>
+  <div role="tablist">
+    <button type="button" role="tab" id="tab-html" aria-selected="false">HTML</button>
+    <button type="button" role="tab" id="tab-css" aria-selected="true">CSS</button>
+  </div>
+  <section id="pane-html" hidden>
+    <button type="button" class="copy-all HTML"><span class="copy-all__text">Copy</span></button>
+    <pre data-language="html"></pre>
+  </section>
+  <section id="pane-css">
+    <button type="button" class="copy-all CSS"><span class="copy-all__text">Copy</span></button>
+    <pre data-language="css"></pre>
+  </section>
+</main>
+<div role="dialog" id="fw-dialog" aria-label="Code" hidden>
+  <div class="text-offwhite" id="fw-notes"></div>
+  <button type="button" class="copy-all" id="fw-copy"><span class="copy-all__text">Copy</span></button>
+  <textarea name="code" readonly></textarea>
+</div>
+__STATE__
+<script>
+const SOURCE = __SOURCE__;
+const CONVERT_DELAY_MS = __DELAY__;
+document.querySelector('[data-language="html"]').textContent = SOURCE.html;
+document.querySelector('[data-language="css"]').textContent = SOURCE.css;
+
+function flash(button, text) {
+  const label = button.querySelector('.copy-all__text');
+  label.textContent = text;
+  setTimeout(() => { label.textContent = 'Copy'; }, 1500);
+}
+async function copy(button, code, marker) {
+  try { await navigator.clipboard.writeText(code); } catch (e) { return; }
+  flash(button, marker);
+}
+function selectTab(name) {
+  for (const other of ['html', 'css']) {
+    document.getElementById('tab-' + other).setAttribute('aria-selected', String(other === name));
+    document.getElementById('pane-' + other).hidden = other !== name;
+  }
+}
+document.getElementById('tab-html').onclick = () => selectTab('html');
+document.getElementById('tab-css').onclick = () => selectTab('css');
+document.querySelector('button.copy-all.HTML').onclick = (e) => copy(e.currentTarget, SOURCE.html, 'Copied');
+document.querySelector('button.copy-all.CSS').onclick = (e) => copy(e.currentTarget, SOURCE.css, 'Copied');
+
+const menu = document.getElementById('fw-menu');
+const dialog = document.getElementById('fw-dialog');
+const textarea = dialog.querySelector('textarea');
+let current = null;
+document.getElementById('fw-trigger').onclick = () => { menu.hidden = !menu.hidden; };
+for (const item of menu.querySelectorAll('[role=menuitem]')) {
+  item.onclick = () => {
+    const name = item.dataset.framework;
+    menu.hidden = true;
+    current = name;
+    textarea.value = '';
+    document.getElementById('fw-notes').textContent = name === 'React' ? SOURCE.notes : '';
+    dialog.hidden = false;
+    // 模拟页面在客户端把组件转换为目标框架代码
+    setTimeout(() => { if (current === name) textarea.value = SOURCE.frameworks[name]; }, CONVERT_DELAY_MS);
+  };
+}
+document.getElementById('fw-copy').onclick = (e) => {
+  if (textarea.value) copy(e.currentTarget, textarea.value, '✔');
+};
+document.addEventListener('keydown', (e) => {
+  if (e.key === 'Escape') { dialog.hidden = true; current = null; }
+});
+</script>
+</body>
+</html>
+"""
+
+
+def synthetic_component(index: int, size: int = 1) -> Dict[str, Any]:
+    """生成第 index 个合成组件；size 倍数用于放大代码体积。"""
+    name = f"bench-{index}"
+    rules = "\n".join(
+        f".{name}-{i} {{\n  color: hsl({(index * 37 + i * 11) % 360}, 70%, 50%);\n"
+        f"  padding: {i % 8}px {(i * 3) % 16}px;\n}}"
+        for i in range(8 * size)
+    )
+    markup = "\n".join(f'<button class="{name}-{i}">Button {i}</button>' for i in range(4 * size))
+    component = {
+        "author": "bench",
+        "slug": f"component-{index}",
+        "html": f'<div class="{name}">\n{markup}\n</div>',
+        "css": f".{name} {{\n  display: flex;\n  gap: 8px;\n}}\n{rules}",
+        "notes": REACT_NOTES,
+    }
+    component["frameworks"] = {
+        "React": f"import React from 'react';\n\nconst Button{index} = () => (\n{markup}\n);\n\n"
+        f"export default Button{index};",
+        "Vue": f"<template>\n{markup}\n</template>\n\n<style scoped>\n{component['css']}\n</style>",
+        "Svelte": f"{markup}\n\n<style>\n{component['css']}\n</style>",
+        "Lit": f"import {{ LitElement, html, css }} from 'lit';\n\nexport class Bench{index} extends LitElement "
+        f"{{\n  static styles = css`{component['css']}`;\n  render() {{ return html`{markup}`; }}\n}}",
+    }
+    return component
+
+
+def load_components(records_dir: Optional[str] = None, count: int = 20, size: int = 1) -> List[Dict[str, Any]]:
+    """读取录制的组件 JSON；没有录制时生成 count 个合成组件。"""
+    components = []
+    if records_dir:
+        for path in sorted(glob.glob(os.path.join(records_dir, "*.json"))):
+            with open(path, encoding="utf-8") as fp:
+                record = json.load(fp)
+            record.setdefault("notes", REACT_NOTES)
+            record.setdefault("frameworks", {})
+            components.append(record)
+    return components or [synthetic_component(i, size) for i in range(count)]
+
+
+def render_page(component: Dict[str, Any], convert_delay_ms: int, embed_state: bool) -> str:
+    frameworks = {fw: component["frameworks"].get(fw, "") for fw in FRAMEWORK_LANGUAGES}
+    source = {
+        "html": component["html"],
+        "css": component["css"],
+        "notes": component.get("notes", ""),
+        "frameworks": frameworks,
+    }
+    state = ""
+    if embed_state:
+        context = {
+            "state": {"loaderData": {"component": {"html": component["html"], "css": component["css"]}}}
+        }
+        state_js = json.dumps(context).replace("</", "<\\/")
+        state = f"<script>window.__remixContext = {state_js};</script>"
+    menu_items = "".join(
+        f'<div role="menuitem" tabindex="-1" data-framework="{fw}">{fw}</div>' for fw in frameworks
+    )
+    # 避免代码中的 "</script>" 提前结束脚本
+    source_js = json.dumps(source).replace("</", "<\\/")
+    return (
+        _PAGE_TEMPLATE.replace("__TITLE__", html.escape(f"{component['author']}/{component['slug']}"))
+        .replace("__MENU_ITEMS__", menu_items)
+        .replace("__SOURCE__", source_js)
+        .replace("__DELAY__", str(int(convert_delay_ms)))
+        .replace("__STATE__", state)
+    )
+
+
+class StandinSite:
+    """在后台线程中运行的替身站点；组件地址为 {base_url}/{author}/{slug}。"""
+
+    def __init__(
+        self,
+        components: List[Dict[str, Any]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        convert_delay_ms: int = 150,
+        response_delay_ms: int = 0,
+        embed_state: bool = False,
+    ):
+        self.components = {f"/{c['author']}/{c['slug']}": c for c in components}
+        self.convert_delay_ms = convert_delay_ms
+        self.response_delay_ms = response_delay_ms
+        self.embed_state = embed_state
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> List[str]:
+        return [self.base_url + path for path in self.components]
+
+    def component_for(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.components.get(urlsplit(url).path.rstrip("/"))
+
+    def render_listing(self, page: int) -> str:
+        """组件列表页（/ 或 /components），每页 LISTING_PAGE_SIZE 个链接，?page= 翻页。"""
+        paths = list(self.components)
+        start = (max(1, page) - 1) * LISTING_PAGE_SIZE
+        links = "".join(
+            f'<a href="{html.escape(path)}">{html.escape(path)}</a>\n'
+            for path in paths[start : start + LISTING_PAGE_SIZE]
+        )
+        return f"<!doctype html><html><body><nav><a href=\"/profile/bench\">bench</a></nav>\n{links}</body></html>"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                site.requests += 1
+                parts = urlsplit(self.path)
+                path = parts.path.rstrip("/")
+                if path in ("", "/components"):
+                    page = dict(parse_qsl(parts.query)).get("page", "1")
+                    body = site.render_listing(int(page) if page.isdigit() else 1)
+                elif path in site.components:
+                    body = render_page(site.components[path], site.convert_delay_ms, site.embed_state)
+                else:
+                    self.send_error(404)
+                    return
+                if site.response_delay_ms:
+                    time.sleep(site.response_delay_ms / 1000)
+                data = body.encode("utf-8")
+                etag = '"{}"'.format(hashlib.sha1(data).hexdigest())
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "StandinSite":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandinSite":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,72 @@
+import unittest
+
+from component_data import find_code_fields
+
+URL = "https://uiverse.io/someone/button-1"
+
+
+def _post(slug, author, html, css=".x{}"):
+    return {"friendlyId": slug, "user": {"username": author}, "html": html, "css": css}
+
+
+class FindCodeFieldsTest(unittest.TestCase):
+    def test_picks_current_component_among_related(self):
+        data = {
+            "related": [_post("card-2", "someone", "<div>card</div>")],
+            "post": _post("button-1", "someone", "<button>mine</button>"),
+            "more": [_post("button-1", "other", "<button>theirs</button>")],
+        }
+        self.assertEqual(find_code_fields(data, URL)["html"], "<button>mine</button>")
+
+    def test_identity_on_enclosing_object(self):
+        data = {
+            "post": {
+                "slug": "button-1",
+                "author": "someone",
+                "code": {"html": "<button>mine</button>", "css": ""},
+            }
+        }
+        self.assertEqual(find_code_fields(data, URL + "/")["html"], "<button>mine</button>")
+
+    def test_list_siblings_do_not_lend_their_identity(self):
+        data = {
+            "items": [
+                {"slug": "button-1", "username": "someone"},
+                {"html": "<div>other</div>", "css": ""},
+            ],
+            "post": _post("card-2", "someone", "<div>card</div>"),
+        }
+        self.assertIsNone(find_code_fields(data, URL))
+
+    def test_identified_candidates_without_match_are_rejected(self):
+        data = {"related": [_post("card-2", "someone", "<div>card</div>")]}
+        self.assertIsNone(find_code_fields(data, URL))
+
+    def test_conflicting_matches_are_rejected(self):
+        data = [
+            _post("button-1", "someone", "<button>a</button>"),
+            _post("button-1", "someone", "<button>b</button>"),
+        ]
+        self.assertIsNone(find_code_fields(data, URL))
+
+    def test_duplicate_matches_are_accepted(self):
+        data = [_post("button-1", "someone", "<button>a</button>")] * 2
+        self.assertEqual(find_code_fields(data, URL)["html"], "<button>a</button>")
+
+    def test_anonymous_candidate_used_only_when_unambiguous(self):
+        code = {"html": "<button>a</button>", "css": ".a{}"}
+        self.assertEqual(find_code_fields({"loaderData": code}, URL), code)
+        other = {"html": "<button>b</button>", "css": ""}
+        self.assertIsNone(find_code_fields([code, other], URL))
+
+    def test_without_url_requires_single_distinct_candidate(self):
+        self.assertIsNotNone(find_code_fields([_post("card-2", "x", "<i></i>")] * 2))
+        different = [_post("a", "x", "<i></i>"), _post("b", "x", "<b></b>")]
+        self.assertIsNone(find_code_fields(different))
+
+    def test_blank_html_is_not_a_candidate(self):
+        self.assertIsNone(find_code_fields({"html": "  ", "css": ".x{}"}, URL))
+
+
+if __name__ == "__main__":
+    unittest.main()
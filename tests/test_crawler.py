@@ -0,0 +1,51 @@
+import argparse
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ["UIVERSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="uiverse-test-")
+
+import app
+import crawler
+
+URL = "https://uiverse.io/someone/button-1"
+FIELDS = {"html": "<button>x</button>", "css": ".x{}"}
+
+
+class CrawlItemTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp(prefix="uiverse-test-")
+        listing = "https://uiverse.io/buttons"
+        self.state = crawler.CrawlState(os.path.join(tmp, "state.json"), listing)
+        self.args = argparse.Namespace(deadline=None)
+        self.extract = mock.AsyncMock(return_value=FIELDS)
+
+    async def crawl(self, changed):
+        check = mock.AsyncMock(return_value=(changed, None))
+        with mock.patch.object(crawler, "check_changed", check), mock.patch.object(
+            app, "_cached_extract", self.extract
+        ):
+            return await crawler.crawl_item(URL, ["React"], self.state, self.args)
+
+    async def test_undeterminable_signature_re_extracts_with_force_refresh(self):
+        self.state.item(URL).update({"signature": "source:old", "done": ["React"]})
+        result = await self.crawl(None)
+        self.assertEqual(result["status"], "extracted")
+        self.assertTrue(self.extract.await_args.args[2])
+        self.assertEqual(self.state.item(URL)["signature"], "source:old")
+
+    async def test_undeterminable_first_seen_is_not_forced(self):
+        result = await self.crawl(None)
+        self.assertEqual(result["status"], "extracted")
+        self.assertFalse(self.extract.await_args.args[2])
+
+    async def test_unchanged_done_item_is_skipped(self):
+        self.state.item(URL).update({"signature": "source:old", "done": ["React"]})
+        result = await self.crawl(False)
+        self.assertEqual(result["status"], "unchanged")
+        self.extract.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ["UIVERSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="uiverse-test-")
+
+import app
+import failure_guard
+from deadline import DeadlineExceeded
+from failure_guard import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ComponentNotFoundError,
+    ComponentUnavailableError,
+    NegativeCache,
+)
+from result_cache import cache_key
+
+URL = "https://uiverse.io/someone/button-1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class GuardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(failure_guard, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class NegativeCacheTest(GuardTestCase):
+    def test_rejects_after_repeated_failures(self):
+        cache = NegativeCache(ttl_s=60)
+        cache.record_failure("k", RuntimeError("boom"))
+        cache.check("k")
+        cache.record_failure("k", RuntimeError("boom"))
+        with self.assertRaisesRegex(ComponentUnavailableError, "boom"):
+            cache.check("k")
+
+    def test_not_found_rejects_after_one_failure(self):
+        cache = NegativeCache(ttl_s=60)
+        cache.record_failure("k", ComponentNotFoundError("404"))
+        with self.assertRaises(ComponentUnavailableError):
+            cache.check("k")
+
+    def test_entry_expires_after_ttl(self):
+        cache = NegativeCache(ttl_s=60)
+        cache.record_failure("k", ComponentNotFoundError("404"))
+        self.clock.now += 61
+        cache.check("k")
+        self.assertEqual(len(cache), 0)
+
+    def test_success_clears_failures(self):
+        cache = NegativeCache(ttl_s=60)
+        cache.record_failure("k", ComponentNotFoundError("404"))
+        cache.record_success("k")
+        cache.check("k")
+
+    def test_disabled_cache_records_nothing(self):
+        cache = NegativeCache(ttl_s=0)
+        cache.record_failure("k", ComponentNotFoundError("404"))
+        self.assertEqual(len(cache), 0)
+
+
+class CircuitBreakerTest(GuardTestCase):
+    def breaker(self):
+        return CircuitBreaker("React", failure_rate=0.5, open_s=10, window=4, min_calls=4)
+
+    def trip(self, breaker):
+        for _ in range(4):
+            breaker.record(False, breaker.admit(), RuntimeError("menu missing"))
+
+    def test_opens_at_failure_rate(self):
+        breaker = self.breaker()
+        for _ in range(3):
+            breaker.record(False, breaker.admit())
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        breaker.record(False, breaker.admit())
+        self.assertEqual(breaker.state, STATE_OPEN)
+        with self.assertRaisesRegex(CircuitOpenError, "React"):
+            breaker.admit()
+
+    def test_half_open_admits_one_probe_and_closes_on_success(self):
+        breaker = self.breaker()
+        self.trip(breaker)
+        self.clock.now += 11
+        self.assertTrue(breaker.admit())
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.admit()
+        breaker.record(True, probe=True)
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertFalse(breaker.admit())
+
+    def test_failed_probe_reopens(self):
+        breaker = self.breaker()
+        self.trip(breaker)
+        self.clock.now += 11
+        breaker.record(False, breaker.admit())
+        self.assertEqual(breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.admit()
+
+    def test_inconclusive_probe_only_releases_the_slot(self):
+        breaker = self.breaker()
+        self.trip(breaker)
+        self.clock.now += 11
+        breaker.record(None, breaker.admit())
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        self.assertTrue(breaker.admit())
+
+
+class SettleGuardsTest(unittest.TestCase):
+    def setUp(self):
+        self.framework = f"Guarded{id(self)}"
+        self.key = cache_key(self.framework, URL)
+        self.addCleanup(failure_guard._breakers.pop, self.framework, None)
+        self.addCleanup(failure_guard.get_negative_cache().record_success, self.key)
+
+    def settle(self, failure):
+        breaker = failure_guard.get_breaker(self.framework)
+        app._settle_guards(self.framework, URL, breaker.admit(), True, failure)
+        return breaker
+
+    def test_deadline_exceeded_is_not_a_failure(self):
+        for _ in range(failure_guard.BREAKER_WINDOW):
+            breaker = self.settle(DeadlineExceeded("请求超过时限 1 秒"))
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.stats()["calls"], 0)
+        failure_guard.get_negative_cache().check(self.key)
+
+    def test_extraction_error_counts_against_both_guards(self):
+        for _ in range(failure_guard.NEGATIVE_AFTER_FAILURES):
+            breaker = self.settle(RuntimeError("menu missing"))
+        self.assertEqual(breaker.stats()["calls"], failure_guard.NEGATIVE_AFTER_FAILURES)
+        with self.assertRaises(ComponentUnavailableError):
+            failure_guard.get_negative_cache().check(self.key)
+
+
+class ForceRefreshTest(unittest.IsolatedAsyncioTestCase):
+    async def test_force_refresh_bypasses_negative_cache(self):
+        key = cache_key("HTML", URL)
+        negative = failure_guard.get_negative_cache()
+        negative.record_failure(key, ComponentNotFoundError("404"))
+        self.addCleanup(negative.record_success, key)
+        extract = mock.AsyncMock(return_value={})
+        with mock.patch.object(app, "_dispatch_extract", extract):
+            with self.assertRaises(ComponentUnavailableError):
+                await app._cached_extract("HTML", URL)
+            extract.assert_not_awaited()
+            await app._cached_extract("HTML", URL, force_refresh=True)
+        extract.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
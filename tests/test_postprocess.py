@@ -0,0 +1,33 @@
+import unittest
+
+from postprocess import STEP_MINIFY, STEP_STRIP_COMMENTS, STEPS, transform_css
+
+
+def _css(text, steps):
+    return "".join(transform_css([text], steps)).strip()
+
+
+class CommentRemovalTest(unittest.TestCase):
+    def test_comment_between_compound_selectors_adds_no_space(self):
+        # ".x/**/.y" 是复合选择器，去掉注释后不能变成后代选择器 ".x .y"
+        for steps in ((STEP_MINIFY,), (STEP_STRIP_COMMENTS,), STEPS):
+            self.assertEqual(_css(".x/**/.y{color:red}", steps), ".x.y{color:red}")
+
+    def test_whitespace_around_comment_is_kept(self):
+        self.assertEqual(_css(".x /* c */ .y{color:red}", (STEP_MINIFY,)), ".x .y{color:red}")
+
+    def test_comment_between_words_keeps_them_apart(self):
+        self.assertEqual(
+            _css("a{border:1px/**/solid red}", (STEP_MINIFY,)), "a{border:1px/**/solid red}"
+        )
+
+    def test_chunked_input_matches_whole_input(self):
+        css = ".x/**/.y { color : red ; }\n.a /* c */ .b{margin: 0 auto;}"
+        whole = _css(css, STEPS)
+        for size in (1, 2, 3, 5):
+            chunks = [css[i:i + size] for i in range(0, len(css), size)]
+            self.assertEqual("".join(transform_css(chunks, STEPS)).strip(), whole)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import result_cache
+from result_cache import ResultCache, cache_key
+
+URL = "https://uiverse.io/someone/button-{}"
+FIELDS = {"html": "<button>x</button>", "css": ".x{}"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class ResultCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(prefix="uiverse-test-"), "results.sqlite3")
+        self.clock = FakeClock()
+        patcher = mock.patch.object(result_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cache(self, **options):
+        options.setdefault("ttl_s", 60)
+        return ResultCache(self.path, **options)
+
+    async def test_round_trip_through_memory_and_disk(self):
+        await self.cache().set("HTML", URL.format(1), FIELDS)
+        self.assertEqual(await self.cache().get("html", URL.format(1) + "/"), FIELDS)
+
+    async def test_expired_entries_are_misses_in_both_tiers(self):
+        cache = self.cache()
+        await cache.set("HTML", URL.format(1), FIELDS)
+        self.clock.now += 61
+        self.assertIsNone(await cache.get("HTML", URL.format(1)))
+        self.assertIsNone(await self.cache().get("HTML", URL.format(1)))
+        rows = sqlite3.connect(self.path).execute("SELECT COUNT(*) FROM results").fetchone()
+        self.assertEqual(rows[0], 0)
+
+    async def test_memory_tier_evicts_least_recently_used(self):
+        cache = self.cache(memory_items=2)
+        for i in (1, 2):
+            await cache.set("HTML", URL.format(i), FIELDS)
+        await cache.get("HTML", URL.format(1))
+        await cache.set("HTML", URL.format(3), FIELDS)
+        expected = [cache_key("HTML", URL.format(i)) for i in (1, 3)]
+        self.assertEqual(list(cache._memory), expected)
+        # 被挤出内存的条目仍可从磁盘读回
+        self.assertEqual(await cache.get("HTML", URL.format(2)), FIELDS)
+
+    async def test_disk_tier_evicts_least_recently_accessed(self):
+        cache = self.cache(memory_items=0, max_entries=2)
+        for i in (1, 2):
+            self.clock.now += 1
+            await cache.set("HTML", URL.format(i), FIELDS)
+        self.clock.now += 1
+        await cache.get("HTML", URL.format(1))
+        self.clock.now += 1
+        await cache.set("HTML", URL.format(3), FIELDS)
+        self.assertIsNone(await cache.get("HTML", URL.format(2)))
+        self.assertEqual(await cache.get("HTML", URL.format(1)), FIELDS)
+        self.assertEqual(await cache.get("HTML", URL.format(3)), FIELDS)
+
+    async def test_legacy_markdown_entry_is_a_miss(self):
+        cache = self.cache(memory_items=0)
+        cache._disk_set(cache_key("HTML", URL.format(1)), self.clock.now, "### HTML ```html x```")
+        self.assertIsNone(await cache.get("HTML", URL.format(1)))
+
+    async def test_zero_ttl_disables_cache(self):
+        cache = self.cache(ttl_s=0)
+        await cache.set("HTML", URL.format(1), FIELDS)
+        self.assertIsNone(await cache.get("HTML", URL.format(1)))
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from result_format import content_hash, read_chunk
+
+TEXT = "<p>按钮 🎉</p>\n.x{content:\"é\"}"
+
+
+def _read_all(fields, field, max_bytes):
+    chunks, offset = [], 0
+    while offset is not None:
+        chunk = read_chunk(fields, field, offset, max_bytes)
+        chunks.append(chunk["data"])
+        offset = chunk["next_offset"]
+    return chunks
+
+
+class ReadChunkTest(unittest.TestCase):
+    def test_chunks_reassemble_multibyte_text(self):
+        for max_bytes in range(1, 9):
+            chunks = _read_all({"html": TEXT}, "html", max_bytes)
+            self.assertEqual("".join(chunks), TEXT, max_bytes)
+            self.assertNotIn("", chunks)
+
+    def test_offset_inside_character_snaps_back_to_its_start(self):
+        start = len("<p>".encode("utf-8"))
+        chunk = read_chunk({"html": TEXT}, "html", start + 1, 3)
+        self.assertEqual(chunk["offset"], start)
+        self.assertEqual(chunk["data"], "按")
+
+    def test_limit_smaller_than_character_returns_whole_character(self):
+        chunk = read_chunk({"html": "🎉!"}, "html", 0, 1)
+        self.assertEqual(chunk["data"], "🎉")
+        self.assertEqual(chunk["next_offset"], 4)
+
+    def test_metadata_describes_whole_field(self):
+        chunk = read_chunk({"html": TEXT}, "html", 0, 1 << 20)
+        data = TEXT.encode("utf-8")
+        self.assertIsNone(chunk["next_offset"])
+        self.assertEqual(chunk["total_bytes"], len(data))
+        self.assertEqual(chunk["hash"], content_hash(data))
+
+    def test_empty_field_and_unknown_field(self):
+        self.assertEqual(read_chunk({"css": ""}, "css")["data"], "")
+        with self.assertRaises(ValueError):
+            read_chunk({"css": ""}, "html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ["UIVERSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="uiverse-test-")
+
+import app
+from deadline import Deadline, DeadlineExceeded
+from scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionController, ServerBusyError
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_full_queue_evicts_batch_waiter_for_interactive_caller(self):
+        scheduler = AdmissionController(max_concurrent=1, max_queue=1)
+        admitted = []
+
+        async def take(name, priority):
+            async with scheduler.slot(priority, 5):
+                admitted.append(name)
+
+        async with scheduler.slot(PRIORITY_INTERACTIVE):
+            batch = asyncio.ensure_future(take("batch", PRIORITY_BATCH))
+            await asyncio.sleep(0)
+            interactive = asyncio.ensure_future(take("interactive", PRIORITY_INTERACTIVE))
+            await asyncio.sleep(0)
+            with self.assertRaises(ServerBusyError):
+                await batch
+        await interactive
+        self.assertEqual(admitted, ["interactive"])
+        self.assertEqual(scheduler.stats()["active"], 0)
+        self.assertEqual(scheduler.stats()["rejected"], 1)
+
+    async def test_full_queue_rejects_caller_without_lower_priority_waiter(self):
+        scheduler = AdmissionController(max_concurrent=1, max_queue=1)
+        async with scheduler.slot(PRIORITY_INTERACTIVE):
+            queued = asyncio.ensure_future(scheduler._acquire(PRIORITY_INTERACTIVE, 5))
+            await asyncio.sleep(0)
+            with self.assertRaises(ServerBusyError):
+                await scheduler._acquire(PRIORITY_BATCH, 5)
+        await queued
+        scheduler._release()
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+
+class QueueDeadlineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_queue_wait_cut_by_deadline_raises_deadline_exceeded(self):
+        scheduler = AdmissionController(max_concurrent=1, max_queue=4)
+        with mock.patch.object(app, "get_scheduler", lambda: scheduler):
+            async with scheduler.slot(PRIORITY_INTERACTIVE):
+                with self.assertRaises(DeadlineExceeded):
+                    await app._dispatch_extract(
+                        "React", "https://uiverse.io/someone/button-1", deadline=Deadline(0.1)
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
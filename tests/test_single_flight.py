@@ -0,0 +1,106 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ["UIVERSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="uiverse-test-")
+
+import app
+from deadline import Deadline, DeadlineExceeded
+from scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionController
+
+URL = "https://uiverse.io/someone/button-1"
+OTHER_URL = "https://uiverse.io/someone/button-2"
+
+
+async def _until_in_flight():
+    while not app._flight_deadlines:
+        await asyncio.sleep(0.01)
+
+
+class SharedDeadlineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_short_first_caller_does_not_cut_longer_waiter(self):
+        async def slow(framework, url, priority, deadline):
+            await asyncio.sleep(0.5)
+            deadline.check("extract")
+            return {}
+
+        with mock.patch.object(app, "_dispatch_extract", slow):
+            short = asyncio.ensure_future(app._cached_extract("HTML", URL, deadline=Deadline(0.2)))
+            await _until_in_flight()
+            long = asyncio.ensure_future(app._cached_extract("HTML", URL, deadline=Deadline(5)))
+            with self.assertRaisesRegex(DeadlineExceeded, "0.2 秒"):
+                await short
+            self.assertEqual(await long, {})
+        self.assertEqual(app._flight_deadlines, {})
+
+    async def test_waiter_extends_shared_deadline(self):
+        seen = []
+
+        async def record(framework, url, priority, deadline):
+            await asyncio.sleep(0.05)
+            seen.append(deadline.remaining_s)
+            return {}
+
+        with mock.patch.object(app, "_dispatch_extract", record):
+            first = asyncio.ensure_future(app._cached_extract("HTML", URL, deadline=Deadline(1)))
+            await _until_in_flight()
+            second = asyncio.ensure_future(app._cached_extract("HTML", URL, deadline=Deadline(10)))
+            await asyncio.gather(first, second)
+        self.assertGreater(seen[0], 5)
+
+
+class SharedPriorityTest(unittest.IsolatedAsyncioTestCase):
+    async def test_interactive_waiter_promotes_queued_batch_flight(self):
+        scheduler = AdmissionController(max_concurrent=1, max_queue=8)
+        order = []
+
+        async def queued(framework, url, priority, deadline):
+            async with scheduler.slot(priority, 5, owner=deadline):
+                order.append(url)
+            return {}
+
+        with mock.patch.object(app, "_dispatch_extract", queued), mock.patch.object(
+            app, "get_scheduler", lambda: scheduler
+        ):
+            async with scheduler.slot(PRIORITY_INTERACTIVE):
+                calls = [
+                    asyncio.ensure_future(
+                        app._cached_extract("HTML", OTHER_URL, priority=PRIORITY_BATCH)
+                    ),
+                    asyncio.ensure_future(
+                        app._cached_extract("HTML", URL, priority=PRIORITY_BATCH)
+                    ),
+                ]
+                await asyncio.sleep(0.05)
+                calls.append(
+                    asyncio.ensure_future(
+                        app._cached_extract("HTML", URL, priority=PRIORITY_INTERACTIVE)
+                    )
+                )
+                await asyncio.sleep(0.05)
+            await asyncio.gather(*calls)
+        self.assertEqual(order, [URL, OTHER_URL])
+
+    async def test_promotion_before_queueing_applies_when_queued(self):
+        scheduler = AdmissionController(max_concurrent=1, max_queue=8)
+        owner = Deadline()
+        order = []
+
+        async def take(name, priority, slot_owner=None):
+            async with scheduler.slot(priority, 5, owner=slot_owner):
+                order.append(name)
+
+        scheduler.promote(owner, PRIORITY_INTERACTIVE)
+        async with scheduler.slot(PRIORITY_INTERACTIVE):
+            tasks = [asyncio.ensure_future(take("other", PRIORITY_BATCH))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(take("promoted", PRIORITY_BATCH, owner)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["promoted", "other"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,348 @@
+"""
+工作进程池：UIVERSE_WORKERS > 0 时，浏览器提取不在 MCP 服务的事件循环中执行，
+而是分派给 N 个工作进程，每个进程拥有自己的 Playwright 与浏览器/页面池（见 browser_pool.py）。
+
+- 服务进程经本地管道下发任务（任务编号、类型、参数与剩余时限），工作进程并发执行后回传结果与步骤明细；
+  执行中的阶段事件（见 Deadline.report）随时回传，转发给服务进程中该请求的 Deadline
+- 每次回传结果时附带工作进程自上次回传以来的统计增量（指标、请求过滤、资源缓存），服务进程并入后
+  /metrics、get_stats 与 get_request_filter_stats 与单进程模式一样完整
+- 新任务分派给进行中任务最少的工作进程
+- 工作进程退出（崩溃）时，其进行中的任务以 WorkerCrashedError 结束，进程随即重启
+- 任务超过时限 WORKER_GRACE_S 仍未返回时视为卡死：终止该进程并重启，本任务以 DeadlineExceeded 结束
+准入控制（scheduler.py）仍在服务进程中进行，工作进程内不再排队。
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from browser_pool import PREWARM
+from deadline import Deadline, DeadlineExceeded
+from failure_guard import ComponentNotFoundError
+from metrics import STEP_SECONDS, diff_numbers, get_registry
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("UIVERSE_WORKERS", "0"))
+# 超过请求时限多久仍无结果时认定工作进程卡死
+WORKER_GRACE_S = 10.0
+WORKER_RESTART_BACKOFF_S = 1.0
+WORKER_STOP_TIMEOUT_S = 5.0
+
+_WORKER_RESTARTS = get_registry().counter(
+    "uiverse_worker_restarts_total", "Extraction worker restarts by reason"
+)
+
+
+class WorkerCrashedError(RuntimeError):
+    """执行任务的工作进程异常退出。"""
+
+
+class WorkerJobError(RuntimeError):
+    """工作进程中抛出、无法按类型还原的异常（消息为 “类型: 信息”）。"""
+
+
+# 工作进程回传的异常按类型名还原，其余为 WorkerJobError
+_ERRORS = {
+    "DeadlineExceeded": DeadlineExceeded,
+    "ComponentNotFoundError": ComponentNotFoundError,
+    "LookupError": LookupError,
+    "ValueError": ValueError,
+    "TimeoutError": TimeoutError,
+}
+
+
+# 工作进程中上次导出时的请求过滤与资源缓存统计
+_exported_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _export_stats() -> Dict[str, Any]:
+    """
+    自上次导出以来本工作进程的统计增量。步骤耗时直方图已随步骤明细并入（Deadline.merge_spans），不重复导出。
+    """
+    import request_filter
+    from asset_cache import get_asset_cache
+
+    current = {"request_filter": request_filter.totals(), "asset_cache": get_asset_cache().stats()}
+    delta = {
+        name: diff_numbers(value, _exported_stats.get(name, {})) for name, value in current.items()
+    }
+    _exported_stats.update(current)
+    delta["metrics"] = get_registry().export_delta(exclude=(STEP_SECONDS.name,))
+    return delta
+
+
+def _merge_stats(delta: Dict[str, Any]) -> None:
+    """在服务进程中并入工作进程回传的统计增量。"""
+    import request_filter
+    from asset_cache import get_asset_cache
+
+    get_registry().merge_delta(delta.get("metrics", {}))
+    request_filter.merge_totals(delta.get("request_filter", {}))
+    get_asset_cache().merge_stats(delta.get("asset_cache", {}))
+
+
+async def _run_job(message: tuple, results) -> None:
+    from extractor_engine import extract, extract_many
+
+    job_id, kind, args, deadline_s = message
+    deadline = Deadline(deadline_s)
+    # ok 为 None 的回传是阶段事件，不结束任务
+    deadline.subscribe(
+        lambda stage, detail: results.send((job_id, None, (stage, detail), None, None))
+    )
+    try:
+        if kind == "extract":
+            result: Any = await extract(args["url"], args["framework"], deadline)
+        elif kind == "extract_many":
+            result = await extract_many(args["url"], args["frameworks"], deadline)
+        else:
+            raise ValueError(f"未知的任务类型: {kind}")
+        reply = (job_id, True, result, deadline.spans, _export_stats())
+    except Exception as exc:
+        reply = (job_id, False, (type(exc).__name__, str(exc)), deadline.spans, _export_stats())
+    results.send(reply)
+
+
+async def _serve(jobs, results) -> None:
+    from browser_pool import get_browser_manager
+
+    loop = asyncio.get_running_loop()
+    if PREWARM:
+        try:
+            await get_browser_manager().start()
+        except Exception:
+            logger.exception("工作进程预热 Chromium 失败")
+    tasks = set()
+    try:
+        while True:
+            try:
+                message = await loop.run_in_executor(None, jobs.recv)
+            except EOFError:
+                break
+            if message is None:
+                break
+            task = asyncio.create_task(_run_job(message, results))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await get_browser_manager().close()
+
+
+def _worker_main(jobs, results) -> None:
+    """工作进程入口：在自己的事件循环中执行任务，直到管道关闭。"""
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_serve(jobs, results))
+
+
+class _Worker:
+    def __init__(self, index: int, ctx):
+        self.index = index
+        jobs_recv, self.jobs = ctx.Pipe(duplex=False)
+        self.results, results_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(jobs_recv, results_send),
+            name=f"uiverse-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        # 子进程持有的一端在父进程中关闭，子进程退出时读端才能收到 EOF
+        jobs_recv.close()
+        results_send.close()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.deadlines: Dict[int, Deadline] = {}
+        self.started_at = time.monotonic()
+        self.alive = True
+
+    def send(self, message: Any) -> None:
+        self.jobs.send(message)
+
+    def kill(self) -> None:
+        self.alive = False
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class WorkerPool:
+    """持有 N 个工作进程；submit() 把一个任务交给最空闲的进程并等待结果。"""
+
+    def __init__(self, size: int = WORKERS):
+        self._size = max(1, size)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: List[Optional[_Worker]] = []
+        self._job_ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self.jobs_total = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._workers = [self._spawn(index) for index in range(self._size)]
+
+    def _spawn(self, index: int) -> _Worker:
+        worker = _Worker(index, self._ctx)
+        threading.Thread(
+            target=self._read_results, args=(worker,), name=f"uiverse-worker-{index}-reader",
+            daemon=True,
+        ).start()
+        return worker
+
+    def _read_results(self, worker: _Worker) -> None:
+        """读取线程：把结果交回事件循环；管道断开说明进程已退出。"""
+        while True:
+            try:
+                reply = worker.results.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, worker, reply)
+        self._loop.call_soon_threadsafe(self._on_exit, worker)
+
+    def _resolve(self, worker: _Worker, reply: tuple) -> None:
+        job_id, ok, payload, spans, stats = reply
+        if ok is None:
+            deadline = worker.deadlines.get(job_id)
+            if deadline is not None:
+                stage, detail = payload
+                deadline.report(stage, **detail)
+            return
+        try:
+            _merge_stats(stats)
+        except Exception:
+            logger.exception("并入工作进程 #%d 的统计失败", worker.index)
+        future = worker.pending.pop(job_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result((payload, spans))
+        else:
+            name, message = payload
+            if name in _ERRORS:
+                future.set_exception(_ERRORS[name](message))
+            else:
+                future.set_exception(WorkerJobError(f"{name}: {message}"))
+
+    def _on_exit(self, worker: _Worker) -> None:
+        worker.alive = False
+        for future in worker.pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashedError(f"工作进程 #{worker.index} 已退出"))
+        worker.pending.clear()
+        worker.deadlines.clear()
+        if self._closing or self._workers[worker.index] is not worker:
+            return
+        _WORKER_RESTARTS.inc(reason="exit")
+        logger.warning("工作进程 #%d 已退出，正在重启", worker.index)
+        # 进程启动后立即退出时避免反复快速重启
+        delay = max(0.0, WORKER_RESTART_BACKOFF_S - (time.monotonic() - worker.started_at))
+        self._loop.call_later(delay, self._respawn, worker.index)
+
+    def _respawn(self, index: int) -> None:
+        if not self._closing and not self._workers[index].alive:
+            self._workers[index] = self._spawn(index)
+
+    def _pick(self) -> _Worker:
+        alive = [w for w in self._workers if w is not None and w.alive]
+        if not alive:
+            raise WorkerCrashedError("没有可用的工作进程（正在重启）")
+        return min(alive, key=lambda w: len(w.pending))
+
+    async def submit(self, kind: str, args: Dict[str, Any], deadline: Deadline) -> Any:
+        """在工作进程中执行任务，步骤明细并入 deadline；超时未返回的进程会被终止并重启。"""
+        if not self._workers:
+            self.start()
+        deadline.check("worker")
+        worker = self._pick()
+        job_id = next(self._job_ids)
+        future = self._loop.create_future()
+        worker.pending[job_id] = future
+        worker.deadlines[job_id] = deadline
+        sent_at = deadline.elapsed_s
+        self.jobs_total += 1
+        try:
+            worker.send((job_id, kind, args, deadline.remaining_s))
+            result, spans = await asyncio.wait_for(
+                asyncio.shield(future), deadline.remaining_s + WORKER_GRACE_S
+            )
+        except asyncio.TimeoutError:
+            _WORKER_RESTARTS.inc(reason="stuck")
+            logger.error("工作进程 #%d 超过时限仍未返回，终止并重启", worker.index)
+            worker.kill()
+            raise DeadlineExceeded(f"请求超过时限 {deadline.budget_s:g} 秒（工作进程无响应）")
+        except (BrokenPipeError, OSError) as exc:
+            worker.kill()
+            raise WorkerCrashedError(f"工作进程 #{worker.index} 不可用: {exc}") from None
+        finally:
+            worker.pending.pop(job_id, None)
+            worker.deadlines.pop(job_id, None)
+        deadline.merge_spans(spans, sent_at)
+        return result
+
+    async def extract(self, url: str, framework: str, deadline: Deadline) -> Dict[str, str]:
+        return await self.submit("extract", {"url": url, "framework": framework}, deadline)
+
+    async def extract_many(
+        self, url: str, frameworks: List[str], deadline: Deadline
+    ) -> Dict[str, Dict[str, Any]]:
+        return await self.submit("extract_many", {"url": url, "frameworks": frameworks}, deadline)
+
+    async def close(self) -> None:
+        self._closing = True
+        workers = [w for w in self._workers if w is not None]
+        self._workers = []
+        for worker in workers:
+            try:
+                worker.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in workers:
+            await asyncio.to_thread(worker.process.join, WORKER_STOP_TIMEOUT_S)
+            worker.kill()
+            worker.jobs.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self._size,
+            "alive": sum(1 for w in self._workers if w is not None and w.alive),
+            "in_flight": sum(len(w.pending) for w in self._workers if w is not None),
+            "jobs_total": self.jobs_total,
+            "pids": [w.process.pid for w in self._workers if w is not None],
+        }
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool()
+    return _pool
+
+
+def _collect_metrics():
+    if _pool is None:
+        return []
+    stats = _pool.stats()
+    return [
+        ("uiverse_workers_alive", "gauge", "Extraction worker processes alive", [({}, stats["alive"])]),
+        ("uiverse_worker_jobs_in_flight", "gauge", "Jobs running in worker processes", [({}, stats["in_flight"])]),
+    ]
+
+
+get_registry().register_collector(_collect_metrics)